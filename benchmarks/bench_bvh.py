@@ -0,0 +1,87 @@
+"""Benchmark of closest-hit queries against scenes of many spheres.  Compares
+testing every object in turn against walking the scene's BVH, and reports how
+long the BVH takes to build.  Run from the root of the repository with:
+
+    PYTHONPATH=raytracer python benchmarks/bench_bvh.py
+"""
+import math
+import random
+import time
+
+import bvh
+import points
+import rays
+import shapes
+import transforms
+
+SIZES = (100, 1000, 5000)
+
+RAYS = 50
+
+
+def build_objects(size: int, rng: random.Random) -> list:
+    """Small spheres scattered through a cube, whose side grows with the
+    number of spheres so that they are about as crowded in every scene
+    """
+
+    half_width = 2 * size ** (1 / 3)
+    objects = []
+    for _ in range(size):
+        sphere = shapes.Sphere()
+        sphere.set_transform(
+            transforms.Translate(rng.uniform(-half_width, half_width),
+                                 rng.uniform(-half_width, half_width),
+                                 rng.uniform(-half_width, half_width)) *
+            transforms.Scale(0.5, 0.5, 0.5))
+        objects.append(sphere)
+    return objects
+
+
+def linear_closest(objects: list, ray: rays.Ray):
+    """The closest hit found by testing every object"""
+
+    closest = None
+    t_max = math.inf
+    for shape in objects:
+        found = shape.intersect(ray, t_min=0.0, t_max=t_max)
+        if len(found) > 0:
+            closest = found.intersections[0]
+            t_max = closest.t
+    return closest
+
+
+def main() -> None:
+    """Time both approaches for each scene size"""
+
+    rng = random.Random(0)
+    print(f"{'objects':>8}{'build (ms)':>12}{'linear (ms)':>13}"
+          f"{'bvh (ms)':>10}{'speedup':>10}")
+
+    for size in SIZES:
+        objects = build_objects(size, rng)
+        test_rays = [rays.Ray(points.Point(0, 0, -100),
+                              transforms.RotateY(rng.uniform(-0.2, 0.2)) *
+                              transforms.RotateX(rng.uniform(-0.2, 0.2)) *
+                              points.Point(0, 0, 1) - points.Point(0, 0, 0))
+                     for _ in range(RAYS)]
+
+        start = time.perf_counter()
+        hierarchy = bvh.BVH(objects)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for ray in test_rays:
+            linear_closest(objects, ray)
+        linear = (time.perf_counter() - start) / RAYS
+
+        start = time.perf_counter()
+        for ray in test_rays:
+            hierarchy.intersect_closest(ray, 0.0, math.inf)
+        accelerated = (time.perf_counter() - start) / RAYS
+
+        print(f"{size:>8}{1e3 * build:>12.1f}{1e3 * linear:>13.3f}"
+              f"{1e3 * accelerated:>10.3f}{linear / accelerated:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
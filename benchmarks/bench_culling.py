@@ -0,0 +1,87 @@
+"""Benchmark of finding the primary-ray hits for an image of many small
+spheres spread across the frame, half of which are out of view.  Compares
+searching the whole scene's BVH, a BVH over only the spheres in view, a BVH
+per tile over only the spheres that could appear in it, and the camera's
+default, which only culls and uses tiles when there are few enough spheres.
+Apart from the scene's BVH, which a render builds anyway, the time to cull
+and bin the spheres and to build the smaller BVHs is included.  Each time
+is the best of a few runs.
+Run from the root of the repository with:
+
+    PYTHONPATH=raytracer python benchmarks/bench_culling.py
+"""
+import math
+import random
+import time
+
+import cameras
+import points
+import scenes
+import shapes
+import transforms
+import vectors
+
+SIZES = (100, 1000, 5000)
+
+IMAGE_SIZE = 64
+
+# Each approach is timed this many times, and the fastest kept
+REPEATS = 3
+
+
+def build_scene(size: int, rng: random.Random) -> scenes.Scene:
+    """Small spheres scattered over a wall facing the camera, twice as wide
+    as the camera sees
+    """
+
+    objects = []
+    for _ in range(size):
+        sphere = shapes.Sphere()
+        sphere.set_transform(
+            transforms.Translate(rng.uniform(-23, 23), rng.uniform(-11, 11),
+                                 rng.uniform(0, 2)) *
+            transforms.Scale(0.2, 0.2, 0.2))
+        objects.append(sphere)
+    return scenes.Scene(objects=objects)
+
+
+def main() -> None:
+    """Time each approach for each scene size"""
+
+    rng = random.Random(0)
+    camera = cameras.Camera(IMAGE_SIZE, IMAGE_SIZE, math.pi / 3)
+    camera.transform = transforms.ViewTransform(
+        points.Point(0, 0, -20), points.Point(0, 0, 0),
+        vectors.Vector(0, 1, 0))
+    tiles = [(tile, camera.rays_for_tile(tile)) for tile in camera.tiles()]
+
+    print(f"{'objects':>8}{'scene (ms)':>12}{'frustum (ms)':>14}"
+          f"{'tiles (ms)':>12}{'default (ms)':>14}{'speedup':>10}")
+
+    for size in SIZES:
+        scene = build_scene(size, rng)
+        everything = scene.prepare()
+
+        timings = [math.inf] * 4
+        for _ in range(REPEATS):
+            for i, binning in enumerate(("scene", False, True, None)):
+                start = time.perf_counter()
+                if binning == "scene":
+                    bins = None
+                else:
+                    bins = cameras.ScreenBins(camera, scene.objects,
+                                              everything, binning=binning)
+                for tile, tile_rays in tiles:
+                    candidates = everything if bins is None else \
+                        bins.candidates(tile)
+                    for ray in tile_rays:
+                        candidates.intersect_closest(ray, 0.0, math.inf)
+                timings[i] = min(timings[i], time.perf_counter() - start)
+
+        print(f"{size:>8}{1e3 * timings[0]:>12.1f}{1e3 * timings[1]:>14.1f}"
+              f"{1e3 * timings[2]:>12.1f}{1e3 * timings[3]:>14.1f}"
+              f"{timings[0] / timings[3]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
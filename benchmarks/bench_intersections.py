@@ -0,0 +1,71 @@
+"""Benchmark of collecting the intersections of a ray with every object in a
+scene.  Compares the old approach, which copied and re-sorted the list after
+each object, against `Scene.intersect`, which appends and only sorts when the
+sorted list is read.  Run from the root of the repository with:
+
+    PYTHONPATH=raytracer python benchmarks/bench_intersections.py
+"""
+import timeit
+
+import points
+import rays
+import scenes
+import shapes
+import transforms
+import vectors
+
+NUMBER = 20
+
+SIZES = (10, 100, 1000)
+
+
+def build_scene(size: int) -> scenes.Scene:
+    """A row of small spheres along the z axis, all hit by the test ray"""
+
+    objects = []
+    for i in range(size):
+        sphere = shapes.Sphere()
+        sphere.set_transform(transforms.Translate(0, 0, 2 * i) *
+                             transforms.Scale(0.5, 0.5, 0.5))
+        objects.append(sphere)
+    return scenes.Scene(objects=objects)
+
+
+def resorting_intersect(scene: scenes.Scene, ray: rays.Ray) -> list:
+    """Collect intersections the way Scene.intersect used to, copying and
+    sorting the combined list after every object
+    """
+
+    found: list = []
+    for shape in scene.objects:
+        found.extend(shape.intersect(ray).intersections)
+        found = sorted(found, key=lambda x: x.t)
+    return found
+
+
+def main() -> None:
+    """Time both approaches for each scene size, for reading just the hit
+    and for reading the sorted list
+    """
+
+    ray = rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1))
+
+    print(f"{'objects':>8}{'resorting (ms)':>16}{'hit (ms)':>12}"
+          f"{'sorted (ms)':>13}{'speedup':>10}")
+    for size in SIZES:
+        scene = build_scene(size)
+
+        old = min(timeit.repeat(lambda: resorting_intersect(scene, ray),
+                                number=NUMBER, repeat=3))
+        hit = min(timeit.repeat(lambda: scene.intersect(ray).hit(),
+                                number=NUMBER, repeat=3))
+        ordered = min(timeit.repeat(
+            lambda: scene.intersect(ray).intersections,
+            number=NUMBER, repeat=3))
+
+        print(f"{size:>8}{1e3 * old / NUMBER:>16.3f}{1e3 * hit / NUMBER:>12.3f}"
+              f"{1e3 * ordered / NUMBER:>13.3f}{old / ordered:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
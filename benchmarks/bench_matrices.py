@@ -0,0 +1,71 @@
+"""Micro-benchmarks of 4x4 matrix operations.  Compares the generic
+`matrices.Matrix`, which stores a list of rows and builds row and column lists
+for every element of a product, against the flat, unrolled `matrices.Matrix4`.
+Run from the root of the repository with:
+
+    PYTHONPATH=raytracer python benchmarks/bench_matrices.py
+"""
+import timeit
+
+import matrices
+import points
+import vectors
+
+NUMBER = 20000
+
+ROWS = [[1, 2, 3, 4], [2, 4, 4, 2], [8, 6, 4, 1], [0, 0, 0, 1]]
+OTHER_ROWS = [[-2, 1, 2, 3], [3, 2, 1, -1], [4, 3, 6, 5], [1, 2, 7, 8]]
+
+
+def generic(rows):
+    """Build a generic matrix from a list of rows"""
+    M = matrices.Matrix(4, 4)
+    for i, row in enumerate(rows):
+        M.set_row(i, row)
+    return M
+
+
+def flat(rows):
+    """Build a Matrix4 from a list of rows"""
+    return matrices.Matrix4([value for row in rows for value in row])
+
+
+def cofactor_inverse():
+    """Invert by cofactor expansion, as matrices other than 4x4 are"""
+    M = generic(OTHER_ROWS)
+    determinant = sum(M.get(0, i) * M.cofactor(0, i) for i in range(4))
+    return [[M.cofactor(row, col) / determinant for row in range(4)]
+            for col in range(4)]
+
+
+def main() -> None:
+    """Time each operation on both matrix types and print the speedup"""
+
+    A, B = generic(ROWS), generic(OTHER_ROWS)
+    A4, B4 = flat(ROWS), flat(OTHER_ROWS)
+    p = points.Point(1.0, 2.0, 3.0)
+    v = vectors.Vector(1.0, 2.0, 3.0)
+
+    cases = [
+        ("matrix * matrix", lambda: A * B, lambda: A4 * B4),
+        ("matrix * point", lambda: A * p, lambda: A4 * p),
+        ("matrix * vector", lambda: A * v, lambda: A4 * v),
+        ("apply_point", lambda: A * p, lambda: A4.apply_point(p)),
+        ("apply_vector", lambda: A * v, lambda: A4.apply_vector(v)),
+        ("transpose", A.transpose, A4.transpose),
+        # Matrix4 caches its inverse, so time the closed form it is built on
+        ("inverse", cofactor_inverse, lambda: matrices.inverse4(B4.flat)),
+    ]
+
+    print(f"{'operation':<20}{'Matrix (us)':>14}{'Matrix4 (us)':>14}"
+          f"{'speedup':>10}")
+    for name, generic_op, flat_op in cases:
+        generic_time = min(timeit.repeat(generic_op, number=NUMBER, repeat=3))
+        flat_time = min(timeit.repeat(flat_op, number=NUMBER, repeat=3))
+        print(f"{name:<20}{1e6 * generic_time / NUMBER:>14.3f}"
+              f"{1e6 * flat_time / NUMBER:>14.3f}"
+              f"{generic_time / flat_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Micro-benchmarks of tuple arithmetic.  Compares the generic `tuples.Tuple`,
+which loops over its fillables with getattr/setattr, against the slotted
+Point, Vector and Color types.  Run from the root of the repository with:
+
+    PYTHONPATH=raytracer python benchmarks/bench_tuples.py
+"""
+import timeit
+
+import colors
+import points
+import tuples
+import vectors
+
+NUMBER = 100000
+
+XYZW = ["x", "y", "z", "w"]
+RGB = ["red", "green", "blue"]
+
+CASES = [
+    ("point + vector",
+     lambda: tuples.Tuple(XYZW, 1.0, 2.0, 3.0, 1) +
+             tuples.Tuple(XYZW, 0.5, 0.5, 0.5, 0),
+     lambda: points.Point(1.0, 2.0, 3.0) + vectors.Vector(0.5, 0.5, 0.5)),
+    ("point - point",
+     lambda: tuples.Tuple(XYZW, 1.0, 2.0, 3.0, 1) -
+             tuples.Tuple(XYZW, 0.5, 0.5, 0.5, 1),
+     lambda: points.Point(1.0, 2.0, 3.0) - points.Point(0.5, 0.5, 0.5)),
+    ("vector * scalar",
+     lambda: tuples.Tuple(XYZW, 1.0, 2.0, 3.0, 0) * 2.5,
+     lambda: vectors.Vector(1.0, 2.0, 3.0) * 2.5),
+    ("vector.dot",
+     lambda: tuples.Tuple(XYZW, 1.0, 2.0, 3.0, 0).dot(
+         tuples.Tuple(XYZW, 0.5, 0.5, 0.5, 0)),
+     lambda: vectors.Vector(1.0, 2.0, 3.0).dot(vectors.Vector(0.5, 0.5, 0.5))),
+    ("vector.normalize",
+     lambda: tuples.Tuple(XYZW, 1.0, 2.0, 3.0, 0).normalize(),
+     lambda: vectors.Vector(1.0, 2.0, 3.0).normalize()),
+    ("color + color",
+     lambda: tuples.Tuple(RGB, 0.1, 0.2, 0.3) +
+             tuples.Tuple(RGB, 0.3, 0.2, 0.1),
+     lambda: colors.Color(0.1, 0.2, 0.3) + colors.Color(0.3, 0.2, 0.1)),
+]
+
+
+def main() -> None:
+    """Time each operation on both representations and print the speedup"""
+
+    print(f"{'operation':<20}{'generic (us)':>14}{'slotted (us)':>14}"
+          f"{'speedup':>10}")
+    for name, generic, slotted in CASES:
+        generic_time = min(timeit.repeat(generic, number=NUMBER, repeat=3))
+        slotted_time = min(timeit.repeat(slotted, number=NUMBER, repeat=3))
+        print(f"{name:<20}{1e6 * generic_time / NUMBER:>14.3f}"
+              f"{1e6 * slotted_time / NUMBER:>14.3f}"
+              f"{generic_time / slotted_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Module contains containers for batches of tuples, such as the thousands of
+ray origins or directions in an image, which are transformed by a matrix in
+one call with `Matrix.apply_many`.
+
+The tuples can be stored either in a flat `array.array` of doubles, which
+needs nothing beyond the standard library, or in a NumPy array, which is much
+faster for large batches.  The pure Python backend is the default, and NumPy
+is only used if it is installed and selected with `set_backend(NUMPY)`.  The
+scalar `Tuple` and `Matrix` classes are the same whichever backend is used.
+"""
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+import exceptions
+import tuples
+
+try:
+    import numpy
+except ImportError:                                     # pragma: no cover
+    numpy = None                                        # type: ignore
+
+HAS_NUMPY = numpy is not None
+
+# The names of the backends
+PYTHON = "python"
+NUMPY = "numpy"
+
+_BACKEND = PYTHON
+
+
+def set_backend(name: str) -> None:
+    """Select the backend new `TupleArray`s are stored with"""
+
+    global _BACKEND                                     # pylint: disable=W0603
+
+    _BACKEND = _check_backend(name)
+
+
+def get_backend() -> str:
+    """Return the name of the backend new `TupleArray`s are stored with"""
+    return _BACKEND
+
+
+def _check_backend(name: str) -> str:
+    """Return the backend name if it can be used, or raise"""
+
+    if name not in (PYTHON, NUMPY):
+        raise ValueError(f"Unknown backend {name!r}")
+    if name == NUMPY and not HAS_NUMPY:
+        raise exceptions.BackendUnavailableError(
+            "The numpy backend needs numpy to be installed")
+    return name
+
+
+class TupleArray:
+    """A batch of tuples of the same kind.  `template` is any tuple of that
+    kind, which gives the number of values in each tuple and is used to
+    build tuples again when they are read back out.  `data` holds the values
+    of every tuple one after another, or is a (tuples x width) NumPy array
+    """
+
+    def __init__(self, template: tuples.Tuple,
+                 data: Union[Sequence[float], "numpy.ndarray"]=(),
+                 backend: Optional[str]=None) -> None:
+
+        self.template = template
+        self.width = len(template.values())
+        self.backend = _check_backend(backend or _BACKEND)
+
+        if self.backend == NUMPY:
+            self.data = numpy.array(data, dtype=float).reshape(-1, self.width)
+        else:
+            self.data = array("d", data)
+            if len(self.data) % self.width != 0:
+                raise exceptions.IncompatibleLengthError
+
+    @classmethod
+    def from_tuples(cls, items: Iterable[tuples.Tuple],
+                    template: Optional[tuples.Tuple]=None,
+                    backend: Optional[str]=None) -> "TupleArray":
+        """Build a batch from tuples.  The template defaults to the first
+        tuple, so must be given if there might not be one
+        """
+
+        items = list(items)
+        if template is None:
+            template = items[0]
+
+        data: List[float] = []
+        for item in items:
+            data.extend(item.values())
+        return cls(template, data, backend)
+
+    def __repr__(self) -> str:
+        return (f"TupleArray [{len(self)} x {type(self.template).__name__} "
+                f"backend={self.backend}]")
+
+    def __len__(self) -> int:
+        return len(self.data) if self.backend == NUMPY \
+            else len(self.data) // self.width
+
+    def __getitem__(self, index: int) -> tuples.Tuple:
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        if self.backend == NUMPY:
+            values = [float(value) for value in self.data[index]]
+        else:
+            start = index * self.width
+            values = list(self.data[start:start + self.width])
+        return self.template.with_values(values)
+
+    def __iter__(self) -> Iterator[tuples.Tuple]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def component(self, index: int) -> Union[array, "numpy.ndarray"]:
+        """Return one value, such as x (index 0), of every tuple as an array
+        of the same backend
+        """
+        if self.backend == NUMPY:
+            return self.data[:, index]
+        return self.data[index::self.width]
+
+    def to_tuples(self) -> List[tuples.Tuple]:
+        """Return the batch as a list of tuples"""
+        return list(self)
+
+    def transformed(self, m: Sequence[float]) -> "TupleArray":
+        """Return a new batch holding the product of the 4x4 matrix, given
+        as 16 values in row-major order, and each tuple.  Called by
+        `Matrix.apply_many`
+        """
+
+        if self.width != 4 or len(m) != 16:
+            raise exceptions.IncompatibleLengthError
+
+        if self.backend == NUMPY:
+            matrix = numpy.array(m, dtype=float).reshape(4, 4)
+            return TupleArray(self.template, self.data @ matrix.T,
+                              self.backend)
+
+        m0, m1, m2, m3, m4, m5, m6, m7, \
+            m8, m9, m10, m11, m12, m13, m14, m15 = m
+        data = self.data
+        out = array("d")
+        for i in range(0, len(data), 4):
+            x, y, z, w = data[i], data[i + 1], data[i + 2], data[i + 3]
+            out.extend((m0*x + m1*y + m2*z + m3*w,
+                        m4*x + m5*y + m6*z + m7*w,
+                        m8*x + m9*y + m10*z + m11*w,
+                        m12*x + m13*y + m14*z + m15*w))
+        return TupleArray(self.template, out, self.backend)
@@ -0,0 +1,195 @@
+"""Module contains axis-aligned bounding boxes, which are used to rule out
+ray-shape intersection tests cheaply.  A box is six floats, and may be
+infinite along any axis, as an unbounded shape such as a plane is.
+"""
+import math
+from typing import Iterable, Optional, Tuple
+
+import points
+import rays
+
+
+class BoundingBox:
+    """An axis-aligned box.  The default box is empty, and grows to contain
+    the points and boxes added to it
+    """
+
+    __slots__ = ("min_x", "min_y", "min_z", "max_x", "max_y", "max_z")
+
+    def __init__(self, minimum: Optional[points.Point]=None,
+                 maximum: Optional[points.Point]=None) -> None:
+
+        if minimum is None:
+            self.min_x = self.min_y = self.min_z = math.inf
+        else:
+            self.min_x, self.min_y, self.min_z = \
+                minimum.x, minimum.y, minimum.z
+
+        if maximum is None:
+            self.max_x = self.max_y = self.max_z = -math.inf
+        else:
+            self.max_x, self.max_y, self.max_z = \
+                maximum.x, maximum.y, maximum.z
+
+    @classmethod
+    def infinite(cls) -> "BoundingBox":
+        """The box containing everything"""
+        return cls(points.Point(-math.inf, -math.inf, -math.inf),
+                   points.Point(math.inf, math.inf, math.inf))
+
+    @classmethod
+    def around(cls, boxes: Iterable["BoundingBox"]) -> "BoundingBox":
+        """The smallest box containing all of the boxes"""
+
+        box = cls()
+        for other in boxes:
+            box.add_box(other)
+        return box
+
+    def __repr__(self) -> str:
+        return (f"BoundingBox [min=({self.min_x}, {self.min_y}, {self.min_z}) "
+                f"max=({self.max_x}, {self.max_y}, {self.max_z})]")
+
+    def __eq__(self, other) -> bool:
+        return (self.min_x == other.min_x and self.min_y == other.min_y and
+                self.min_z == other.min_z and self.max_x == other.max_x and
+                self.max_y == other.max_y and self.max_z == other.max_z)
+
+    @property
+    def minimum(self) -> points.Point:
+        """The corner with the smallest coordinates"""
+        return points.Point(self.min_x, self.min_y, self.min_z)
+
+    @property
+    def maximum(self) -> points.Point:
+        """The corner with the largest coordinates"""
+        return points.Point(self.max_x, self.max_y, self.max_z)
+
+    def is_empty(self) -> bool:
+        """True if nothing has been added to the box"""
+        return (self.min_x > self.max_x or self.min_y > self.max_y or
+                self.min_z > self.max_z)
+
+    def is_bounded(self) -> bool:
+        """True if the box is finite along every axis"""
+        return all(math.isfinite(value) for value in (
+            self.min_x, self.min_y, self.min_z,
+            self.max_x, self.max_y, self.max_z))
+
+    def add_point(self, point: points.Point) -> None:
+        """Grow the box to contain the point"""
+
+        self.min_x = min(self.min_x, point.x)
+        self.min_y = min(self.min_y, point.y)
+        self.min_z = min(self.min_z, point.z)
+        self.max_x = max(self.max_x, point.x)
+        self.max_y = max(self.max_y, point.y)
+        self.max_z = max(self.max_z, point.z)
+
+    def add_box(self, other: "BoundingBox") -> None:
+        """Grow the box to contain another box"""
+
+        self.min_x = min(self.min_x, other.min_x)
+        self.min_y = min(self.min_y, other.min_y)
+        self.min_z = min(self.min_z, other.min_z)
+        self.max_x = max(self.max_x, other.max_x)
+        self.max_y = max(self.max_y, other.max_y)
+        self.max_z = max(self.max_z, other.max_z)
+
+    def padded(self, amount: float) -> "BoundingBox":
+        """Return the box grown by `amount` on every side"""
+
+        box = BoundingBox()
+        box.min_x, box.min_y, box.min_z = \
+            self.min_x - amount, self.min_y - amount, self.min_z - amount
+        box.max_x, box.max_y, box.max_z = \
+            self.max_x + amount, self.max_y + amount, self.max_z + amount
+        return box
+
+    def centroid(self) -> Tuple[float, float, float]:
+        """The center of the box"""
+        return ((self.min_x + self.max_x) / 2, (self.min_y + self.max_y) / 2,
+                (self.min_z + self.max_z) / 2)
+
+    def surface_area(self) -> float:
+        """The area of the box's faces, which is proportional to the chance
+        that a random ray passes through it
+        """
+
+        if self.is_empty():
+            return 0.0
+        dx = self.max_x - self.min_x
+        dy = self.max_y - self.min_y
+        dz = self.max_z - self.min_z
+        return 2 * (dx * dy + dy * dz + dz * dx)
+
+    def transform(self, M) -> "BoundingBox":
+        """Return the box containing this one after transforming it by the
+        matrix.  Transforming a box that is infinite along any axis gives the
+        infinite box
+        """
+
+        if self.is_empty():
+            return BoundingBox()
+        if not self.is_bounded():
+            return BoundingBox.infinite()
+
+        box = BoundingBox()
+        for x in (self.min_x, self.max_x):
+            for y in (self.min_y, self.max_y):
+                for z in (self.min_z, self.max_z):
+                    box.add_point(M.apply_point(points.Point(x, y, z)))
+        return box
+
+    def intersects(self, ray: rays.Ray, t_min: float=-math.inf,
+                   t_max: float=math.inf) -> bool:
+        """True if the ray passes through the box with t_min < t < t_max"""
+
+        origin, direction = ray.origin, ray.direction
+        return self.hit_range((origin.x, origin.y, origin.z),
+                              inverse_direction(direction),
+                              t_min, t_max) is not None
+
+    def hit_range(self, origin: Tuple[float, float, float],
+                  inverse: Tuple[float, float, float], t_min: float,
+                  t_max: float) -> Optional[Tuple[float, float]]:
+        """The slab test.  Given a ray's origin and the reciprocals of its
+        direction (see `inverse_direction`), return the range of t, clipped to
+        t_min and t_max, over which the ray is inside the box, or None if it
+        misses
+        """
+
+        for low, high, o, inv in ((self.min_x, self.max_x, origin[0],
+                                   inverse[0]),
+                                  (self.min_y, self.max_y, origin[1],
+                                   inverse[1]),
+                                  (self.min_z, self.max_z, origin[2],
+                                   inverse[2])):
+            if inv == math.inf:
+                # The ray is parallel to this pair of faces, so is either
+                # always or never between them
+                if o < low or o > high:
+                    return None
+                continue
+
+            t1 = (low - o) * inv
+            t2 = (high - o) * inv
+            if t1 > t2:
+                t1, t2 = t2, t1
+            if t1 > t_min:
+                t_min = t1
+            if t2 < t_max:
+                t_max = t2
+            if t_min > t_max:
+                return None
+
+        return t_min, t_max
+
+
+def inverse_direction(direction) -> Tuple[float, float, float]:
+    """The reciprocals of a direction's components, as the slab test takes
+    them.  Zero components become infinity
+    """
+    return (1 / direction.x if direction.x != 0 else math.inf,
+            1 / direction.y if direction.y != 0 else math.inf,
+            1 / direction.z if direction.z != 0 else math.inf)
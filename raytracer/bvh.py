@@ -0,0 +1,346 @@
+"""Module contains a bounding volume hierarchy (BVH), which lets a ray skip
+testing the shapes in whole regions of a scene that it doesn't pass through.
+
+The hierarchy is a binary tree of bounding boxes, built top down.  Each node
+is split where the surface area heuristic (SAH) predicts the fewest ray-shape
+tests: the chance of a ray passing through a child box is taken to be
+proportional to its surface area.  Shapes with infinite bounds, such as
+planes, can't go in a box, so they are kept in a list that every ray tests.
+"""
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import bounds
+import intersections
+import rays
+import stats as render_stats
+
+# A node with this many shapes or fewer is never split
+MAX_LEAF_SIZE = 2
+
+# The number of buckets centroids are sorted into along each axis when looking
+# for the best split
+SAH_BINS = 12
+
+# The cost of testing a ray against a child's box, relative to testing it
+# against a shape
+TRAVERSAL_COST = 0.5
+
+
+class _Node:
+    """A node of the hierarchy.  Leaves have a list of shapes, and other
+    nodes two children
+    """
+
+    __slots__ = ("box", "left", "right", "shapes")
+
+    def __init__(self, box: bounds.BoundingBox) -> None:
+        self.box = box
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.shapes: Optional[list] = None
+
+
+class BVH:
+    """A bounding volume hierarchy over a sequence of shapes, which is built
+    from their world bounds when it is created.  Build a new one if any of
+    the shapes move
+    """
+
+    def __init__(self, objects: Sequence) -> None:
+
+        self.unbounded: list = []
+        items = []
+        for shape in objects:
+            box = shape.world_bounds()
+            if box.is_bounded():
+                items.append((box, box.centroid(), shape))
+            else:
+                self.unbounded.append(shape)
+
+        self.size = len(items)
+        self.root = _build(items) if items else None
+
+    @classmethod
+    def subset(cls, hierarchy: "BVH", shapes: Sequence) -> "BVH":
+        """Return a BVH over some of the shapes in another, made by pruning
+        the other's tree rather than building a new one, which is much
+        quicker.  Every one of `shapes` must be in `hierarchy`
+        """
+
+        keep = {id(shape) for shape in shapes}
+        result = cls(())
+        result.unbounded = [shape for shape in hierarchy.unbounded
+                            if id(shape) in keep]
+        result.size = len(keep) - len(result.unbounded)
+        if hierarchy.root is not None:
+            result.root = _prune(hierarchy.root, keep)
+        return result
+
+    def __repr__(self) -> str:
+        return (f"BVH [bounded={self.size} "
+                f"unbounded={len(self.unbounded)}]")
+
+    def _start(self, ray: rays.Ray, t_min: float, t_max: float):
+        """Return the ray's origin and inverse direction for the slab tests,
+        and the range of t over which it passes through the root, or None if
+        it misses the root
+        """
+
+        origin = (ray.origin.x, ray.origin.y, ray.origin.z)
+        inverse = bounds.inverse_direction(ray.direction)
+        if self.root is None:
+            return origin, inverse, None
+        return origin, inverse, self.root.box.hit_range(origin, inverse,
+                                                         t_min, t_max)
+
+    def intersect_closest(self, ray: rays.Ray, t_min: float, t_max: float,
+                          stats: Optional[render_stats.RenderStats]=None
+                          ) -> Optional[intersections.Intersection]:
+        """Return the closest intersection with t_min < t < t_max, or None.
+        Children are visited nearest first, and boxes that start beyond the
+        closest intersection found so far are skipped
+        """
+
+        closest = None
+        for shape in self.unbounded:
+            found = shape.intersect(ray, t_min, t_max, stats)
+            if len(found) > 0:
+                closest = found.intersections[0]
+                t_max = closest.t
+
+        origin, inverse, root_range = self._start(ray, t_min, t_max)
+        if root_range is None:
+            return closest
+
+        stack: List[Tuple[float, _Node]] = [(root_range[0], self.root)]
+        while stack:
+            near, node = stack.pop()
+            if near >= t_max:
+                continue
+
+            if node.shapes is not None:
+                for shape in node.shapes:
+                    found = shape.intersect(ray, t_min, t_max, stats)
+                    if len(found) > 0:
+                        closest = found.intersections[0]
+                        t_max = closest.t
+                continue
+
+            left = node.left.box.hit_range(origin, inverse, t_min, t_max)
+            right = node.right.box.hit_range(origin, inverse, t_min, t_max)
+
+            # Push the further child first, so the nearer one is popped next
+            if left is not None and right is not None:
+                if left[0] <= right[0]:
+                    stack.append((right[0], node.right))
+                    stack.append((left[0], node.left))
+                else:
+                    stack.append((left[0], node.left))
+                    stack.append((right[0], node.right))
+            elif left is not None:
+                stack.append((left[0], node.left))
+            elif right is not None:
+                stack.append((right[0], node.right))
+
+        return closest
+
+    def find_occluder(self, ray: rays.Ray, t_min: float, t_max: float,
+                      stats: Optional[render_stats.RenderStats]=None,
+                      skip=None):
+        """Return any shape, other than `skip`, that the ray intersects with
+        t_min < t < t_max, or None.  Stops at the first one found
+        """
+
+        for shape in self.unbounded:
+            if shape is not skip and shape.occludes(ray, t_min, t_max, stats):
+                return shape
+
+        origin, inverse, root_range = self._start(ray, t_min, t_max)
+        if root_range is None:
+            return None
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+
+            if node.shapes is not None:
+                for shape in node.shapes:
+                    if shape is not skip and \
+                       shape.occludes(ray, t_min, t_max, stats):
+                        return shape
+                continue
+
+            for child in (node.left, node.right):
+                if child.box.hit_range(origin, inverse, t_min,
+                                       t_max) is not None:
+                    stack.append(child)
+
+        return None
+
+    def intersect_all(self, ray: rays.Ray,
+                      stats: Optional[render_stats.RenderStats]=None
+                      ) -> intersections.Intersections:
+        """Return every intersection along the whole line of the ray, in
+        front of its origin or behind it
+        """
+
+        found = intersections.Intersections()
+        for shape in self.unbounded:
+            found.extend(shape.intersect(ray, stats=stats))
+
+        origin, inverse, root_range = self._start(ray, -math.inf, math.inf)
+        if root_range is None:
+            return found
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+
+            if node.shapes is not None:
+                for shape in node.shapes:
+                    found.extend(shape.intersect(ray, stats=stats))
+                continue
+
+            for child in (node.right, node.left):
+                if child.box.hit_range(origin, inverse, -math.inf,
+                                       math.inf) is not None:
+                    stack.append(child)
+
+        return found
+
+
+def _prune(node: _Node, keep: set) -> Optional[_Node]:
+    """Return a copy of the tree under `node` holding only the shapes whose
+    id() is in `keep`, with each box shrunk to fit what is left, or None if
+    none are left.  Nodes left with one child are replaced by it
+    """
+
+    # Children are pruned before their parents, so walk the tree in
+    # post-order, keeping each node's pruned copy on a stack of results
+    pruned: List[Optional[_Node]] = []
+    stack: List[Tuple[_Node, bool]] = [(node, False)]
+    while stack:
+        current, children_done = stack.pop()
+
+        if current.shapes is not None:
+            shapes = [shape for shape in current.shapes if id(shape) in keep]
+            if not shapes:
+                pruned.append(None)
+            elif len(shapes) == len(current.shapes):
+                pruned.append(current)
+            else:
+                leaf = _Node(bounds.BoundingBox.around(
+                    shape.world_bounds() for shape in shapes))
+                leaf.shapes = shapes
+                pruned.append(leaf)
+            continue
+
+        if not children_done:
+            stack.append((current, True))
+            stack.append((current.right, False))
+            stack.append((current.left, False))
+            continue
+
+        right = pruned.pop()
+        left = pruned.pop()
+        if left is None or right is None:
+            pruned.append(right if left is None else left)
+        elif left is current.left and right is current.right:
+            pruned.append(current)
+        else:
+            parent = _Node(bounds.BoundingBox.around((left.box, right.box)))
+            parent.left, parent.right = left, right
+            pruned.append(parent)
+
+    return pruned[0]
+
+
+def _build(items: list) -> _Node:
+    """Build the hierarchy over a list of (box, centroid, shape) tuples.
+    Nodes waiting to be split are kept on a stack rather than recursing, so
+    that lopsided scenes can't hit the recursion limit
+    """
+
+    root = _Node(bounds.BoundingBox.around(item[0] for item in items))
+    pending = [(root, items)]
+
+    while pending:
+        node, node_items = pending.pop()
+
+        split = _best_split(node.box, node_items)
+        if split is None:
+            node.shapes = [item[2] for item in node_items]
+            continue
+
+        left_items, right_items = split
+        node.left = _Node(bounds.BoundingBox.around(
+            item[0] for item in left_items))
+        node.right = _Node(bounds.BoundingBox.around(
+            item[0] for item in right_items))
+        pending.append((node.left, left_items))
+        pending.append((node.right, right_items))
+
+    return root
+
+
+def _best_split(box: bounds.BoundingBox, items: list) -> Optional[tuple]:
+    """Return the items divided in two where the SAH cost is lowest, or None
+    if the node is cheaper to leave as a leaf
+    """
+
+    count = len(items)
+    area = box.surface_area()
+    if count <= MAX_LEAF_SIZE or area <= 0:
+        return None
+
+    best_cost = float(count)
+    best = None
+
+    for axis in range(3):
+        low = min(item[1][axis] for item in items)
+        high = max(item[1][axis] for item in items)
+        if high <= low:
+            continue
+
+        scale = SAH_BINS / (high - low)
+        bins: List[list] = [[] for _ in range(SAH_BINS)]
+        for item in items:
+            index = min(int((item[1][axis] - low) * scale), SAH_BINS - 1)
+            bins[index].append(item)
+
+        bin_boxes = [bounds.BoundingBox.around(item[0] for item in contents)
+                     for contents in bins]
+
+        # The area and count of everything left of each boundary, and then
+        # right of it, found with one sweep in each direction
+        left_costs = []
+        running = bounds.BoundingBox()
+        running_count = 0
+        for index in range(SAH_BINS - 1):
+            running.add_box(bin_boxes[index])
+            running_count += len(bins[index])
+            left_costs.append(running.surface_area() * running_count)
+
+        running = bounds.BoundingBox()
+        running_count = 0
+        for index in range(SAH_BINS - 1, 0, -1):
+            running.add_box(bin_boxes[index])
+            running_count += len(bins[index])
+            if running_count == 0 or running_count == count:
+                continue
+
+            cost = TRAVERSAL_COST + (left_costs[index - 1] +
+                                     running.surface_area() *
+                                     running_count) / area
+            if cost < best_cost:
+                best_cost = cost
+                best = (axis, bins, index)
+
+    if best is None:
+        return None
+
+    _, bins, index = best
+    left = [item for contents in bins[:index] for item in contents]
+    right = [item for contents in bins[index:] for item in contents]
+    return left, right
@@ -1,16 +1,51 @@
 """Class defines a camera and provides mappings from camera coordinates to the
 world
 """
-import logging
+from concurrent import futures
+from typing import (AsyncIterator, Callable, Dict, Iterator, List, Optional,
+                    Sequence, Tuple)
+import asyncio
+import contextlib
+import itertools
 import math
-import sys
+import os
 import time
 
+import bounds as bounding
+import bvh
 import canvas
+import checkpoints
+import colors
 import points
+import profiling
+import progress as progress_hooks
 import rays
 import scenes
+import stats as render_stats
 import transforms
+import vectors
+
+# The default edge length, in pixels, of the square tiles that the image is
+# split into for parallel rendering
+DEFAULT_TILE_SIZE = 16
+
+# The pixel strides of the passes made by a progressive render: first every
+# 4th pixel in each direction (1/16 of the pixels), then every 2nd, then all
+DEFAULT_PROGRESSIVE_STEPS = (4, 2, 1)
+
+# A tile is the half-open pixel rectangle (x_min, y_min, x_max, y_max)
+Tile = Tuple[int, int, int, int]
+
+# How far, in camera space, a box must be beyond the edge of the view before
+# it is culled, so that rounding can't cull a shape at the edge of the image
+FRUSTUM_MARGIN = 1e-6
+
+# Culling and sorting objects into tiles only pays off when there are few
+# enough objects, since every object's extent on screen is found and every
+# tile's BVH is pruned from the BVH over all of them.  By default tiles are
+# only used when the scene has at most this many objects per pixel of a tile,
+# which is where bench_culling.py finds the cost and the savings even out
+BINNING_OBJECTS_PER_PIXEL = 1
 
 class Camera:
     """Camera class.  All scenes have one of these"""
@@ -34,44 +69,599 @@ class Camera:
 
         self.pixel_size = self.half_width * 2 / self.hsize
 
+        # Whether primary rays are only tested against the objects that
+        # overlap their tile.  None decides from the number of objects, see
+        # ScreenBins
+        self.tile_binning: Optional[bool] = None
+
         self.transform = transforms.Identity(4)
 
+    @property
+    def transform(self):
+        """The camera's view transform"""
+        return self._transform
+
+    @transform.setter
+    def transform(self, M) -> None:
+        """Set the view transform, and cache its inverse and the position of
+        the camera in world space, which every primary ray needs
+        """
+        self._transform = M
+        self.inverse_transform = M.inverse()
+        self.origin = self.inverse_transform * points.Point(0, 0, 0)
+
+        # The scene BVH the shapes were last binned for, and the bins
+        self._candidates: Optional[Tuple[bvh.BVH, "ScreenBins"]] = None
+
+    def __getstate__(self):
+        """The shapes are binned again by each worker process, rather than
+        being sent to it
+        """
+        state = self.__dict__.copy()
+        state["_candidates"] = None
+        return state
+
+    def _corners_in_camera(self, box: bounding.BoundingBox
+                           ) -> List[points.Point]:
+        """The box's corners in camera space, where the camera looks down -z
+        and the canvas is at z=-1
+        """
+        return [self.transform.apply_point(points.Point(x, y, z))
+                for x in (box.min_x, box.max_x)
+                for y in (box.min_y, box.max_y)
+                for z in (box.min_z, box.max_z)]
+
+    def in_view(self, box: bounding.BoundingBox) -> bool:
+        """Return False if the box is certainly outside the camera's view, so
+        that no primary ray can hit anything inside it.  The view is the
+        pyramid, with its apex at the camera, through the edges of the
+        canvas.  Boxes that are infinite along any axis are always in view
+        """
+
+        if box.is_empty():
+            return False
+        if not box.is_bounded():
+            return True
+        return not self._outside_view(self._corners_in_camera(box))
+
+    def _outside_view(self, corners: List[points.Point]) -> bool:
+        """True if every corner is on the outside of the same face of the
+        view's pyramid, or behind the camera
+        """
+
+        half_width, half_height = self.half_width, self.half_height
+        for outside in ((lambda p: p.z),
+                        (lambda p: p.x + p.z * half_width),
+                        (lambda p: -p.x + p.z * half_width),
+                        (lambda p: p.y + p.z * half_height),
+                        (lambda p: -p.y + p.z * half_height)):
+            if all(outside(corner) > FRUSTUM_MARGIN for corner in corners):
+                return True
+        return False
+
+    def screen_extent(self, box: bounding.BoundingBox) -> Optional[Tile]:
+        """Return the rectangle of pixels, as a tile, whose primary rays
+        could pass through the box, or None if none of them can.  The box is
+        projected onto the canvas, and the rectangle around its corners is
+        grown by a pixel on each side.  Boxes that are unbounded, or reach
+        behind the camera, cover the whole image
+        """
+
+        if box.is_empty():
+            return None
+
+        whole_image = (0, 0, self.hsize, self.vsize)
+        if not box.is_bounded():
+            return whole_image
+
+        corners = self._corners_in_camera(box)
+        if self._outside_view(corners):
+            return None
+        if any(corner.z > -FRUSTUM_MARGIN for corner in corners):
+            return whole_image
+
+        # Where each corner is on the canvas at z=-1
+        canvas_xs = [corner.x / -corner.z for corner in corners]
+        canvas_ys = [corner.y / -corner.z for corner in corners]
+
+        # Canvas x and y decrease as the pixel indices increase, as in
+        # rays_for_tile
+        x_min = math.floor((self.half_width - max(canvas_xs)) /
+                           self.pixel_size) - 1
+        x_max = math.floor((self.half_width - min(canvas_xs)) /
+                           self.pixel_size) + 2
+        y_min = math.floor((self.half_height - max(canvas_ys)) /
+                           self.pixel_size) - 1
+        y_max = math.floor((self.half_height - min(canvas_ys)) /
+                           self.pixel_size) + 2
+
+        x_min, y_min = max(x_min, 0), max(y_min, 0)
+        x_max, y_max = min(x_max, self.hsize), min(y_max, self.vsize)
+        if x_min >= x_max or y_min >= y_max:
+            return None
+        return x_min, y_min, x_max, y_max
+
+    def screen_bins(self, scene: scenes.Scene) -> "ScreenBins":
+        """Return the scene's objects sorted by where they appear in the
+        image, see `ScreenBins`.  They are kept until the scene's BVH is
+        rebuilt or the camera moves
+        """
+
+        accelerator = scene.prepare()
+        if (self._candidates is None or
+                self._candidates[0] is not accelerator or
+                self._candidates[1].requested is not self.tile_binning):
+            self._candidates = (accelerator,
+                                ScreenBins(self, scene.objects, accelerator,
+                                           binning=self.tile_binning))
+        return self._candidates[1]
+
+    def primary_candidates(self, scene: scenes.Scene,
+                           tile: Optional[Tile]=None) -> bvh.BVH:
+        """Return a BVH over the scene's objects that primary rays through
+        the tile could hit, or through any pixel if `tile` is None.  These are
+        the only ones primary rays need to be tested against
+        """
+        return self.screen_bins(scene).candidates(tile)
+
     def ray_for_pixel(self, pixel_x: int, pixel_y: int) -> rays.Ray:
         """Given the x and y indices of a pixel, get the ray that is fired"""
 
-        xoffset = (pixel_x + 0.5) * self.pixel_size
-        yoffset = (pixel_y + 0.5) * self.pixel_size
+        return self.rays_for_tile((pixel_x, pixel_y,
+                                   pixel_x + 1, pixel_y + 1))[0]
+
+    def rays_for_tile(self, tile: Tile,
+                      offset: Tuple[float, float]=(0.5, 0.5)
+                      ) -> List[rays.Ray]:
+        """Return the rays fired through every pixel in the tile, in row-major
+        order.  `offset` is where in each pixel the ray passes, as fractions
+        of the pixel's width and height from its top left corner
+        """
+
+        x_min, y_min, x_max, y_max = tile
+
+        # Rows of the inverse transform.  The canvas is at z=-1 in camera
+        # space, so every canvas point is (world_x, world_y, -1, 1)
+        row_0, row_1, row_2 = (self.inverse_transform.get_row(i)
+                               for i in range(3))
+        origin = self.origin
+        origin_x, origin_y, origin_z = origin.x, origin.y, origin.z
+
+        world_xs = [self.half_width - (pixel_x + offset[0]) * self.pixel_size
+                    for pixel_x in range(x_min, x_max)]
+
+        tile_rays = []
+        for pixel_y in range(y_min, y_max):
+            world_y = self.half_height - (pixel_y + offset[1]) * self.pixel_size
+
+            # The parts of the transformed canvas point that are the same
+            # along the whole row
+            row_x = row_0[1] * world_y - row_0[2] + row_0[3]
+            row_y = row_1[1] * world_y - row_1[2] + row_1[3]
+            row_z = row_2[1] * world_y - row_2[2] + row_2[3]
+
+            for world_x in world_xs:
+                direction_x = row_0[0] * world_x + row_x - origin_x
+                direction_y = row_1[0] * world_x + row_y - origin_y
+                direction_z = row_2[0] * world_x + row_z - origin_z
+
+                length = math.sqrt(direction_x * direction_x +
+                                   direction_y * direction_y +
+                                   direction_z * direction_z)
+
+                tile_rays.append(rays.Ray(
+                    origin,
+                    vectors.Vector(direction_x / length,
+                                   direction_y / length,
+                                   direction_z / length)))
+        return tile_rays
+
+    def rays_for_row(self, pixel_y: int,
+                     offset: Tuple[float, float]=(0.5, 0.5)) -> List[rays.Ray]:
+        """Return the rays fired through every pixel in a row of the image"""
+        return self.rays_for_tile((0, pixel_y, self.hsize, pixel_y + 1), offset)
 
-        world_x = self.half_width - xoffset
-        world_y = self.half_height - yoffset
+    def rays_for_image(self, offset: Tuple[float, float]=(0.5, 0.5)
+                       ) -> List[rays.Ray]:
+        """Return the rays fired through every pixel in the image, in
+        row-major order
+        """
+        return self.rays_for_tile((0, 0, self.hsize, self.vsize), offset)
 
-        # Using the camera's transform, change the canvas point and origin.
-        # remember the canvas is at z=-1
-        pixel = self.transform.inverse() * points.Point(world_x, world_y, -1)
-        origin = self.transform.inverse() * points.Point(0, 0, 0)
-        direction = (pixel - origin).normalize()
+    def tiles(self, tile_size: int=DEFAULT_TILE_SIZE) -> Iterator[Tile]:
+        """Split the image into square tiles of edge `tile_size` pixels (tiles
+        on the right and bottom edges may be smaller) and yield them in
+        row-major order
+        """
 
-        return rays.Ray(origin, direction)
+        for y_min in range(0, self.vsize, tile_size):
+            for x_min in range(0, self.hsize, tile_size):
+                yield (x_min, y_min,
+                       min(x_min + tile_size, self.hsize),
+                       min(y_min + tile_size, self.vsize))
 
-    def render(self, scene: scenes.Scene):
-        """Renders a scene and returns a filled in canvas"""
+    def render_tile(self, scene: scenes.Scene, tile: Tile,
+                    stats: Optional[render_stats.RenderStats]=None
+                    ) -> List[colors.Color]:
+        """Trace every pixel in the tile and return their colors in row-major
+        order.  If `stats` is given, the work done is counted in it
+        """
 
-        logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+        tile_rays = self.rays_for_tile(tile)
+        candidates = self.primary_candidates(scene, tile)
+        if stats is None:
+            return [scene.color_at(ray, candidates=candidates)[0]
+                    for ray in tile_rays]
+
+        stats.count_ray(render_stats.PRIMARY, len(tile_rays))
+        return [scene.color_at(ray, stats=stats, candidates=candidates)[0]
+                for ray in tile_rays]
+
+    def render(self, scene: scenes.Scene,                 # pylint: disable=R0913
+               processes: Optional[int]=1,
+               tile_size: int=DEFAULT_TILE_SIZE,
+               checkpoint: Optional[str]=None,
+               checkpoint_interval: float=
+               checkpoints.DEFAULT_CHECKPOINT_INTERVAL,
+               progress: Optional[progress_hooks.Progress]=None,
+               stats: Optional[render_stats.RenderStats]=None,
+               profile: Optional[str]=None):
+        """Renders a scene and returns a filled in canvas
+
+        :param processes: The number of worker processes to trace tiles in.
+            With 1 (the default) the scene is rendered serially in this
+            process, and with None one worker is started per CPU.  The output
+            is identical whichever is used
+        :param tile_size: The edge length, in pixels, of the tiles that work
+            is split into
+        :param checkpoint: If given, the path of a checkpoint file.  Finished
+            tiles are written to it every `checkpoint_interval` seconds, and if
+            it already exists the tiles in it are reused rather than rendered
+            again.  Resuming with a different scene, camera or tile size
+            raises CheckpointMismatchError
+        :param progress: An observer told as each tile is finished, see the
+            `progress` module.  By default nothing is reported
+        :param stats: If given, a `stats.RenderStats` that counts the rays
+            fired and intersection tests made for the tiles traced
+        :param profile: If given, the render runs under cProfile, the profile
+            is saved to this path and the hottest functions are printed.  Only
+            this process is profiled, so use it with `processes=1`
+        """
+
+        if profile is not None:
+            with profiling.profiled(profile):
+                return self.render(scene, processes, tile_size, checkpoint,
+                                   checkpoint_interval, progress, stats)
+
+        if progress is None:
+            progress = progress_hooks.Progress()
 
         time_0 = time.time()
-        logging.info(f"Starting to render scene with size "
-                     f"{self.hsize}, {self.vsize}")
+        total_pixels = self.hsize * self.vsize
+        progress.start(total_pixels)
+        image = canvas.Canvas(self.hsize, self.vsize)
+
+        if processes is None:
+            processes = os.cpu_count() or 1
+
+        with contextlib.ExitStack() as stack:
+            done: Dict[Tile, List[colors.Color]] = {}
+            saver = None
+            if checkpoint is not None:
+                saver = stack.enter_context(checkpoints.Checkpoint(
+                    checkpoint, self, scene, tile_size, checkpoint_interval))
+                done = saver.load()
+                for tile, pixels in done.items():
+                    image.set_tile(tile, pixels)
+
+            tiles = [tile for tile in self.tiles(tile_size)
+                     if tile not in done]
+            pixels_done = total_pixels - sum((x_max - x_min) * (y_max - y_min)
+                                             for x_min, y_min, x_max, y_max
+                                             in tiles)
+
+            if processes == 1:
+                # Build the BVH, and bin the objects in view, before tracing.
+                # Worker processes build their own, so this is only done here
+                # when rendering serially
+                self.screen_bins(scene)
+                traced = ((tile, self.render_tile(scene, tile, stats))
+                          for tile in tiles)
+            else:
+                executor = stack.enter_context(
+                    self.process_pool(scene, processes))
+                if stats is None:
+                    traced = zip(tiles, executor.map(_render_tile, tiles))
+                else:
+                    traced = zip(tiles, _merge_stats(
+                        stats, executor.map(_render_tile_with_stats, tiles)))
+
+            for tile, pixels in traced:
+                image.set_tile(tile, pixels)
+                if saver is not None:
+                    saver.record(tile, pixels)
+                pixels_done += len(pixels)
+                progress.tile_done(tile, pixels_done, total_pixels,
+                                   time.time() - time_0)
+
+        progress.finish(total_pixels, time.time() - time_0)
+
+        return image
+
+    def render_progressive(self, scene: scenes.Scene,
+                           callback: Optional[Callable[[canvas.Canvas, int],
+                                                       None]]=None,
+                           steps: Sequence[int]=DEFAULT_PROGRESSIVE_STEPS
+                           ) -> canvas.Canvas:
+        """Render a scene in coarse-to-fine passes and return the final canvas,
+        which is identical to that from `render`.
+
+        A pass with step `s` traces every `s`th pixel in each direction, and
+        each pixel is traced at most once over all the passes.  After each
+        pass, every pixel that has not been traced yet is filled with the
+        color of the traced pixel at the top left of its `s` x `s` block, and
+        `callback` is called with the canvas and `s`.  Each step must divide
+        the one before it, and the last must be 1.
+        """
+
+        if steps[-1] != 1:
+            raise ValueError("The last progressive step must be 1")
+
         image = canvas.Canvas(self.hsize, self.vsize)
+        traced = [[False] * self.vsize for _ in range(self.hsize)]
+        bins = self.screen_bins(scene)
+
+        for step in steps:
+            for y in range(0, self.vsize, step):
+                for x in range(0, self.hsize, step):
+                    if not traced[x][y]:
+                        ray = self.ray_for_pixel(x, y)
+                        color, _ = scene.color_at(
+                            ray, candidates=bins.candidates((x, y, x + 1,
+                                                             y + 1)))
+                        image.set(x, y, color)
+                        traced[x][y] = True
 
-        for y in range(self.vsize):
-            print(y)
-            for x in range(self.hsize):
-                ray = self.ray_for_pixel(x, y)
-                color, _ = scene.color_at(ray)
-                image.set(x, y, color)
+            if step > 1:
+                for y in range(self.vsize):
+                    for x in range(self.hsize):
+                        if not traced[x][y]:
+                            image.set(x, y, image.get(x - x % step,
+                                                      y - y % step))
 
-        time_1 = time.time()
-        logging.info(f"Rendered scene in {round(time_1-time_0, 2)}s "
-                     f"({round(self.hsize*self.vsize/(time_1-time_0), 2)} pps)")
+            if callback is not None:
+                callback(image, step)
 
         return image
+
+    def process_pool(self, scene: scenes.Scene,
+                     processes: Optional[int]=None) -> "TilePool":
+        """Return a process pool whose workers hold this camera and scene, for
+        use as the executor of `render_async`
+        """
+        return TilePool(self, scene, processes)
+
+    async def render_tiles_async(self, scene: scenes.Scene,
+                                 executor: Optional[futures.Executor]=None,
+                                 tile_size: int=DEFAULT_TILE_SIZE,
+                                 max_pending: Optional[int]=None
+                                 ) -> AsyncIterator[Tuple[Tile,
+                                                          List[colors.Color]]]:
+        """Trace the image's tiles on `executor` (the event loop's default
+        executor if None), yielding each tile and its pixels as it completes.
+
+        At most `max_pending` tiles (by default one per CPU) are handed to the
+        executor at a time.  If the iteration is cancelled or abandoned, tiles
+        that have not started are cancelled, so only those already running
+        keep using CPU.
+        """
+
+        loop = asyncio.get_running_loop()
+        if max_pending is None:
+            max_pending = os.cpu_count() or 1
+
+        # Worker processes of a pool for this camera and scene build their
+        # own BVH and bins.  Otherwise build them here, rather than in
+        # whichever thread traces first
+        in_pool = (isinstance(executor, TilePool) and
+                   executor.camera is self and executor.scene is scene)
+        if not in_pool:
+            self.screen_bins(scene)
+        tiles = self.tiles(tile_size)
+        pending = {}
+
+        def submit(tile: Tile) -> None:
+            if in_pool:
+                future = loop.run_in_executor(executor, _render_tile, tile)
+            else:
+                future = loop.run_in_executor(executor, self.render_tile,
+                                              scene, tile)
+            pending[future] = tile
+
+        try:
+            for tile in itertools.islice(tiles, max_pending):
+                submit(tile)
+
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    tile = pending.pop(future)
+                    next_tile = next(tiles, None)
+                    if next_tile is not None:
+                        submit(next_tile)
+                    yield tile, future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def render_async(self, scene: scenes.Scene,
+                           executor: Optional[futures.Executor]=None,
+                           tile_size: int=DEFAULT_TILE_SIZE,
+                           timeout: Optional[float]=None) -> canvas.Canvas:
+        """Render a scene without blocking the event loop, offloading tiles to
+        `executor` as in `render_tiles_async`.  Raises asyncio.TimeoutError,
+        and stops queueing tiles, if the render takes longer than `timeout`
+        seconds
+        """
+
+        async def assemble() -> canvas.Canvas:
+            image = canvas.Canvas(self.hsize, self.vsize)
+            tiles = self.render_tiles_async(scene, executor, tile_size)
+            try:
+                async for tile, pixels in tiles:
+                    image.set_tile(tile, pixels)
+            finally:
+                await tiles.aclose()
+            return image
+
+        return await asyncio.wait_for(assemble(), timeout)
+
+
+class ScreenBins:
+    """The objects in a camera's view, sorted into square cells of the image
+    by the pixels they could appear in, so that the primary rays through a
+    tile are only tested against the objects that overlap it.  Unbounded
+    objects are in every cell.  If given, `everything` is a BVH over all of
+    the objects, which the BVHs over the objects in view are pruned from.
+
+    Finding every object's extent and pruning a BVH for every tile costs
+    more than it saves when there are many objects, so if `binning` is None
+    the objects are only culled and sorted into cells when there are at most
+    BINNING_OBJECTS_PER_PIXEL of them per pixel of a cell.  Otherwise every
+    tile gets the BVH over all the objects.  `binning` True or False forces
+    the choice, and False still culls the objects out of view
+    """
+
+    def __init__(self, camera: Camera,                   # pylint: disable=R0913
+                 objects: Sequence, everything: Optional[bvh.BVH]=None,
+                 cell_size: int=DEFAULT_TILE_SIZE,
+                 binning: Optional[bool]=None) -> None:
+
+        self.cell_size = cell_size
+        self.requested = binning
+
+        if binning is None:
+            binning = (len(objects) <=
+                       BINNING_OBJECTS_PER_PIXEL * cell_size * cell_size)
+        self.binned = binning
+
+        columns = -(-camera.hsize // cell_size)
+        rows = -(-camera.vsize // cell_size)
+        self.cells: List[List[list]] = [[[] for _ in range(columns)]
+                                        for _ in range(rows)]
+
+        # BVHs over the objects in each rectangle of cells asked for so far
+        self._by_cells: Dict[Tuple[int, int, int, int], bvh.BVH] = {}
+
+        if not binning and self.requested is None:
+            # Too many objects for culling to pay off
+            self.visible = everything if everything is not None \
+                else bvh.BVH(objects)
+            return
+
+        extents = []
+        for shape in objects:
+            extent = camera.screen_extent(shape.world_bounds())
+            if extent is not None:
+                extents.append((shape, extent))
+        visible = [shape for shape, _ in extents]
+
+        if binning:
+            for shape, (x_min, y_min, x_max, y_max) in extents:
+                for row in range(y_min // cell_size,
+                                 (y_max - 1) // cell_size + 1):
+                    for column in range(x_min // cell_size,
+                                        (x_max - 1) // cell_size + 1):
+                        self.cells[row][column].append(shape)
+
+        # A BVH over every object in view, which `everything` already is if
+        # none were culled, and can be pruned down to otherwise
+        if everything is None:
+            self.visible = bvh.BVH(visible)
+        elif len(visible) == len(objects):
+            self.visible = everything
+        else:
+            self.visible = bvh.BVH.subset(everything, visible)
+
+    def __repr__(self) -> str:
+        return (f"ScreenBins [cell_size={self.cell_size} "
+                f"binned={self.binned} visible={self.visible}]")
+
+    def candidates(self, tile: Optional[Tile]=None) -> bvh.BVH:
+        """Return a BVH over the objects in the cells that the tile overlaps,
+        or over every object in view if `tile` is None or the objects weren't
+        sorted into cells
+        """
+
+        if tile is None or not self.binned:
+            return self.visible
+
+        x_min, y_min, x_max, y_max = tile
+        key = (x_min // self.cell_size, y_min // self.cell_size,
+               (x_max - 1) // self.cell_size, (y_max - 1) // self.cell_size)
+        found = self._by_cells.get(key)
+        if found is None:
+            shapes: list = []
+            seen = set()
+            for row in self.cells[key[1]:key[3] + 1]:
+                for cell in row[key[0]:key[2] + 1]:
+                    for shape in cell:
+                        if id(shape) not in seen:
+                            seen.add(id(shape))
+                            shapes.append(shape)
+            if len(shapes) == self.visible.size + len(self.visible.unbounded):
+                found = self.visible
+            else:
+                found = bvh.BVH.subset(self.visible, shapes)
+            self._by_cells[key] = found
+        return found
+
+
+class TilePool(futures.ProcessPoolExecutor):
+    """A process pool whose workers each receive the camera and scene once,
+    when they start, rather than with every tile
+    """
+
+    def __init__(self, camera: Camera, scene: scenes.Scene,
+                 processes: Optional[int]=None) -> None:
+
+        self.camera = camera
+        self.scene = scene
+        super().__init__(max_workers=processes, initializer=_init_worker,
+                         initargs=(camera, scene))
+
+
+# The camera and scene being rendered by a worker process, set once when the
+# worker starts by _init_worker
+_WORKER_STATE: dict = {}
+
+def _init_worker(camera: Camera, scene: scenes.Scene) -> None:
+    """Process pool initializer, stores the camera and scene in the worker"""
+    _WORKER_STATE["camera"] = camera
+    _WORKER_STATE["scene"] = scene
+
+def _render_tile(tile: Tile) -> List[colors.Color]:
+    """Render a tile using the camera and scene held by this worker process"""
+    return _WORKER_STATE["camera"].render_tile(_WORKER_STATE["scene"], tile)
+
+def _render_tile_with_stats(tile: Tile) -> Tuple[List[colors.Color],
+                                                 render_stats.RenderStats]:
+    """Render a tile in this worker process, and return the statistics for the
+    tile along with its pixels
+    """
+    stats = render_stats.RenderStats()
+    pixels = _WORKER_STATE["camera"].render_tile(_WORKER_STATE["scene"], tile,
+                                                 stats)
+    return pixels, stats
+
+def _merge_stats(stats: render_stats.RenderStats,
+                 results: Iterator[Tuple[List[colors.Color],
+                                         render_stats.RenderStats]]
+                 ) -> Iterator[List[colors.Color]]:
+    """Merge the statistics returned by workers into `stats`, yielding the
+    pixels of each tile
+    """
+    for pixels, tile_stats in results:
+        stats.merge(tile_stats)
+        yield pixels
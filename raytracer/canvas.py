@@ -2,13 +2,22 @@
 Also contains utility  functions to write the canvas to disk
 """
 
-from typing import Union
+from array import array
+from typing import List, Sequence, Tuple, Union
+import struct
+import sys
 
 import colors
 
 # The maximum number of characters in a line of a ppm file
 MAX_LINE_LEN = 70
 
+# The (x_min, y_min, x_max, y_max) header of a packed tile of pixels
+TILE_HEADER = struct.Struct("<IIII")
+
+# The number of bytes per pixel in a packed tile, three doubles
+PACKED_PIXEL_SIZE = 24
+
 class Canvas:
     """At its heart, the canvas is a 2d array where you can write a color to
     each pixel.  The canvas also handles dumping this structure to an image.
@@ -32,6 +41,18 @@ class Canvas:
         """Retrieve the value of the pixel at `x_coord`, `y_coord`"""
         return self.canvas[x_coord][y_coord]
 
+    def set_tile(self, tile: Tuple[int, int, int, int],
+                 pixels: Sequence[colors.Color]) -> None:
+        """Fill the half-open rectangle `tile`, given as
+        (x_min, y_min, x_max, y_max), with `pixels` in row-major order
+        """
+        x_min, y_min, x_max, y_max = tile
+        index = 0
+        for y_coord in range(y_min, y_max):
+            for x_coord in range(x_min, x_max):
+                self.canvas[x_coord][y_coord] = pixels[index]
+                index += 1
+
     @staticmethod
     def clamp(minval: Union[int, float], val: Union[int, float],
               maxval: Union[int, float]) -> float:
@@ -76,3 +97,36 @@ class Canvas:
         content = self._get_ppm_file_content()
         with open(filename, "w") as file_handle:
             file_handle.write(content)
+
+
+def pack_tile(tile: Tuple[int, int, int, int],
+              pixels: Sequence[colors.Color]) -> bytes:
+    """Pack a tile and its pixels, in row-major order, into a compact block of
+    little-endian values: the tile's four corners as unsigned ints and then
+    r, g, b doubles per pixel
+    """
+
+    values = array("d")
+    for pixel in pixels:
+        values.append(pixel.red)
+        values.append(pixel.green)
+        values.append(pixel.blue)
+
+    if sys.byteorder == "big":
+        values.byteswap()
+    return TILE_HEADER.pack(*tile) + values.tobytes()
+
+
+def unpack_tile(block: bytes) -> Tuple[Tuple[int, int, int, int],
+                                       List[colors.Color]]:
+    """Unpack a block written by `pack_tile` into a tile and its pixels"""
+
+    tile = TILE_HEADER.unpack_from(block)
+    values = array("d")
+    values.frombytes(block[TILE_HEADER.size:])
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    pixels = [colors.Color(values[i], values[i+1], values[i+2])
+              for i in range(0, len(values), 3)]
+    return tile, pixels
@@ -0,0 +1,182 @@
+"""Module persists the finished tiles of a render to a checkpoint file, so that
+a render that is killed part of the way through can be resumed.
+
+The checkpoint is a compact binary file.  It starts with a header holding a
+fingerprint of the camera and scene, the image size and the tile size.  Tiles
+are matched by their exact rectangle, so a checkpoint can only be resumed with
+the tile size it was written with.  Each finished tile
+is then appended as a block written by `canvas.pack_tile`.  A block that was
+only partly written when the render died is discarded on resume.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import os
+import struct
+import time
+
+import canvas
+import colors
+import exceptions
+import matrices
+import tuples
+
+MAGIC = b"RTCKPT02"
+
+# Magic, fingerprint, image width and height, and then tile size
+HEADER = struct.Struct("<8s32sIII")
+
+# How often, in seconds, finished tiles are flushed to disk
+DEFAULT_CHECKPOINT_INTERVAL = 10.0
+
+# Attributes that don't change what is rendered, so are left out of the
+# fingerprint.  Shapes get a random id each time they are created, count how
+# often their transform has been set, and materials point back at their shape
+_UNFINGERPRINTED = {"id", "transform_version", "shape"}
+
+Tile = Tuple[int, int, int, int]
+
+
+def _describe(value: Any) -> Any:
+    """Reduce a camera or scene to nested lists of type names and numbers,
+    which only depend on what will be rendered
+    """
+
+    if isinstance(value, matrices.Matrix):
+        return [type(value).__name__,
+                [_describe(value.get_row(row)) for row in range(value.rows)]]
+
+    if isinstance(value, tuples.Tuple):
+        return [type(value).__name__, _describe(value.values())]
+
+    if isinstance(value, (list, tuple)):
+        return [_describe(item) for item in value]
+
+    if isinstance(value, float):
+        # repr round-trips floats exactly
+        return repr(value)
+
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+
+    attributes = sorted((key, item) for key, item in vars(value).items()
+                        if not key.startswith("_") and
+                        key not in _UNFINGERPRINTED)
+    return [type(value).__name__,
+            [[key, _describe(item)] for key, item in attributes]]
+
+
+def fingerprint(camera: Any, scene: Any) -> bytes:
+    """Return a sha256 digest of everything about the camera and scene that
+    affects the rendered image
+    """
+    description = repr(_describe([camera, scene])).encode("utf-8")
+    return hashlib.sha256(description).digest()
+
+
+class Checkpoint:
+    """A checkpoint file for rendering a scene through a camera in tiles of
+    edge `tile_size`.  `load` returns the tiles that are already finished,
+    and `record` appends newly finished ones, writing them to disk every
+    `interval` seconds
+    """
+
+    def __init__(self, path: str, camera: Any,              # pylint: disable=R0913
+                 scene: Any, tile_size: int,
+                 interval: float=DEFAULT_CHECKPOINT_INTERVAL) -> None:
+
+        self.path = path
+        self.interval = interval
+        self.width = camera.hsize
+        self.height = camera.vsize
+        self.tile_size = tile_size
+        self.fingerprint = fingerprint(camera, scene)
+
+        self._file: Optional[Any] = None
+        self._buffer: List[bytes] = []
+        self._last_flush = time.time()
+
+    def __enter__(self) -> "Checkpoint":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def load(self) -> Dict[Tile, List[colors.Color]]:
+        """Open the checkpoint file, creating it if it doesn't exist, and
+        return the finished tiles in it.  Raises CheckpointMismatchError if it
+        was written for a different camera, scene or tile size
+        """
+
+        done: Dict[Tile, List[colors.Color]] = {}
+
+        if not os.path.exists(self.path):
+            self._file = open(self.path, "wb")
+            self._file.write(HEADER.pack(MAGIC, self.fingerprint,
+                                         self.width, self.height,
+                                         self.tile_size))
+            self._file.flush()
+            return done
+
+        with open(self.path, "rb") as file_handle:
+            content = file_handle.read()
+
+        if len(content) < HEADER.size:
+            raise exceptions.CheckpointMismatchError(
+                f"{self.path} is not a render checkpoint")
+
+        magic, digest, width, height, tile_size = HEADER.unpack_from(content)
+        if magic != MAGIC:
+            raise exceptions.CheckpointMismatchError(
+                f"{self.path} is not a render checkpoint, or was written by "
+                f"an older version")
+        if (digest != self.fingerprint or width != self.width or
+                height != self.height):
+            raise exceptions.CheckpointMismatchError(
+                f"{self.path} was written for a different scene or camera")
+        if tile_size != self.tile_size:
+            raise exceptions.CheckpointMismatchError(
+                f"{self.path} was written with a tile size of {tile_size}, "
+                f"not {self.tile_size}")
+
+        offset = HEADER.size
+        while offset + canvas.TILE_HEADER.size <= len(content):
+            x_min, y_min, x_max, y_max = canvas.TILE_HEADER.unpack_from(
+                content, offset)
+            end = (offset + canvas.TILE_HEADER.size +
+                   (x_max - x_min) * (y_max - y_min) * canvas.PACKED_PIXEL_SIZE)
+            if end > len(content):
+                break
+            tile, pixels = canvas.unpack_tile(content[offset:end])
+            done[tile] = pixels
+            offset = end
+
+        # Drop any block that was cut short, then carry on appending
+        self._file = open(self.path, "r+b")
+        self._file.truncate(offset)
+        self._file.seek(offset)
+        return done
+
+    def record(self, tile: Tile, pixels: List[colors.Color]) -> None:
+        """Add a finished tile to the checkpoint"""
+
+        self._buffer.append(canvas.pack_tile(tile, pixels))
+        if time.time() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all recorded tiles to disk"""
+
+        if self._file is None:
+            return
+        self._file.write(b"".join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+        self._last_flush = time.time()
+
+    def close(self) -> None:
+        """Flush recorded tiles and close the checkpoint file"""
+
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
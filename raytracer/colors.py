@@ -2,37 +2,68 @@
 values with some utility functions attached
 """
 
-import numbers
-
 import tuples
 
 class Color(tuples.Tuple):
     """This class represents a color.  It is initialized with
-    red, green, and blue components
+    red, green, and blue components.  Like the points and vectors, the
+    components live in slots and the arithmetic is unrolled
     """
 
-    def __init__(self, red: float, green: float, blue: float) -> None:
-
-        # These are here so that mypy can figure out the attributres exist
-        self.red = 0
-        self.green = 0
-        self.blue = 0
+    __slots__ = ("red", "green", "blue")
+    fillables = ("red", "green", "blue")
 
-        super().__init__(["red", "green", "blue"], red, green, blue)
+    def __init__(self, red: float, green: float,           # pylint: disable=W0231
+                 blue: float) -> None:
+        self.red = red
+        self.green = green
+        self.blue = blue
 
     def __repr__(self) -> str:
         return f"Color [r={self.red}, g={self.green}, b={self.blue}]"
 
+    def __add__(self, other):
+        try:
+            return Color(self.red + other.red, self.green + other.green,
+                         self.blue + other.blue)
+        except AttributeError:
+            return super().__add__(other)
+
+    def __sub__(self, other):
+        try:
+            return Color(self.red - other.red, self.green - other.green,
+                         self.blue - other.blue)
+        except AttributeError:
+            return super().__sub__(other)
+
+    def __neg__(self):
+        return Color(-self.red, -self.green, -self.blue)
+
     def __mul__(self, other):
 
-        if isinstance(other, float) or isinstance(other, int):
-            # If the other item is a number, use the parent scalar
-            # multiplication
-            return super().__mul__(other)
-
-        else:
-            # Else we calculate the Hadamard product of the color, which is
-            # the color (r1*r2, g1*g2, b1*b2)
-            output_fillables = [
-                getattr(self, f) * getattr(other, f) for f in self.fillables]
-            return Color(*output_fillables)
+        if isinstance(other, (float, int)):
+            # If the other item is a number, scale each component
+            return Color(self.red * other, self.green * other,
+                         self.blue * other)
+
+        # Else we calculate the Hadamard product of the color, which is
+        # the color (r1*r2, g1*g2, b1*b2)
+        return Color(self.red * other.red, self.green * other.green,
+                     self.blue * other.blue)
+
+    def __truediv__(self, other):
+        return Color(self.red / other, self.green / other, self.blue / other)
+
+    def __eq__(self, other):
+        try:
+            return (abs(self.red - other.red) < 1e-3 and
+                    abs(self.green - other.green) < 1e-3 and
+                    abs(self.blue - other.blue) < 1e-3)
+        except AttributeError:
+            return super().__eq__(other)
+
+    def values(self) -> list:
+        return [self.red, self.green, self.blue]
+
+    def with_values(self, values):
+        return Color(*values)
@@ -0,0 +1,360 @@
+"""Module distributes the rendering of a scene across worker processes on other
+machines.
+
+A worker listens on a TCP port.  The coordinator connects to every worker,
+sends it the pickled camera and scene once, and then hands out tiles one at a
+time.  Workers reply with the traced pixels as a compact block of doubles
+rather than pickled `Color` objects.  If a worker dies, or its connection
+drops, the tile it was working on is handed to one of the remaining workers.
+
+Every message on the wire is a one byte message type and a four byte payload
+length, followed by the payload:
+
+    S  the pickled (camera, scene) pair, sent once per connection, after an
+       HMAC-SHA256 of the pickle made with the shared key
+    T  a tile job, four little-endian unsigned ints
+       (x_min, y_min, x_max, y_max)
+    P  a tile result, packed by `canvas.pack_tile`
+    E  an error raised by the worker, as utf-8 text
+    Q  the coordinator has no more work, the worker closes the connection
+
+Unpickling runs code chosen by whoever wrote the pickle, so a worker only
+unpickles scenes signed with the key it shares with the coordinator.  The key
+is given to `Worker` and `Coordinator`, or read from the RAYTRACER_KEY
+environment variable, and neither will start without one.  Nothing else is
+authenticated or encrypted, and anyone who has the key can run code on the
+workers, so workers listen on loopback by default, and should only ever be
+exposed on a trusted network.
+
+A worker can be started from the command line with:
+
+    RAYTRACER_KEY=... python raytracer/distributed.py --host 10.0.0.2 --port 7878
+"""
+from typing import List, Optional, Sequence, Tuple
+import argparse
+import hashlib
+import hmac
+import os
+import pickle
+import queue
+import socket
+import struct
+import threading
+
+import cameras
+import canvas
+import colors
+import exceptions
+import scenes
+
+HEADER = struct.Struct("!cI")
+TILE = canvas.TILE_HEADER
+
+MSG_SCENE = b"S"
+MSG_TILE = b"T"
+MSG_PIXELS = b"P"
+MSG_ERROR = b"E"
+MSG_QUIT = b"Q"
+
+# Seconds the coordinator waits on a worker before it is presumed dead
+DEFAULT_TIMEOUT = 300.0
+
+# The environment variable the shared key is read from if none is given
+KEY_VARIABLE = "RAYTRACER_KEY"
+
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+def _shared_key(key: Optional[bytes]) -> bytes:
+    """Return the key, or the one in the environment if it is None, raising
+    ValueError if there is neither
+    """
+    if key is None:
+        key = os.environ.get(KEY_VARIABLE, "").encode("utf-8")
+    if not key:
+        raise ValueError(f"A shared key is needed, pass one or set "
+                         f"{KEY_VARIABLE}")
+    return key
+
+
+def sign(key: bytes, payload: bytes) -> bytes:
+    """Return the payload with its HMAC-SHA256 in front"""
+    return hmac.new(key, payload, hashlib.sha256).digest() + payload
+
+
+def verify(key: bytes, message: bytes) -> Optional[bytes]:
+    """Return the payload of a message made by `sign`, or None if it wasn't
+    signed with the key
+    """
+    signature, payload = message[:SIGNATURE_SIZE], message[SIGNATURE_SIZE:]
+    expected = hmac.new(key, payload, hashlib.sha256).digest()
+    if len(signature) != SIGNATURE_SIZE or \
+       not hmac.compare_digest(signature, expected):
+        return None
+    return payload
+
+
+def send_message(sock: socket.socket, kind: bytes, payload: bytes=b"") -> None:
+    """Write one message to the socket"""
+    sock.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly `size` bytes, raising ConnectionError if the peer closes
+    the connection first
+    """
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed by peer")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Tuple[bytes, bytes]:
+    """Read one message from the socket and return its type and payload"""
+    kind, size = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    return kind, _recv_exactly(sock, size)
+
+
+def _tile_pixels(kind: bytes, payload: bytes,
+                 tile: cameras.Tile) -> List[colors.Color]:
+    """Decode a worker's reply to the job for `tile`, raising ValueError or
+    struct.error if it isn't a well-formed block of that tile's pixels
+    """
+
+    if kind != MSG_PIXELS:
+        raise ValueError(f"Unexpected message type {kind!r}")
+    done_tile, pixels = canvas.unpack_tile(payload)
+    if done_tile != tuple(tile):
+        raise ValueError(f"Sent tile {tile}, got {done_tile} back")
+    x_min, y_min, x_max, y_max = tile
+    if len(pixels) != (x_max - x_min) * (y_max - y_min):
+        raise ValueError(f"Wrong number of pixels for tile {tile}")
+    return pixels
+
+
+class Worker:
+    """A render worker.  Listens on a TCP port and renders tiles for one
+    coordinator connection at a time.  Only scenes signed with `key` are
+    accepted, see the module docstring
+    """
+
+    def __init__(self, host: str="127.0.0.1", port: int=0,
+                 key: Optional[bytes]=None) -> None:
+
+        self.key = _shared_key(key)
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]
+        self._closed = False
+
+    def serve_forever(self) -> None:
+        """Accept coordinator connections until `close` is called"""
+
+        while not self._closed:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                # The listening socket was closed under us
+                return
+
+            with conn:
+                try:
+                    self.handle(conn)
+                except (ConnectionError, OSError):
+                    pass
+
+    def handle(self, conn: socket.socket) -> None:
+        """Serve tile requests from a single coordinator connection.  A
+        message that is unsigned, malformed or unexpected is answered with an
+        error, and the connection dropped
+        """
+
+        kind, payload = recv_message(conn)
+        if kind != MSG_SCENE:
+            send_message(conn, MSG_ERROR, b"Expected a scene")
+            return
+        blob = verify(self.key, payload)
+        if blob is None:
+            send_message(conn, MSG_ERROR, b"The scene was not signed with "
+                                          b"this worker's key")
+            return
+        try:
+            camera, scene = pickle.loads(blob)
+        except Exception as exc:                 # pylint: disable=W0703
+            send_message(conn, MSG_ERROR,
+                         f"Could not load the scene: {exc!r}".encode("utf-8"))
+            return
+
+        while True:
+            kind, payload = recv_message(conn)
+            if kind == MSG_QUIT:
+                return
+            if kind != MSG_TILE:
+                send_message(conn, MSG_ERROR,
+                             f"Unexpected message type {kind!r}".encode(
+                                 "utf-8"))
+                return
+
+            try:
+                tile = TILE.unpack(payload)
+            except struct.error as exc:
+                send_message(conn, MSG_ERROR,
+                             f"Malformed tile: {exc}".encode("utf-8"))
+                return
+
+            try:
+                pixels = camera.render_tile(scene, tile)
+            except Exception as exc:             # pylint: disable=W0703
+                send_message(conn, MSG_ERROR, repr(exc).encode("utf-8"))
+                return
+            send_message(conn, MSG_PIXELS, canvas.pack_tile(tile, pixels))
+
+    def close(self) -> None:
+        """Stop accepting connections"""
+        self._closed = True
+        self.server.close()
+
+
+class Coordinator:
+    """Renders a scene by farming tiles out to a list of workers, given as
+    (host, port) pairs, which share the key `key`
+    """
+
+    def __init__(self, workers: Sequence[Tuple[str, int]],
+                 tile_size: int=cameras.DEFAULT_TILE_SIZE,
+                 timeout: float=DEFAULT_TIMEOUT,
+                 key: Optional[bytes]=None) -> None:
+
+        self.key = _shared_key(key)
+        self.workers = list(workers)
+        self.tile_size = tile_size
+        self.timeout = timeout
+
+    def render(self, scene: scenes.Scene,
+               camera: cameras.Camera) -> canvas.Canvas:
+        """Render the scene through the camera on the workers and return the
+        assembled canvas.  Raises RenderError if every worker fails before
+        the image is complete
+        """
+
+        blob = sign(self.key, pickle.dumps((camera, scene),
+                                           protocol=pickle.HIGHEST_PROTOCOL))
+        tiles = list(camera.tiles(self.tile_size))
+
+        pending: queue.Queue = queue.Queue()
+        for tile in tiles:
+            pending.put(tile)
+
+        image = canvas.Canvas(camera.hsize, camera.vsize)
+        state = _RenderState(len(tiles), len(self.workers))
+
+        threads = [threading.Thread(target=self._drive_worker,
+                                    args=(address, blob, pending, image, state),
+                                    daemon=True)
+                   for address in self.workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if state.error is not None:
+            raise exceptions.RenderError(state.error)
+        if state.remaining > 0:
+            raise exceptions.RenderError(
+                f"All workers failed with {state.remaining} tiles unrendered")
+        return image
+
+    def _drive_worker(self,                              # pylint: disable=R0913
+                      address: Tuple[str, int], blob: bytes,
+                      pending: queue.Queue, image: canvas.Canvas,
+                      state: "_RenderState") -> None:
+        """Feed tiles to a single worker until there are none left, returning
+        any in-flight tile to the queue if the worker fails or sends back
+        something other than that tile's pixels
+        """
+
+        tile: Optional[cameras.Tile] = None
+        try:
+            with socket.create_connection(address,
+                                          timeout=self.timeout) as sock:
+                send_message(sock, MSG_SCENE, blob)
+
+                while not state.finished():
+                    # Checked before waiting on the queue, since a worker
+                    # that fails puts its tile back before it exits
+                    others_alive = state.workers_alive_besides_me()
+                    try:
+                        tile = pending.get(timeout=0.05)
+                    except queue.Empty:
+                        # Other workers hold the last tiles, but one of them
+                        # could yet fail and put its tile back
+                        if not others_alive:
+                            return
+                        continue
+
+                    send_message(sock, MSG_TILE, TILE.pack(*tile))
+                    kind, payload = recv_message(sock)
+
+                    if kind == MSG_ERROR:
+                        state.fail(payload.decode("utf-8"))
+                        return
+
+                    image.set_tile(tile, _tile_pixels(kind, payload, tile))
+                    tile = None
+                    state.tile_done()
+
+                send_message(sock, MSG_QUIT)
+        except (ConnectionError, OSError, ValueError, struct.error):
+            if tile is not None:
+                pending.put(tile)
+        finally:
+            state.worker_exited()
+
+
+class _RenderState:
+    """Book-keeping shared between the coordinator's worker threads"""
+
+    def __init__(self, tiles: int, workers: int) -> None:
+        self.remaining = tiles
+        self.alive = workers
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def finished(self) -> bool:
+        """True once every tile is in, or a worker has reported an error"""
+        return self.remaining == 0 or self.error is not None
+
+    def workers_alive_besides_me(self) -> bool:
+        """True if some other worker could still hand a tile back"""
+        return self.alive > 1 and not self.finished()
+
+    def tile_done(self) -> None:
+        """Record that a tile has been written to the canvas"""
+        with self._lock:
+            self.remaining -= 1
+
+    def worker_exited(self) -> None:
+        """Record that a worker thread has stopped"""
+        with self._lock:
+            self.alive -= 1
+
+    def fail(self, message: str) -> None:
+        """Record an error raised on a worker, which stops the render"""
+        self.error = message
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description=f"Run a render worker.  The key shared with the "
+                    f"coordinator is read from {KEY_VARIABLE}")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="The address to listen on.  Only listen on a "
+                             "trusted network")
+    parser.add_argument("--port", type=int, default=7878)
+    args = parser.parse_args()
+
+    Worker(args.host, args.port).serve_forever()
@@ -7,3 +7,16 @@ class IncompatibleLengthError(Exception):
 
 class CannotInvertMatrixError(Exception):
     """Is raised when you try to invert a matrix that isn't invertable"""
+
+class RenderError(Exception):
+    """Is raised when a render cannot be completed, for example because every
+    worker it was distributed to has failed
+    """
+
+class CheckpointMismatchError(Exception):
+    """Is raised when resuming a render from a checkpoint that was written for
+    a different scene or camera
+    """
+
+class BackendUnavailableError(Exception):
+    """Is raised when selecting a math backend whose library isn't installed"""
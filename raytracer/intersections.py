@@ -112,34 +112,63 @@ class Intersection:
 
 class Intersections:
     """Class represents a list of intersection objects, should always
-    return sorted by t value
+    return sorted by t value.
+
+    Intersections are appended as they are found, and the list is only sorted
+    when `intersections` is read, so collecting the intersections with every
+    object in a scene costs a single sort, or none if only the hit is needed
     """
 
     def __init__(self, *args):
-        self.intersections = list(args)
-        self.intersections.sort(key=lambda x: x.t)
+        self._intersections = list(args)
+        self._sorted = len(self._intersections) < 2
+
+    @property
+    def intersections(self) -> List["Intersection"]:
+        """The intersections, sorted by t value"""
+
+        if not self._sorted:
+            self._intersections.sort(key=lambda x: x.t)
+            self._sorted = True
+        return self._intersections
+
+    def __len__(self) -> int:
+        return len(self._intersections)
 
     def add(self, intersection):
-        self.intersections.append(intersection)
-        self.intersections.sort(key=lambda x: x.t)
+        self._intersections.append(intersection)
+        self._sorted = False
+
+    def extend(self, other: "Intersections") -> None:
+        """Add all of another set of intersections to this one"""
+
+        if other._intersections:
+            self._intersections.extend(other._intersections)
+            self._sorted = False
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
 
     def __add__(self, other):
-        self_intersections = self.intersections
-        other_intersections = other.intersections
-        self_intersections.extend(other_intersections)
-        return Intersections(*self_intersections)
+        combined = Intersections(*self._intersections)
+        combined.extend(other)
+        return combined
 
     def hit(self):
         """Find the lowest non-negative value of t"""
 
         min_t = 1e10
         hit_index = -1
-        for index, intersection in enumerate(self.intersections):
+        # There's no need to sort to find the smallest t.  Sorting is stable,
+        # so taking the first of equal t values in the order they were added
+        # finds the same hit as the sorted list would
+        for index, intersection in enumerate(self._intersections):
             if intersection.t < min_t and intersection.t > 0:
                 hit_index = index
                 min_t = intersection.t
 
         if hit_index > -1:
-            return self.intersections[hit_index]
+            return self._intersections[hit_index]
         else:
             return None
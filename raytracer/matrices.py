@@ -1,6 +1,7 @@
 """Module contains all objects that represent basic matrix types"""
-from typing import Union, List
+from typing import List, Optional, Sequence, Union
 
+import backends
 import exceptions
 import tuples
 
@@ -71,15 +72,13 @@ class Matrix:
 
         if isinstance(other, tuples.Tuple):
 
-            zeros = [0] * len(other.fillables)
-            r = tuples.Tuple(other.fillables, *zeros)
+            other_values = other.values()
+            result = [sum([my_row[j]*other_values[j]
+                           for j in range(self.columns)])
+                      for my_row in self.values]
 
-            for i in range(self.rows):
-                my_row = self.get_row(i)
-                result = sum([my_row[j]*other.values()[j]
-                              for j in range(self.columns)])
-                setattr(r, other.fillables[i], result)
-            return r
+            # The result is the same kind of tuple as the one multiplied
+            return other.with_values(result)
 
         # If we get down here it wasn't any type we can multiply with
         raise ValueError
@@ -114,6 +113,28 @@ class Matrix:
         for i, _ in enumerate(values):
             self.values[i][col] = values[i]
 
+    def apply_point(self, point: tuples.Tuple) -> tuples.Tuple:
+        """Transform a point.  The same as multiplying by it, but 4x4
+        matrices do less work
+        """
+        return self * point
+
+    def apply_vector(self, vector: tuples.Tuple) -> tuples.Tuple:
+        """Transform a vector, which always comes out with w=0"""
+
+        result = self * vector
+        result.w = 0
+        return result
+
+    def apply_many(self, items: "backends.TupleArray") -> "backends.TupleArray":
+        """Multiply every tuple in a batch by this 4x4 matrix, returning a new
+        batch stored with the same backend
+        """
+
+        if self.rows != 4 or self.columns != 4:
+            raise exceptions.IncompatibleLengthError
+        return items.transformed(self._flatten())
+
     def transpose(self):
         """Return the matrix, transposed (rows become columns).  No edits
         in-place
@@ -148,6 +169,9 @@ class Matrix:
         if self.columns == 2 and self.rows == 2:
             return self.get(0, 0) * self.get(1, 1) - self.get(1, 0) * self.get(0, 1)
 
+        if self.columns == 4 and self.rows == 4:
+            return det4(self._flatten())
+
         det = 0.0
         for i, _ in enumerate(self.get_row(0)):
             det += self.get(0, i) * self.cofactor(0, i)
@@ -174,6 +198,13 @@ class Matrix:
         there is no inverse
         """
 
+        if self.columns == 4 and self.rows == 4:
+            inverse = inverse4(self._flatten())
+            M = Matrix(4, 4)
+            for row in range(4):
+                M.set_row(row, inverse[4*row:4*row + 4])
+            return M
+
         determinant = self.det()
         if determinant == 0:
             raise exceptions.CannotInvertMatrixError
@@ -188,3 +219,268 @@ class Matrix:
                 # transpose under the hood
                 M.set(col, row, cofactor / determinant)
         return M
+
+    def _flatten(self) -> List[Union[int, float]]:
+        """Return the values of the matrix as a single row-major list"""
+        return [value for row in self.values for value in row]
+
+
+def _sub_determinants(m: Sequence[Union[int, float]]) -> tuple:
+    """Return the six 2x2 determinants of the top two rows of the flat 4x4
+    matrix `m`, the six of its bottom two rows, and from them the matrix's
+    determinant by Laplace expansion along the top two rows
+    """
+
+    a00, a01, a02, a03, a10, a11, a12, a13, \
+        a20, a21, a22, a23, a30, a31, a32, a33 = m
+
+    s0 = a00*a11 - a10*a01
+    s1 = a00*a12 - a10*a02
+    s2 = a00*a13 - a10*a03
+    s3 = a01*a12 - a11*a02
+    s4 = a01*a13 - a11*a03
+    s5 = a02*a13 - a12*a03
+
+    c0 = a20*a31 - a30*a21
+    c1 = a20*a32 - a30*a22
+    c2 = a20*a33 - a30*a23
+    c3 = a21*a32 - a31*a22
+    c4 = a21*a33 - a31*a23
+    c5 = a22*a33 - a32*a23
+
+    det = s0*c5 - s1*c4 + s2*c3 + s3*c2 - s4*c1 + s5*c0
+    return (s0, s1, s2, s3, s4, s5), (c0, c1, c2, c3, c4, c5), det
+
+
+def det4(m: Sequence[Union[int, float]]) -> Union[int, float]:
+    """Calculate the determinant of the flat, row-major 4x4 matrix `m` from
+    2x2 sub-determinants, rather than recursing through submatrices
+    """
+    return _sub_determinants(m)[2]
+
+
+def inverse4(m: Sequence[Union[int, float]]) -> List[float]:
+    """Calculate the inverse of the flat, row-major 4x4 matrix `m` as its
+    adjugate divided by its determinant.  Every cofactor is built from the
+    twelve 2x2 sub-determinants, so nothing is allocated per cofactor.  Raises
+    CannotInvertMatrixError if the matrix is singular
+    """
+
+    (s0, s1, s2, s3, s4, s5), (c0, c1, c2, c3, c4, c5), det = \
+        _sub_determinants(m)
+    if det == 0:
+        raise exceptions.CannotInvertMatrixError
+
+    a00, a01, a02, a03, a10, a11, a12, a13, \
+        a20, a21, a22, a23, a30, a31, a32, a33 = m
+
+    # Each entry is a cofactor of the transposed position, divided by the
+    # determinant.  Dividing (rather than multiplying by 1/det) keeps the
+    # results exact for matrices of integers, as with cofactor expansion
+    return [
+        (a11*c5 - a12*c4 + a13*c3) / det,
+        (-a01*c5 + a02*c4 - a03*c3) / det,
+        (a31*s5 - a32*s4 + a33*s3) / det,
+        (-a21*s5 + a22*s4 - a23*s3) / det,
+        (-a10*c5 + a12*c2 - a13*c1) / det,
+        (a00*c5 - a02*c2 + a03*c1) / det,
+        (-a30*s5 + a32*s2 - a33*s1) / det,
+        (a20*s5 - a22*s2 + a23*s1) / det,
+        (a10*c4 - a11*c2 + a13*c0) / det,
+        (-a00*c4 + a01*c2 - a03*c0) / det,
+        (a30*s4 - a31*s2 + a33*s0) / det,
+        (-a20*s4 + a21*s2 - a23*s0) / det,
+        (-a10*c3 + a11*c1 - a12*c0) / det,
+        (a00*c3 - a01*c1 + a02*c0) / det,
+        (-a30*s3 + a31*s1 - a32*s0) / det,
+        (a20*s3 - a21*s1 + a22*s0) / det,
+    ]
+
+
+def _multiply4(a: "Matrix4", b: "Matrix4") -> "Matrix4":
+    """The fully unrolled product of two 4x4 matrices, with nothing cached"""
+
+    a00, a01, a02, a03, a10, a11, a12, a13, \
+        a20, a21, a22, a23, a30, a31, a32, a33 = a.flat
+    b00, b01, b02, b03, b10, b11, b12, b13, \
+        b20, b21, b22, b23, b30, b31, b32, b33 = b.flat
+
+    return Matrix4((
+        a00*b00 + a01*b10 + a02*b20 + a03*b30,
+        a00*b01 + a01*b11 + a02*b21 + a03*b31,
+        a00*b02 + a01*b12 + a02*b22 + a03*b32,
+        a00*b03 + a01*b13 + a02*b23 + a03*b33,
+        a10*b00 + a11*b10 + a12*b20 + a13*b30,
+        a10*b01 + a11*b11 + a12*b21 + a13*b31,
+        a10*b02 + a11*b12 + a12*b22 + a13*b32,
+        a10*b03 + a11*b13 + a12*b23 + a13*b33,
+        a20*b00 + a21*b10 + a22*b20 + a23*b30,
+        a20*b01 + a21*b11 + a22*b21 + a23*b31,
+        a20*b02 + a21*b12 + a22*b22 + a23*b32,
+        a20*b03 + a21*b13 + a22*b23 + a23*b33,
+        a30*b00 + a31*b10 + a32*b20 + a33*b30,
+        a30*b01 + a31*b11 + a32*b21 + a33*b31,
+        a30*b02 + a31*b12 + a32*b22 + a33*b32,
+        a30*b03 + a31*b13 + a32*b23 + a33*b33))
+
+
+class Matrix4(Matrix):
+    """A 4x4 matrix, which is the only size used to transform points and
+    vectors.  The values are stored in a single flat, row-major list, and
+    the matrix-matrix and matrix-tuple products are fully unrolled, which
+    saves building row and column lists for every element.
+
+    The inverse is cached once computed.  Transforms that know their inverse
+    in closed form give it to `set_inverse` when they are built, and the
+    product of two matrices whose inverses are known gets its inverse
+    straight away as (A*B)^-1 = B^-1 * A^-1 rather than by a numerical
+    inversion later.
+    Editing a matrix through `set`, `set_row`, `set_col` or `values` throws
+    the cache away
+    """
+
+    def __init__(self,                                   # pylint: disable=W0231
+                 values: Optional[Sequence[Union[int, float]]]=None) -> None:
+        """Initialize with 16 values in row-major order, or all zeros"""
+
+        self.rows = 4
+        self.columns = 4
+        if values is None:
+            self.flat = [0.0] * 16
+        else:
+            if len(values) != 16:
+                raise exceptions.IncompatibleLengthError
+            self.flat = list(values)
+
+        self._inverse: Optional["Matrix4"] = None
+
+    @classmethod
+    def from_matrix(cls, M: Matrix) -> "Matrix4":
+        """Copy any 4x4 matrix into a Matrix4"""
+        if M.rows != 4 or M.columns != 4:
+            raise exceptions.IncompatibleLengthError
+        return cls([M.get(i, j) for i in range(4) for j in range(4)])
+
+    @property
+    def values(self) -> List[List[Union[int, float]]]:       # type: ignore
+        """The values as a list of rows.  This is a copy, so edit the matrix
+        through `set`, `set_row` and `set_col`
+        """
+        m = self.flat
+        return [m[0:4], m[4:8], m[8:12], m[12:16]]
+
+    @values.setter
+    def values(self, rows: List[List[Union[int, float]]]) -> None:
+        self.flat = [value for row in rows for value in row]
+        self._forget_inverse()
+
+    def _forget_inverse(self) -> None:
+        """Throw away the cached inverse after the matrix has been edited"""
+        self._inverse = None
+
+    def set_inverse(self, inverse: "Matrix4") -> None:
+        """Cache an inverse that is already known, such as a closed form, so
+        that `inverse()` never inverts the matrix numerically.  It is up to
+        the caller that it really is the inverse.  It is thrown away, like a
+        computed one, if the matrix is edited
+        """
+        self._inverse = inverse
+
+    def __eq__(self, other):
+
+        if not isinstance(other, Matrix4):
+            return super().__eq__(other)
+
+        for mine, theirs in zip(self.flat, other.flat):
+            if abs(mine - theirs) >= 1e-3:
+                return False
+        return True
+
+    def __mul__(self, other):
+        """Perform matrix multiplication, unrolled for 4x4 matrices and
+        points and vectors
+        """
+
+        if isinstance(other, tuples.Tuple4):
+            m = self.flat
+            x, y, z, w = other.x, other.y, other.z, other.w
+            return tuples.make_xyzw(
+                m[0]*x + m[1]*y + m[2]*z + m[3]*w,
+                m[4]*x + m[5]*y + m[6]*z + m[7]*w,
+                m[8]*x + m[9]*y + m[10]*z + m[11]*w,
+                m[12]*x + m[13]*y + m[14]*z + m[15]*w)
+
+        if isinstance(other, Matrix4):
+            product = _multiply4(self, other)
+            if self._inverse is not None and other._inverse is not None:
+                product._inverse = _multiply4(other._inverse, self._inverse)
+            return product
+
+        return super().__mul__(other)
+
+    def set(self, x: int, y: int, value: Union[int, float]) -> None:
+        self.flat[4*x + y] = value
+        self._forget_inverse()
+
+    def get(self, x: int, y: int) -> Union[int, float]:
+        return self.flat[4*x + y]
+
+    def get_row(self, row: int) -> List[Union[int, float]]:
+        return self.flat[4*row:4*row + 4]
+
+    def get_col(self, col: int) -> List[Union[int, float]]:
+        return self.flat[col::4]
+
+    def set_row(self, row: int, values: list) -> None:
+        for i, value in enumerate(values):
+            self.flat[4*row + i] = value
+        self._forget_inverse()
+
+    def set_col(self, col: int, values: list) -> None:
+        for i, value in enumerate(values):
+            self.flat[4*i + col] = value
+        self._forget_inverse()
+
+    def apply_point(self, point: tuples.Tuple) -> tuples.Tuple:
+        """Transform a point by an affine matrix, one whose bottom row is
+        0 0 0 1.  Every transform is affine, so the bottom row and the
+        multiplications by w=1 are skipped
+        """
+        m = self.flat
+        x, y, z = point.x, point.y, point.z
+        return tuples.make_xyzw(m[0]*x + m[1]*y + m[2]*z + m[3],
+                                m[4]*x + m[5]*y + m[6]*z + m[7],
+                                m[8]*x + m[9]*y + m[10]*z + m[11],
+                                1)
+
+    def apply_vector(self, vector: tuples.Tuple) -> tuples.Tuple:
+        """Transform a vector, which only uses the upper-left 3x3 block: a
+        vector has w=0, so translation doesn't move it.  This also
+        transforms normals by the inverse-transpose, which has a bottom row
+        of its own, since normals must come out with w=0 anyway
+        """
+        m = self.flat
+        x, y, z = vector.x, vector.y, vector.z
+        return tuples.make_xyzw(m[0]*x + m[1]*y + m[2]*z,
+                                m[4]*x + m[5]*y + m[6]*z,
+                                m[8]*x + m[9]*y + m[10]*z,
+                                0)
+
+    def transpose(self):
+        m = self.flat
+        return Matrix4((m[0], m[4], m[8], m[12],
+                        m[1], m[5], m[9], m[13],
+                        m[2], m[6], m[10], m[14],
+                        m[3], m[7], m[11], m[15]))
+
+    def _flatten(self) -> List[Union[int, float]]:
+        return self.flat
+
+    def inverse(self):
+        """Return the inverse, which is cached.  Don't edit the matrix that is
+        returned, since later calls will return the same one
+        """
+
+        if self._inverse is None:
+            self._inverse = Matrix4(inverse4(self.flat))
+        return self._inverse
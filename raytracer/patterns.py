@@ -31,9 +31,9 @@ class Pattern:
         if shape is None:
             object_point = world_point
         else:
-            object_point = shape.inverse_transform * world_point
+            object_point = shape.inverse_transform.apply_point(world_point)
 
-        pattern_point = self.inverse_transform * object_point
+        pattern_point = self.inverse_transform.apply_point(object_point)
 
         return self.pattern_at(pattern_point)
 
@@ -0,0 +1,40 @@
+"""Module runs code, usually a render, under cProfile.  The profile can be
+saved to a .pstats file for later digging with `pstats` or snakeviz, and the
+hottest functions are printed when profiling stops.
+"""
+from typing import Iterator, Optional, TextIO
+import contextlib
+import cProfile
+import pstats
+import sys
+
+# The number of functions printed when profiling stops
+DEFAULT_TOP = 20
+
+# Sort by the time spent in each function itself, which puts the hot inner
+# loop functions such as matrix multiplication at the top
+DEFAULT_SORT = "tottime"
+
+
+@contextlib.contextmanager
+def profiled(path: Optional[str]=None, top: int=DEFAULT_TOP,
+             stream: Optional[TextIO]=None,
+             sort: str=DEFAULT_SORT) -> Iterator[cProfile.Profile]:
+    """Profile the body of the with statement.  When it finishes, the profile
+    is written to `path` (if given) and the `top` functions, ordered by
+    `sort`, are printed to `stream` (stdout by default)
+    """
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+
+        if path is not None:
+            profiler.dump_stats(path)
+
+        if top > 0:
+            report = pstats.Stats(profiler, stream=stream or sys.stdout)
+            report.sort_stats(sort).print_stats(top)
@@ -0,0 +1,76 @@
+"""Module contains observers that are told how a render is progressing.  Pass
+one to `Camera.render` to report progress, for example to a log or a progress
+bar.  The base class ignores everything, and is used when none is given.
+"""
+from typing import Callable, Optional, Tuple
+import logging
+import time
+
+Tile = Tuple[int, int, int, int]
+
+
+class Progress:
+    """Base progress observer, which does nothing"""
+
+    def start(self, total_pixels: int) -> None:
+        """Called once before any tiles are traced"""
+
+    def tile_done(self, tile: Tile, pixels_done: int, total_pixels: int,
+                  elapsed: float) -> None:
+        """Called as each tile is finished, with the number of pixels done so
+        far and the seconds since the render started
+        """
+
+    def finish(self, total_pixels: int, elapsed: float) -> None:
+        """Called once the whole image has been traced"""
+
+    @staticmethod
+    def pixels_per_second(pixels: int, elapsed: float) -> float:
+        """Return the rate pixels have been traced at"""
+        return pixels / elapsed if elapsed > 0 else 0.0
+
+
+class CallbackProgress(Progress):
+    """Calls `callback(tile, pixels_done, total_pixels, elapsed,
+    pixels_per_second)` as each tile is finished
+    """
+
+    def __init__(self, callback: Callable[[Tile, int, int, float, float],
+                                          None]) -> None:
+        self.callback = callback
+
+    def tile_done(self, tile: Tile, pixels_done: int, total_pixels: int,
+                  elapsed: float) -> None:
+        self.callback(tile, pixels_done, total_pixels, elapsed,
+                      self.pixels_per_second(pixels_done, elapsed))
+
+
+class LoggingProgress(Progress):
+    """Logs the start and end of a render, and how far along it is at most
+    every `interval` seconds.  The logging configuration is left to the
+    application
+    """
+
+    def __init__(self, logger: Optional[logging.Logger]=None,
+                 interval: float=5.0) -> None:
+        self.logger = logger or logging.getLogger("raytracer")
+        self.interval = interval
+        self._last_report = 0.0
+
+    def start(self, total_pixels: int) -> None:
+        self._last_report = time.time()
+        self.logger.info("Starting to render %d pixels", total_pixels)
+
+    def tile_done(self, tile: Tile, pixels_done: int, total_pixels: int,
+                  elapsed: float) -> None:
+        now = time.time()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.logger.info("Rendered %d of %d pixels (%.1f%%, %.2f pps)",
+                             pixels_done, total_pixels,
+                             100 * pixels_done / total_pixels,
+                             self.pixels_per_second(pixels_done, elapsed))
+
+    def finish(self, total_pixels: int, elapsed: float) -> None:
+        self.logger.info("Rendered scene in %.2fs (%.2f pps)", elapsed,
+                         self.pixels_per_second(total_pixels, elapsed))
@@ -0,0 +1,169 @@
+"""Module contains quaternions, which represent rotations about an arbitrary
+axis.  Unlike rotation matrices, two quaternions are composed with 16
+multiplications, can be smoothly interpolated between with `slerp`, and are
+inverted by negating three numbers.  This makes them a good fit for animated
+objects, whose rotations change every frame: compose and interpolate the
+quaternions, and only turn the result into a transform with `to_transform`
+when a shape needs one.
+"""
+import math
+
+import transforms
+import tuples
+import vectors
+
+# Below this angle between two quaternions, slerp falls back to a linear
+# interpolation, since sin(angle) is too small to divide by
+SLERP_LINEAR_THRESHOLD = 1e-6
+
+
+class Quaternion:
+    """A quaternion w + xi + yj + zk.  Only unit quaternions are rotations,
+    and the ones built by the class methods are unit quaternions
+    """
+
+    __slots__ = ("w", "x", "y", "z")
+
+    def __init__(self, w: float=1.0, x: float=0.0, y: float=0.0,
+                 z: float=0.0) -> None:
+        """The default quaternion is the identity rotation"""
+        self.w = w
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @classmethod
+    def from_axis_angle(cls, axis: vectors.Vector, r: float,
+                        degrees: bool=False) -> "Quaternion":
+        """The rotation by angle r around the axis, which needn't be
+        normalized.  Positive angles rotate the same way as RotateX, RotateY
+        and RotateZ do
+        """
+
+        if degrees is True:
+            r *= 2 * math.pi / 360
+
+        axis = axis.normalize()
+        s = math.sin(r / 2)
+        return cls(math.cos(r / 2), axis.x * s, axis.y * s, axis.z * s)
+
+    @classmethod
+    def rotate_x(cls, r: float, degrees: bool=False) -> "Quaternion":
+        """The same rotation as transforms.RotateX"""
+        return cls.from_axis_angle(vectors.Vector(1, 0, 0), r, degrees)
+
+    @classmethod
+    def rotate_y(cls, r: float, degrees: bool=False) -> "Quaternion":
+        """The same rotation as transforms.RotateY"""
+        return cls.from_axis_angle(vectors.Vector(0, 1, 0), r, degrees)
+
+    @classmethod
+    def rotate_z(cls, r: float, degrees: bool=False) -> "Quaternion":
+        """The same rotation as transforms.RotateZ"""
+        return cls.from_axis_angle(vectors.Vector(0, 0, 1), r, degrees)
+
+    def __repr__(self) -> str:
+        return (f"Quaternion [w={self.w} x={self.x} y={self.y} "
+                f"z={self.z}]")
+
+    def __eq__(self, other) -> bool:
+        return (abs(self.w - other.w) < 1e-3 and
+                abs(self.x - other.x) < 1e-3 and
+                abs(self.y - other.y) < 1e-3 and
+                abs(self.z - other.z) < 1e-3)
+
+    def __mul__(self, other: "Quaternion") -> "Quaternion":
+        """The Hamilton product.  As with matrices, (a * b) is the rotation
+        that applies b first and then a
+        """
+
+        aw, ax, ay, az = self.w, self.x, self.y, self.z
+        bw, bx, by, bz = other.w, other.x, other.y, other.z
+        return Quaternion(aw*bw - ax*bx - ay*by - az*bz,
+                          aw*bx + ax*bw + ay*bz - az*by,
+                          aw*by - ax*bz + ay*bw + az*bx,
+                          aw*bz + ax*by - ay*bx + az*bw)
+
+    def __neg__(self) -> "Quaternion":
+        """The negated quaternion, which is the same rotation"""
+        return Quaternion(-self.w, -self.x, -self.y, -self.z)
+
+    def dot(self, other: "Quaternion") -> float:
+        """The four dimensional dot product of two quaternions"""
+        return (self.w * other.w + self.x * other.x + self.y * other.y +
+                self.z * other.z)
+
+    def magnitude(self) -> float:
+        """Return the magnitude of the quaternion"""
+        return math.sqrt(self.dot(self))
+
+    def normalize(self) -> "Quaternion":
+        """Return the unit quaternion in the same direction.  Use this now
+        and again on long chains of products, where rounding creeps in
+        """
+        magnitude = self.magnitude()
+        return Quaternion(self.w / magnitude, self.x / magnitude,
+                          self.y / magnitude, self.z / magnitude)
+
+    def conjugate(self) -> "Quaternion":
+        """Return the conjugate, which for a unit quaternion is the inverse
+        rotation
+        """
+        return Quaternion(self.w, -self.x, -self.y, -self.z)
+
+    def rotate(self, point: tuples.Tuple) -> tuples.Tuple:
+        """Rotate a point or vector without building a matrix"""
+
+        # v' = v + 2w(u x v) + 2u x (u x v), where u is the vector part
+        w, ux, uy, uz = self.w, self.x, self.y, self.z
+        px, py, pz = point.x, point.y, point.z
+
+        cx = 2 * (uy*pz - uz*py)
+        cy = 2 * (uz*px - ux*pz)
+        cz = 2 * (ux*py - uy*px)
+
+        return tuples.make_xyzw(px + w*cx + uy*cz - uz*cy,
+                                py + w*cy + uz*cx - ux*cz,
+                                pz + w*cz + ux*cy - uy*cx,
+                                point.w)
+
+    def slerp(self, other: "Quaternion", t: float) -> "Quaternion":
+        """Spherical linear interpolation, which turns at a constant rate
+        from this rotation (t=0) to the other (t=1) the short way round
+        """
+
+        cos_angle = self.dot(other)
+        # q and -q are the same rotation, and the one nearer to this one is
+        # the shorter way round
+        if cos_angle < 0:
+            other = -other
+            cos_angle = -cos_angle
+
+        if cos_angle > 1 - SLERP_LINEAR_THRESHOLD:
+            a, b = 1 - t, t
+        else:
+            angle = math.acos(cos_angle)
+            sin_angle = math.sin(angle)
+            a = math.sin((1 - t) * angle) / sin_angle
+            b = math.sin(t * angle) / sin_angle
+
+        return Quaternion(a * self.w + b * other.w, a * self.x + b * other.x,
+                          a * self.y + b * other.y,
+                          a * self.z + b * other.z).normalize()
+
+    def to_transform(self) -> transforms.Transform:
+        """Return the rotation as a 4x4 transform.  Its inverse, which is the
+        conjugate's matrix (the transpose), is stored with it, so it is never
+        inverted numerically
+        """
+
+        q = self.normalize()
+        w, x, y, z = q.w, q.x, q.y, q.z
+
+        M = transforms.Transform()
+        M.flat = [1 - 2*(y*y + z*z), 2*(x*y - w*z), 2*(x*z + w*y), 0,
+                  2*(x*y + w*z), 1 - 2*(x*x + z*z), 2*(y*z - w*x), 0,
+                  2*(x*z - w*y), 2*(y*z + w*x), 1 - 2*(x*x + y*y), 0,
+                  0, 0, 0, 1]
+        M.set_inverse(M.transpose())
+        return M
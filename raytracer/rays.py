@@ -2,7 +2,11 @@
 the ray can be calculated with the `t` variable, which represents some time
 after which the ray started propagating
 """
+from array import array
+from typing import Iterable, Iterator, Optional
 
+import backends
+import exceptions
 import points
 import vectors
 
@@ -22,4 +26,75 @@ class Ray:
     def transform(self, M):
         """Transform the ray with the matrix"""
 
-        return Ray(M * self.origin, M * self.direction)
+        return Ray(M.apply_point(self.origin), M.apply_vector(self.direction))
+
+
+class RayBatch:
+    """Class represents many rays, with their origins and directions stored
+    in two `backends.TupleArray`s rather than as a Ray object each, so that
+    they can be transformed and intersected with shapes together
+    """
+
+    def __init__(self, origins: backends.TupleArray,
+                 directions: backends.TupleArray) -> None:
+        """Initialize with a batch of origins and one of directions, which
+        must be the same length and use the same backend
+        """
+
+        if len(origins) != len(directions) or \
+           origins.backend != directions.backend:
+            raise exceptions.IncompatibleLengthError
+
+        self.origins = origins
+        self.directions = directions
+        self.backend = origins.backend
+
+    @classmethod
+    def from_rays(cls, many_rays: Iterable[Ray],
+                  backend: Optional[str]=None) -> "RayBatch":
+        """Build a batch from a sequence of rays"""
+
+        many_rays = list(many_rays)
+        return cls(
+            backends.TupleArray.from_tuples(
+                [ray.origin for ray in many_rays],
+                template=points.Point(0, 0, 0), backend=backend),
+            backends.TupleArray.from_tuples(
+                [ray.direction for ray in many_rays],
+                template=vectors.Vector(0, 0, 0), backend=backend))
+
+    def __len__(self) -> int:
+        return len(self.origins)
+
+    def __getitem__(self, index: int) -> Ray:
+        return Ray(self.origins[index], self.directions[index])
+
+    def __iter__(self) -> Iterator[Ray]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def position(self, times) -> backends.TupleArray:
+        """Return the position of each ray at its own time, given as a
+        sequence the same length as the batch
+        """
+
+        if len(times) != len(self):
+            raise exceptions.IncompatibleLengthError
+
+        origins, directions = self.origins.data, self.directions.data
+
+        if self.backend == backends.NUMPY:
+            data = origins + directions * backends.numpy.asarray(
+                times, dtype=float)[:, None]
+        else:
+            data = array("d", origins)
+            for i, time in enumerate(times):
+                for j in range(4*i, 4*i + 3):
+                    data[j] += directions[j] * time
+
+        return backends.TupleArray(self.origins.template, data, self.backend)
+
+    def transform(self, M) -> "RayBatch":
+        """Transform every ray in the batch with the matrix"""
+        return RayBatch(M.apply_many(self.origins),
+                        M.apply_many(self.directions))
@@ -1,18 +1,20 @@
 """The scene is the collection of objects, camera and lights to be rendered"""
 import math
-from typing import List, Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 
+import bvh
 import colors
 import intersections
 import lights
 import points
 import rays
 import shapes
+import stats as render_stats
 
 class Scene:
     """The scene is the collection of objects, light and camera that constitutes
-    an image
-    """
+    an image"""
 
     def __init__(self, objects: List[shapes.Shape]=None,
                  lights: List[lights.Light]=None,
@@ -30,45 +32,145 @@ class Scene:
 
         self.recursion_limit = recursion_limit
 
+        # The last shape found to shadow each light, tested first by the
+        # next shadow ray to that light.  Each thread has its own, and each
+        # worker process its own copy of the scene
+        self._occluders = threading.local()
+
+        # The bounding volume hierarchy over the objects, built when the
+        # first ray is traced, and what it was built from
+        self._bvh: Optional[bvh.BVH] = None
+        self._bvh_changes = -1
+        self._bvh_shapes: List[shapes.Shape] = []
+        self._bvh_objects: List[Tuple[int, int]] = []
+
+    def __getstate__(self):
+        """The shadow cache can't be pickled, and neither it nor the BVH is
+        any use in another process, so they are left behind when the scene is
+        sent to one
+        """
+        state = self.__dict__.copy()
+        del state["_occluders"]
+        state["_bvh"] = None
+        state["_bvh_changes"] = -1
+        state["_bvh_shapes"] = []
+        state["_bvh_objects"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._occluders = threading.local()
 
     def add_object(self, shape: shapes.Shape):
         """Add an object to the scene"""
         self.objects.append(shape)
 
+    def prepare(self) -> bvh.BVH:
+        """Build the BVH, or rebuild it if objects have been added, removed,
+        replaced or moved since it was built, and return it.  Renders call
+        this before tracing any rays
+        """
+        return self._accelerator()
+
+    def _accelerator(self) -> bvh.BVH:
+        """Return the BVH, building it first if it is missing or out of
+        date.  It is out of date if objects have been added, removed or
+        replaced, or if one of them has moved.  The objects' transforms are
+        only checked when some shape, in this scene or any other, has moved
+        since the last check
+        """
+
+        # Shapes compare equal by their id, and the list comparison checks
+        # identity first, so this is a quick pass over the objects
+        objects = self.objects
+        if self._bvh is not None and \
+                self._bvh_changes == shapes.Shape.transform_changes and \
+                objects == self._bvh_shapes:
+            return self._bvh
+
+        built_from = [(id(shape), shape.transform_version)
+                      for shape in objects]
+        if self._bvh is None or built_from != self._bvh_objects:
+            self._bvh = bvh.BVH(objects)
+            self._bvh_objects = built_from
+            self.clear_shadow_cache()
+        self._bvh_changes = shapes.Shape.transform_changes
+        self._bvh_shapes = list(objects)
+        return self._bvh
+
+    def clear_shadow_cache(self) -> None:
+        """Forget the shapes that last shadowed each light.  This is done
+        whenever the BVH is rebuilt, so a removed shape can't cast a shadow
+        """
+        self._occluders = threading.local()
+
+    def _last_occluders(self) -> Dict[int, shapes.Shape]:
+        """Return this thread's last occluder for each light, keyed by the
+        light's id()
+        """
+        try:
+            return self._occluders.by_light
+        except AttributeError:
+            self._occluders.by_light = {}
+            return self._occluders.by_light
+
 
-    def intersect(self, r: rays.Ray) -> intersections.Intersections:
+    def intersect(self, r: rays.Ray,
+                  stats: Optional[render_stats.RenderStats]=None
+                  ) -> intersections.Intersections:
         """Intersect the ray r with all the objects in the scene and return
         intersections sotred by t value
         """
 
-        for i, shape in enumerate(self.objects):
-            if i == 0:
-                all_intersections = shape.intersect(r)
-            else:
-                all_intersections += shape.intersect(r)
+        return self._accelerator().intersect_all(r, stats)
+
+    def intersect_closest(self, r: rays.Ray, t_min: float=0.0,
+                          t_max: float=math.inf,
+                          stats: Optional[render_stats.RenderStats]=None
+                          ) -> Optional[intersections.Intersection]:
+        """Return the intersection with the smallest t between t_min and
+        t_max, or None.  The BVH is walked nearest box first, and once an
+        intersection is found, shapes are only asked for intersections closer
+        than it
+        """
+        return self._accelerator().intersect_closest(r, t_min, t_max, stats)
+
+    def is_occluded(self, r: rays.Ray, t_min: float=0.0,
+                    t_max: float=math.inf,
+                    stats: Optional[render_stats.RenderStats]=None) -> bool:
+        """Return True if anything intersects the ray between t_min and
+        t_max.  Stops at the first object that does, without sorting or
+        building any intersections
+        """
 
-        return all_intersections
+        return self._accelerator().find_occluder(r, t_min, t_max,
+                                                 stats) is not None
 
 
     def shade_hit(self,
                   computations: intersections.Computations,
-                  remaining=5) -> Tuple[colors.Color, int]:
+                  remaining=5,
+                  stats: Optional[render_stats.RenderStats]=None
+                  ) -> Tuple[colors.Color, int]:
         """Given some pre-calculated values about a hit, calculate its color"""
 
         surface = colors.Color(0, 0, 0)
 
         for light in self.lights:
 
-            in_shadow = self.is_shadowed(computations.over_point, light)
+            in_shadow = self.is_shadowed(computations.over_point, light,
+                                         stats)
 
             surface += computations.object.material.lighting(light,
                     computations.over_point, computations.eyev,
                     computations.normalv, in_shadow = in_shadow)
 
             reflected, _ = self.reflected_color(computations,
-                                                        remaining=remaining)
+                                                        remaining=remaining,
+                                                        stats=stats)
             refracted, _ = self.refracted_color(computations,
-                                                        remaining=remaining)
+                                                        remaining=remaining,
+                                                        stats=stats)
 
         material = computations.object.material
         if material.reflective > 0 and material.transparency > 0:
@@ -79,43 +181,79 @@ class Scene:
 
         return surface + reflected + refracted, remaining
 
-    def color_at(self, ray: rays.Ray, remaining=25) -> Tuple[colors.Color, int]:
-        """Calculates the color of a ray in the scene"""
-
-        # List out all the surfaces the ray intersects
-        ray_intersections = self.intersect(ray)
+    def color_at(self, ray: rays.Ray, remaining=25,
+                 stats: Optional[render_stats.RenderStats]=None,
+                 candidates: Optional[bvh.BVH]=None
+                 ) -> Tuple[colors.Color, int]:
+        """Calculates the color of a ray in the scene.
+
+        If `candidates` is given, the ray's hit is only looked for among the
+        shapes in it, which must include every shape the ray can hit.
+        Cameras use this to skip the shapes outside their view when firing
+        primary rays.  Reflected, refracted and shadow rays still see every
+        object
+        """
 
-        # Find the closest one, in front of the camera (the "hit"):
-        hit = ray_intersections.hit()
+        # Find the closest surface in front of the camera (the "hit"):
+        if candidates is None:
+            hit = self.intersect_closest(ray, stats=stats)
+        else:
+            hit = candidates.intersect_closest(ray, 0.0, math.inf, stats)
 
         # If there were no hits, return the background color
         if hit is None:
             return colors.Color(0, 0, 0), remaining
 
-        # Else, calculate the color of the pixel
-        precomputes = hit.precompute(ray, all_intersections=ray_intersections)
-        return self.shade_hit(precomputes, remaining=remaining)
+        # Else, calculate the color of the pixel.  Refraction needs to know
+        # which objects the hit is inside, which takes the list of every
+        # surface the ray intersects
+        if hit.shape.material.transparency > 0:
+            precomputes = hit.precompute(
+                ray, all_intersections=self.intersect(ray, stats))
+        else:
+            precomputes = hit.precompute(ray)
+        return self.shade_hit(precomputes, remaining=remaining, stats=stats)
 
-    def is_shadowed(self, point: points.Point, light: lights.Light) -> bool:
+    def is_shadowed(self, point: points.Point, light: lights.Light,
+                    stats: Optional[render_stats.RenderStats]=None) -> bool:
         """Returns True if the point is shadowed from the light"""
 
+        if stats is not None:
+            stats.count_ray(render_stats.SHADOW)
+
         v = light.position - point
         distance = v.magnitude()
         direction = v.normalize()
 
         ray = rays.Ray(point, direction)
-        intersections = self.intersect(ray)
-
-        hit = intersections.hit()
 
-        if hit is not None and hit.t < distance:
+        # Get the BVH first, since rebuilding it empties the shadow cache
+        accelerator = self._accelerator()
+
+        # Neighbouring points are usually shadowed by the same shape, so try
+        # the one that shadowed the last point first
+        last_occluders = self._last_occluders()
+        occluder = last_occluders.get(id(light))
+        if occluder is not None:
+            cached = occluder.occludes(ray, 0.0, distance, stats)
+            if stats is not None:
+                stats.count_shadow_cache(cached)
+            if cached:
+                return True
+
+        shape = accelerator.find_occluder(ray, 0.0, distance, stats,
+                                          skip=occluder)
+        if shape is not None:
+            last_occluders[id(light)] = shape
             return True
 
         return False
 
     def reflected_color(self,
                         precomputes: intersections.Computations,
-                        remaining: int=5) -> Tuple[colors.Color, int]:
+                        remaining: int=5,
+                        stats: Optional[render_stats.RenderStats]=None
+                        ) -> Tuple[colors.Color, int]:
         """Calculate the reflected color of a hit on a surface.
 
         remaining tracks how many levels of recursion we have done, and when
@@ -135,13 +273,22 @@ class Scene:
 
         remaining -= 1
 
-        color, remaining = self.color_at(reflect_ray, remaining=remaining)
+        if stats is None:
+            color, remaining = self.color_at(reflect_ray, remaining=remaining)
+        else:
+            stats.count_ray(render_stats.REFLECTION)
+            stats.descend()
+            color, remaining = self.color_at(reflect_ray, remaining=remaining,
+                                             stats=stats)
+            stats.ascend()
         return  color * precomputes.object.material.reflective, remaining
 
 
     def refracted_color(self,
                         precomputes: intersections.Computations,
-                        remaining: int=5) -> Tuple[colors.Color, int]:
+                        remaining: int=5,
+                        stats: Optional[render_stats.RenderStats]=None
+                        ) -> Tuple[colors.Color, int]:
         """Calculate the refracted color of a hit on a surface.
 
         remaining tracks how many levels of recursion we have done, and when
@@ -171,7 +318,14 @@ class Scene:
 
         refract_ray = rays.Ray(precomputes.under_point, direction)
 
-        color = (self.color_at(refract_ray, remaining-1)[0] *
+        if stats is not None:
+            stats.count_ray(render_stats.REFRACTION)
+            stats.descend()
+
+        color = (self.color_at(refract_ray, remaining-1, stats)[0] *
                      precomputes.object.material.transparency)
 
+        if stats is not None:
+            stats.ascend()
+
         return color, remaining
@@ -1,11 +1,15 @@
-from typing import List, Union
+from typing import List, Optional, Union
+from array import array
 import math
 import uuid
 
+import backends
+import bounds as bounding
 import intersections
 import materials
 import points
 import rays
+import stats as render_stats
 import transforms
 import vectors
 
@@ -13,9 +17,19 @@ import vectors
 # to the plane, so don't intersect
 MIN_Y_FOR_PLANE_INTERSECT = 1e-2
 
+# The bounds used to reject rays are grown by this much, so that rounding when
+# transforming the corners can't make a ray that grazes a shape miss them
+BOUNDS_PADDING = 1e-6
+
 class Shape:
     """Class for the base shape"""
 
+    # Counts the changes to any shape's transform, so that a scene can cheaply
+    # tell whether any shape may have moved since it built its BVH.  Each
+    # shape also counts its own changes in `transform_version`, to tell which
+    transform_changes = 0
+    transform_version = 0
+
     def __init__(self, material: Union[materials.Material, None]=None):
 
         self.id = uuid.uuid4()
@@ -36,29 +50,111 @@ class Shape:
         self.material = material
 
     def set_transform(self, M):
-        """Sets the shape's transform to the matrix M"""
+        """Sets the shape's transform to the matrix M, and caches its inverse
+        and the inverse's transpose, which transforms normals
+        """
         self.transform = M
         self.inverse_transform = M.inverse()
+        self.inverse_transpose = self.inverse_transform.transpose()
+        self._world_bounds: Optional[bounding.BoundingBox] = None
+        self._pretest_bounds: Optional[bounding.BoundingBox] = None
+        Shape.transform_changes += 1
+        self.transform_version += 1
+
+    def bounds(self) -> bounding.BoundingBox:
+        """Return the box containing the shape in object coordinates.  Shapes
+        are unbounded unless they say otherwise
+        """
+        return bounding.BoundingBox.infinite()
 
-    def intersect(self, ray: rays.Ray):
-        """Return the t values for where the ray intersects the shape"""
+    def world_bounds(self) -> bounding.BoundingBox:
+        """Return the box containing the shape once it is transformed, which
+        is cached until the transform is changed
+        """
+        if self._world_bounds is None:
+            self._world_bounds = self.bounds().transform(self.transform)
+            if self._world_bounds.is_bounded():
+                self._pretest_bounds = self._world_bounds.padded(
+                    BOUNDS_PADDING)
+        return self._world_bounds
+
+    def _misses_bounds(self, ray: rays.Ray, t_min: float,
+                       t_max: float) -> bool:
+        """The slab test pretest: True if the ray certainly misses the shape
+        because it misses the shape's world bounds between t_min and t_max.
+        It is much cheaper than moving the ray into object coordinates
+        """
+
+        if self._world_bounds is None:
+            self.world_bounds()
+        box = self._pretest_bounds
+        if box is None:
+            # Unbounded shapes, such as planes, can't be ruled out this way
+            return False
+
+        origin, direction = ray.origin, ray.direction
+        return box.hit_range((origin.x, origin.y, origin.z),
+                             bounding.inverse_direction(direction),
+                             t_min, t_max) is None
+
+    def intersect(self, ray: rays.Ray,
+                  t_min: float=-math.inf, t_max: float=math.inf,
+                  stats: Optional[render_stats.RenderStats]=None):
+        """Return the t values for where the ray intersects the shape.  Only
+        intersections with t_min < t < t_max are returned, so a search for
+        the closest hit can pass the closest t found so far as t_max.  If a
+        `stats.RenderStats` is given, the test is counted in it
+        """
+
+        if self._misses_bounds(ray, t_min, t_max):
+            if stats is not None:
+                stats.count_test(self, False)
+            return intersections.Intersections()
 
         # Transform the ray by the inverse of the shape's transform to get into
-        # object coordinates
+        # object coordinates.  The transform is affine, so t values are the
+        # same in both coordinate systems
         local_ray = ray.transform(self.inverse_transform)
 
-        return self.local_intersect(local_ray)
+        result = self.local_intersect(local_ray, t_min, t_max)
+        if stats is not None:
+            stats.count_test(self, len(result) > 0)
+        return result
+
+    def occludes(self, ray: rays.Ray,
+                 t_min: float=0.0, t_max: float=math.inf,
+                 stats: Optional[render_stats.RenderStats]=None) -> bool:
+        """Return True if the ray intersects the shape anywhere with
+        t_min < t < t_max.  This is all a shadow ray needs to know, and
+        doesn't build any intersections
+        """
+
+        if self._misses_bounds(ray, t_min, t_max):
+            result = False
+        else:
+            local_ray = ray.transform(self.inverse_transform)
+            result = self.local_occludes(local_ray, t_min, t_max)
+        if stats is not None:
+            stats.count_test(self, result)
+        return result
+
+    def intersect_batch(self, batch: rays.RayBatch) -> tuple:
+        """Return the t values where each ray in the batch intersects the
+        shape, as a tuple of arrays with one value per ray.  Rays that miss
+        get infinity
+        """
+        return self.local_intersect_batch(
+            batch.transform(self.inverse_transform))
 
     def normal_at(self, point: points.Point) -> vectors.Vector:
         """Returns the normal vector for the shape at the given point"""
 
         # Transform to object coordinates, and get the nortmal in those
         # coordinates
-        local_point = self.inverse_transform * point
+        local_point = self.inverse_transform.apply_point(point)
         local_normal = self.local_normal_at(local_point)
 
-        world_normal = self.inverse_transform.transpose() * local_normal
-        world_normal.w = 0
+        world_normal = self.inverse_transpose.apply_vector(local_normal)
 
         return world_normal.normalize()
 
@@ -68,18 +164,34 @@ class Shape:
         """
         raise NotImplementedError
 
-    def local_intersect(self, ray: rays.Ray):
+    def local_intersect_batch(self, local_rays: rays.RayBatch) -> tuple:
+        """Return the t values for a batch of rays in object coordinates,
+        like local_intersect does for a single ray
+        """
+        raise NotImplementedError
+
+    def local_intersect(self, ray: rays.Ray, t_min: float=-math.inf,
+                        t_max: float=math.inf):
         """This takes a ray and returns the t values at which the ray intersects
         the shape, if any
         """
         raise NotImplementedError
 
+    def local_occludes(self, local_ray: rays.Ray, t_min: float,
+                       t_max: float) -> bool:
+        """Return True if the ray in object coordinates intersects the shape
+        with t_min < t < t_max.  Shapes can override this with something
+        cheaper than finding their intersections
+        """
+        return len(self.local_intersect(local_ray, t_min, t_max)) > 0
+
 class Plane(Shape):
     """Class represents an infinite plane.
 
     In object units, the plane is in the x-z plane and is at y=0"""
 
-    def local_intersect(self, local_ray: rays.Ray):
+    def local_intersect(self, local_ray: rays.Ray, t_min: float=-math.inf,
+                        t_max: float=math.inf):
         """Return the t-value where the ray intersects with the plane, in local
         units
         """
@@ -90,9 +202,35 @@ class Plane(Shape):
             return intersections.Intersections()
 
         t = -local_ray.origin.y / local_ray.direction.y
+        if not t_min < t < t_max:
+            return intersections.Intersections()
         return intersections.Intersections(
             intersections.Intersection(self, t))
 
+    def local_occludes(self, local_ray: rays.Ray, t_min: float,
+                       t_max: float) -> bool:
+
+        if abs(local_ray.direction.y) < MIN_Y_FOR_PLANE_INTERSECT:
+            return False
+        return t_min < -local_ray.origin.y / local_ray.direction.y < t_max
+
+    def local_intersect_batch(self, local_rays: rays.RayBatch) -> tuple:
+        """Return a single array of t values, one per ray"""
+
+        origin_y = local_rays.origins.component(1)
+        direction_y = local_rays.directions.component(1)
+
+        if local_rays.backend == backends.NUMPY:
+            numpy = backends.numpy
+            parallel = numpy.abs(direction_y) < MIN_Y_FOR_PLANE_INTERSECT
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                t = numpy.where(parallel, math.inf, -origin_y / direction_y)
+            return (t,)
+
+        return (array("d", [
+            math.inf if abs(dy) < MIN_Y_FOR_PLANE_INTERSECT else -oy / dy
+            for oy, dy in zip(origin_y, direction_y)]),)
+
 
     def local_normal_at(self, object_point: points.Point) -> vectors.Vector:
         """Returns the normal vector in object coordinates.  For a sphere
@@ -101,6 +239,11 @@ class Plane(Shape):
         """
         return vectors.Vector(0, 1, 0)
 
+    def bounds(self) -> bounding.BoundingBox:
+        """The plane is infinite in x and z, and flat in y"""
+        return bounding.BoundingBox(points.Point(-math.inf, 0, -math.inf),
+                                  points.Point(math.inf, 0, math.inf))
+
 
 class Sphere(Shape):
     """Class represents a sphere shape
@@ -108,7 +251,8 @@ class Sphere(Shape):
     In object units this is a unit sphere centered on the origin
     """
 
-    def local_intersect(self, local_ray: rays.Ray):
+    def local_intersect(self, local_ray: rays.Ray, t_min: float=-math.inf,
+                        t_max: float=math.inf):
         """Return to t values for where the ray intersects the shape.  All in
         local coordinates for the shape
         """
@@ -122,12 +266,81 @@ class Sphere(Shape):
 
         if discriminant < 0:
             return intersections.Intersections()
-        else:
-            t1 = (-b - math.sqrt(discriminant)) / (2 * a)
-            t2 = (-b + math.sqrt(discriminant)) / (2 * a)
+
+        root = math.sqrt(discriminant)
+        t1 = (-b - root) / (2 * a)
+        if t1 >= t_max:
+            # Both intersections are further away than the range asked for
+            return intersections.Intersections()
+
+        t2 = (-b + root) / (2 * a)
+        if t_min < t1:
+            if t2 < t_max:
+                return intersections.Intersections(
+                    intersections.Intersection(self, t1),
+                    intersections.Intersection(self, t2))
+            return intersections.Intersections(
+                intersections.Intersection(self, t1))
+        if t_min < t2 < t_max:
             return intersections.Intersections(
-                intersections.Intersection(self, t1),
                 intersections.Intersection(self, t2))
+        return intersections.Intersections()
+
+    def local_occludes(self, local_ray: rays.Ray, t_min: float,
+                       t_max: float) -> bool:
+
+        origin, direction = local_ray.origin, local_ray.direction
+        a = direction.dot(direction)
+        b = 2 * (direction.x * origin.x + direction.y * origin.y +
+                 direction.z * origin.z)
+        c = origin.x * origin.x + origin.y * origin.y + origin.z * origin.z - 1
+        discriminant = b**2 - 4 * a * c
+
+        if discriminant < 0:
+            return False
+
+        root = math.sqrt(discriminant)
+        t1 = (-b - root) / (2 * a)
+        if t1 >= t_max:
+            return False
+        return t_min < t1 or t_min < (-b + root) / (2 * a) < t_max
+
+    def local_intersect_batch(self, local_rays: rays.RayBatch) -> tuple:
+        """Return two arrays holding the nearer and further t value for each
+        ray
+        """
+
+        ox, oy, oz = (local_rays.origins.component(i) for i in range(3))
+        dx, dy, dz = (local_rays.directions.component(i) for i in range(3))
+
+        if local_rays.backend == backends.NUMPY:
+            numpy = backends.numpy
+            a = dx*dx + dy*dy + dz*dz
+            b = 2 * (dx*ox + dy*oy + dz*oz)
+            c = ox*ox + oy*oy + oz*oz - 1
+            discriminant = b*b - 4*a*c
+
+            missed = discriminant < 0
+            root = numpy.sqrt(numpy.where(missed, 0.0, discriminant))
+            t1 = numpy.where(missed, math.inf, (-b - root) / (2*a))
+            t2 = numpy.where(missed, math.inf, (-b + root) / (2*a))
+            return t1, t2
+
+        t1, t2 = array("d"), array("d")
+        for i in range(len(local_rays)):
+            a = dx[i]*dx[i] + dy[i]*dy[i] + dz[i]*dz[i]
+            b = 2 * (dx[i]*ox[i] + dy[i]*oy[i] + dz[i]*oz[i])
+            c = ox[i]*ox[i] + oy[i]*oy[i] + oz[i]*oz[i] - 1
+            discriminant = b*b - 4*a*c
+
+            if discriminant < 0:
+                t1.append(math.inf)
+                t2.append(math.inf)
+            else:
+                root = math.sqrt(discriminant)
+                t1.append((-b - root) / (2*a))
+                t2.append((-b + root) / (2*a))
+        return t1, t2
 
     def local_normal_at(self, object_point: points.Point) -> vectors.Vector:
         """Returns the normal vector in object coordinates.  For a sphere
@@ -135,3 +348,8 @@ class Sphere(Shape):
         point
         """
         return object_point - points.Point(0, 0, 0)
+
+    def bounds(self) -> bounding.BoundingBox:
+        """The unit sphere fits in the cube from -1 to 1 on each axis"""
+        return bounding.BoundingBox(points.Point(-1, -1, -1),
+                                  points.Point(1, 1, 1))
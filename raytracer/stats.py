@@ -0,0 +1,101 @@
+"""Module contains a collector for statistics about the work done in a render:
+how many rays of each kind were fired, how many ray-shape intersection tests
+were made and how many of them hit, and how deep reflection and refraction
+recursed, and how often the shape that last shadowed a light shadowed the next
+point too.
+
+Collection is opt-in.  Pass a `RenderStats` to `Camera.render` (or as the
+`stats` argument of the `Scene` and `Shape` methods) and it is filled in as the
+render goes.  When no collector is passed, the only cost is a check for None.
+"""
+from collections import Counter
+from typing import Any, Dict
+
+# The kinds of ray that are counted
+PRIMARY = "primary"
+SHADOW = "shadow"
+REFLECTION = "reflection"
+REFRACTION = "refraction"
+
+
+class RenderStats:
+    """Counters for the work done in a render"""
+
+    def __init__(self) -> None:
+
+        self.rays: Counter = Counter()
+        self.tests_by_type: Counter = Counter()
+        self.tests_by_object: Counter = Counter()
+        self.hits_by_type: Counter = Counter()
+        self.shadow_cache: Counter = Counter()
+        self.max_depth = 0
+        self.depth = 0
+
+    def __repr__(self) -> str:
+        return (f"RenderStats [rays={sum(self.rays.values())} "
+                f"tests={sum(self.tests_by_type.values())} "
+                f"hits={sum(self.hits_by_type.values())} "
+                f"max_depth={self.max_depth}]")
+
+    def count_ray(self, kind: str, number: int=1) -> None:
+        """Record that `number` rays of the given kind were fired"""
+        self.rays[kind] += number
+
+    def count_test(self, shape, hit: bool) -> None:
+        """Record a ray-shape intersection test, and whether it hit"""
+
+        shape_type = type(shape).__name__
+        self.tests_by_type[shape_type] += 1
+        self.tests_by_object[str(shape.id)] += 1
+        if hit:
+            self.hits_by_type[shape_type] += 1
+
+    def count_shadow_cache(self, hit: bool) -> None:
+        """Record whether the cached last occluder of a light shadowed a
+        point, saving a search of the whole scene
+        """
+        self.shadow_cache["hits" if hit else "misses"] += 1
+
+    def descend(self) -> None:
+        """Record that a secondary ray is being traced one level deeper"""
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def ascend(self) -> None:
+        """Record that a secondary ray has been traced"""
+        self.depth -= 1
+
+    def merge(self, other: "RenderStats") -> None:
+        """Add the counts from another collector, for example one filled in
+        by a worker process, to this one
+        """
+        self.rays.update(other.rays)
+        self.tests_by_type.update(other.tests_by_type)
+        self.tests_by_object.update(other.tests_by_object)
+        self.hits_by_type.update(other.hits_by_type)
+        self.shadow_cache.update(other.shadow_cache)
+        self.max_depth = max(self.max_depth, other.max_depth)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the statistics as a dictionary of plain values"""
+
+        tests = sum(self.tests_by_type.values())
+        hits = sum(self.hits_by_type.values())
+        cache_hits = self.shadow_cache["hits"]
+        cache_lookups = cache_hits + self.shadow_cache["misses"]
+        return {
+            "rays": {kind: self.rays[kind] for kind in
+                     (PRIMARY, SHADOW, REFLECTION, REFRACTION)},
+            "intersection_tests": tests,
+            "hits": hits,
+            "hit_rate": hits / tests if tests else 0.0,
+            "tests_by_type": dict(self.tests_by_type),
+            "hits_by_type": dict(self.hits_by_type),
+            "tests_by_object": dict(self.tests_by_object),
+            "shadow_cache_hits": cache_hits,
+            "shadow_cache_misses": self.shadow_cache["misses"],
+            "shadow_cache_hit_rate": (cache_hits / cache_lookups
+                                      if cache_lookups else 0.0),
+            "max_depth": self.max_depth,
+        }
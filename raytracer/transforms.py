@@ -7,18 +7,42 @@ import math
 import matrices
 import points
 import vectors
-class Identity(matrices.Matrix):
+
+class Transform(matrices.Matrix4):
+    """Base class for the 4x4 transformation matrices.  Starts out as the
+    identity, which the subclasses then edit.
+
+    Subclasses whose inverse has a closed form give it to `set_inverse` once
+    they have finished editing themselves, so `inverse()` never has to invert
+    them numerically
+    """
+
+    def __init__(self) -> None:
+        super().__init__((1, 0, 0, 0,
+                          0, 1, 0, 0,
+                          0, 0, 1, 0,
+                          0, 0, 0, 1))
+        self.set_inverse(matrices.Matrix4(self.flat))
+
+
+def Identity(size: int=4) -> matrices.Matrix:           # pylint: disable=C0103
     """The identity matrix.  Great for multiplying with things if you want to do
     work for no reason.
+
+    The 4x4 identity used to transform points and vectors is a Transform, and
+    other sizes are plain matrices
     """
 
-    def __init__(self, size):
-        super().__init__(size, size)
-        for i in range(size):
-            self.set(i, i, 1)
+    if size == 4:
+        return Transform()
 
+    M = matrices.Matrix(size, size)
+    for i in range(size):
+        M.set(i, i, 1)
+    return M
 
-class Translate(Identity):
+
+class Translate(Transform):
     """Matrix initialized with x, y, z, and moves a point by that amount"""
 
     def __init__(self, x, y, z):
@@ -30,13 +54,18 @@ class Translate(Identity):
           0 0 1 z
           0 0 0 1 ]
         """
-        super().__init__(4)
+        super().__init__()
         self.set(0, 3, x)
         self.set(1, 3, y)
         self.set(2, 3, z)
 
+        self.set_inverse(matrices.Matrix4((1, 0, 0, -x,
+                                           0, 1, 0, -y,
+                                           0, 0, 1, -z,
+                                           0, 0, 0, 1)))
+
 
-class Scale(Identity):
+class Scale(Transform):
     """Matrix initialized with x, y, w and scales the point by that factor in
     each direction
     """
@@ -50,13 +79,20 @@ class Scale(Identity):
           0 0 z 0
           0 0 0 1 ]
         """
-        super().__init__(4)
+        super().__init__()
         self.set(0, 0, x)
         self.set(1, 1, y)
         self.set(2, 2, z)
 
+        # A zero scale is singular, so leave inverse() to raise
+        if x != 0 and y != 0 and z != 0:
+            self.set_inverse(matrices.Matrix4((1/x, 0, 0, 0,
+                                               0, 1/y, 0, 0,
+                                               0, 0, 1/z, 0,
+                                               0, 0, 0, 1)))
+
 
-class RotateX(Identity):
+class RotateX(Transform):
     """Matrix initialized with an angle, and rotates points around the x-axis by
     that angle
     """
@@ -74,14 +110,17 @@ class RotateX(Identity):
         if degrees is True:
             r *= 2 * math.pi / 360
 
-        super().__init__(4)
+        super().__init__()
         self.set(1, 1, math.cos(r))
         self.set(1, 2, -math.sin(r))
         self.set(2, 1, math.sin(r))
         self.set(2, 2, math.cos(r))
 
+        # Rotations are orthogonal, so the inverse is the transpose
+        self.set_inverse(self.transpose())
 
-class RotateY(Identity):
+
+class RotateY(Transform):
     """Matrix initialized with an angle, and rotates points around the y-axis by
     that angle
     """
@@ -99,14 +138,17 @@ class RotateY(Identity):
         if degrees is True:
             r *= 2 * math.pi / 360
 
-        super().__init__(4)
+        super().__init__()
         self.set(0, 0, math.cos(r))
-        self.set(0, 3, math.sin(r))
+        self.set(0, 2, math.sin(r))
         self.set(2, 0, -math.sin(r))
         self.set(2, 2, math.cos(r))
 
+        # Rotations are orthogonal, so the inverse is the transpose
+        self.set_inverse(self.transpose())
+
 
-class RotateZ(Identity):
+class RotateZ(Transform):
     """Matrix initialized with an angle, and rotates points around the z-axis by
     that angle
     """
@@ -124,14 +166,17 @@ class RotateZ(Identity):
         if degrees is True:
             r *= 2 * math.pi / 360
 
-        super().__init__(4)
+        super().__init__()
         self.set(0, 0, math.cos(r))
         self.set(0, 1, -math.sin(r))
         self.set(1, 0, math.sin(r))
         self.set(1, 1, math.cos(r))
 
+        # Rotations are orthogonal, so the inverse is the transpose
+        self.set_inverse(self.transpose())
+
 
-class Shear(Identity):
+class Shear(Transform):
     """The shearing matrix expands each direction relative to another direction
     [ 1   x_y x_z  0
       y_x 1   y_z  0
@@ -143,7 +188,7 @@ class Shear(Identity):
                  y_x: float, y_z: float,
                  z_x: float, z_y: float):
 
-        super().__init__(4)
+        super().__init__()
 
         self.set(0, 1, x_y)
         self.set(0, 2, x_z)
@@ -152,7 +197,7 @@ class Shear(Identity):
         self.set(2, 0, z_x)
         self.set(2, 1, z_y)
 
-class ViewTransform(matrices.Matrix):
+class ViewTransform(Transform):
     """The view transform, given points that specify the camera direction
     and an up vector, provide the transform that gets the scene into that
     configuration
@@ -161,7 +206,7 @@ class ViewTransform(matrices.Matrix):
     def __init__(self, from_point: points.Point, to_point: points.Point,
                  up: vectors.Vector) -> None:
 
-        super().__init__(4, 4)
+        super().__init__()
 
         forward = (to_point - from_point).normalize()
         left = forward.cross(up.normalize())
@@ -177,7 +222,10 @@ class ViewTransform(matrices.Matrix):
         self.set(2, 0, -forward.x)
         self.set(2, 1, -forward.y)
         self.set(2, 2, -forward.z)
-        self.set(3, 3, 1)
 
+        # The orientation rows are only orthonormal when up is perpendicular
+        # to the view direction, so the inverse is left to be found
+        # numerically
         temp = self * Translate(-from_point.x, -from_point.y, -from_point.z)
-        self.values = temp.values
+        self.flat = temp.flat
+        self._forget_inverse()
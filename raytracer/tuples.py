@@ -7,6 +7,17 @@ class Tuple:
     """ This class represents a generic tuple.
     """
 
+    # The fixed-layout subclasses below keep their components in slots, so
+    # Tuple has no instance dictionary of its own.  Generic tuples, whose
+    # components are only named when they are made, are really made as
+    # _GenericTuple, which has one
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):        # pylint: disable=W0613
+        if cls is Tuple:
+            cls = _GenericTuple
+        return super().__new__(cls)
+
     def __init__(self, fillables, *args):
         """Initialize with a list of fillable items, and then one arg
         with the value per item.  For example, a 2d tuple with x and y
@@ -35,7 +46,7 @@ class Tuple:
             getattr(self, f[0]) + getattr(other, f[1]) for
             f in zip(self.fillables, other.fillables)]
 
-        return Tuple(self.fillables, *output_fillables)
+        return self.with_values(output_fillables)
 
     def __sub__(self, other):
 
@@ -46,14 +57,14 @@ class Tuple:
             getattr(self, f[0]) - getattr(other, f[1]) for
             f in zip(self.fillables, other.fillables)]
 
-        return Tuple(self.fillables, *output_fillables)
+        return self.with_values(output_fillables)
 
     def __neg__(self):
 
         output_fillables = [
             -getattr(self, f[0]) for f in self.fillables]
 
-        return Tuple(self.fillables, *output_fillables)
+        return self.with_values(output_fillables)
 
 
     def __mul__(self, other):
@@ -61,14 +72,14 @@ class Tuple:
         output_fillables = [
             getattr(self, f) * other for f in self.fillables]
 
-        return Tuple(self.fillables, *output_fillables)
+        return self.with_values(output_fillables)
 
     def __truediv__(self, other):
 
         output_fillables = [
             getattr(self, f[0]) / other for f in self.fillables]
 
-        return Tuple(self.fillables, *output_fillables)
+        return self.with_values(output_fillables)
 
     @staticmethod
     def _close(x, y, epsilon=1e-3):
@@ -92,6 +103,10 @@ class Tuple:
         """Return a raw list of the values in the tuple"""
         return [getattr(self, f) for f in self.fillables]
 
+    def with_values(self, values):
+        """Return a tuple of the same kind as this one, holding `values`"""
+        return Tuple(self.fillables, *values)
+
     def magnitude(self):
         """Return the magnitude of the tuple"""
 
@@ -108,7 +123,7 @@ class Tuple:
         output_fillables = [
             getattr(self, f[0]) / magnitude for f in self.fillables]
 
-        return Tuple(self.fillables, *output_fillables)
+        return self.with_values(output_fillables)
 
     def dot(self, other):
         """Calculates the dot product between two vectors.
@@ -122,11 +137,10 @@ class Tuple:
         also makes direct use of the fillable names
         """
 
-        return Tuple(["x", "y", "z", "w"],
-                     self.y * other.z - self.z * other.y,
-                     self.z * other.x - self.x * other.z,
-                     self.x * other.y - self.y * other.x,
-                     0)
+        return make_xyzw(self.y * other.z - self.z * other.y,
+                         self.z * other.x - self.x * other.z,
+                         self.x * other.y - self.y * other.x,
+                         0)
 
     def reflect(self, normal):
         """Reflects  self against a surface perpendicular to normal"""
@@ -136,3 +150,109 @@ class Tuple:
     def apply(self, M):
         """Does M * self and returns the resultant point"""
         return M * self
+
+
+class _GenericTuple(Tuple):
+    """A tuple made with `Tuple(fillables, *args)`, which keeps its fillables
+    and components in the instance dictionary
+    """
+
+
+# Maps a value of w to the Tuple4 subclass that represents it, so that
+# arithmetic on points and vectors gives back points and vectors
+_TYPES_BY_W: dict = {}
+
+def make_xyzw(x, y, z, w):
+    """Return a four component tuple, of the Tuple4 subclass registered for
+    the value of w (so a Point if w is 1, a Vector if it is 0), or a plain
+    Tuple4 for any other w
+    """
+
+    result = object.__new__(_TYPES_BY_W.get(w, Tuple4))
+    result.x = x
+    result.y = y
+    result.z = z
+    result.w = w
+    return result
+
+
+class Tuple4(Tuple):
+    """A tuple with the fixed components x, y, z and w, stored in slots.  The
+    arithmetic is unrolled rather than looping over the fillables, and the
+    results keep their type, so a point plus a vector is a point and the
+    difference between two points is a vector.
+
+    Subclasses register the value of w they represent with, for example,
+    `class Point(Tuple4, w=1)`
+    """
+
+    __slots__ = ("x", "y", "z", "w")
+    fillables = ("x", "y", "z", "w")
+
+    def __init_subclass__(cls, w=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if w is not None:
+            _TYPES_BY_W[w] = cls
+
+    def __init__(self, x, y, z, w):                  # pylint: disable=W0231
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+    def __repr__(self):
+        return f"Tuple [x={self.x} y={self.y} z={self.z} w={self.w}]"
+
+    def __add__(self, other):
+        try:
+            return make_xyzw(self.x + other.x, self.y + other.y,
+                             self.z + other.z, self.w + other.w)
+        except AttributeError:
+            return super().__add__(other)
+
+    def __sub__(self, other):
+        try:
+            return make_xyzw(self.x - other.x, self.y - other.y,
+                             self.z - other.z, self.w - other.w)
+        except AttributeError:
+            return super().__sub__(other)
+
+    def __neg__(self):
+        return make_xyzw(-self.x, -self.y, -self.z, -self.w)
+
+    def __mul__(self, other):
+        return make_xyzw(self.x * other, self.y * other, self.z * other,
+                         self.w * other)
+
+    def __truediv__(self, other):
+        return make_xyzw(self.x / other, self.y / other, self.z / other,
+                         self.w / other)
+
+    def __eq__(self, other):
+        try:
+            return (abs(self.x - other.x) < 1e-3 and
+                    abs(self.y - other.y) < 1e-3 and
+                    abs(self.z - other.z) < 1e-3 and
+                    abs(self.w - other.w) < 1e-3)
+        except AttributeError:
+            return super().__eq__(other)
+
+    def values(self) -> list:
+        return [self.x, self.y, self.z, self.w]
+
+    def with_values(self, values):
+        return make_xyzw(*values)
+
+    def magnitude(self):
+        return math.sqrt(self.x * self.x + self.y * self.y +
+                         self.z * self.z + self.w * self.w)
+
+    def normalize(self):
+        magnitude = math.sqrt(self.x * self.x + self.y * self.y +
+                              self.z * self.z + self.w * self.w)
+        return make_xyzw(self.x / magnitude, self.y / magnitude,
+                         self.z / magnitude, self.w / magnitude)
+
+    def dot(self, other):
+        return (self.x * other.x + self.y * other.y + self.z * other.z +
+                self.w * other.w)
@@ -1,3 +1,5 @@
+import argparse
+import logging
 import math
 
 import raytracer.cameras as cameras
@@ -8,11 +10,23 @@ import raytracer.materials as materials
 import raytracer.scenes as scenes
 import raytracer.shapes as shapes
 import raytracer.points as points
+import raytracer.progress as progress
 import raytracer.transforms as transforms
 import raytracer.rays as rays
 import raytracer.vectors as vectors
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Render the test scene")
+    parser.add_argument("--output", default="scene1.ppm",
+                        help="Where to write the rendered image")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes to render in, 0 for one per CPU")
+    parser.add_argument("--profile", metavar="PSTATS",
+                        help="Profile the render, saving the profile here and "
+                             "printing the hottest functions")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
 
     floor = shapes.Plane(
         material=materials.Material(
@@ -81,5 +95,7 @@ if __name__ == "__main__":
         vectors.Vector(0, 1, 0)
         )
 
-    canvas = camera.render(scene)
-    canvas.to_ppm(f"scene1.ppm")
+    canvas = camera.render(scene, processes=args.processes or None,
+                           progress=progress.LoggingProgress(),
+                           profile=args.profile)
+    canvas.to_ppm(args.output)
@@ -0,0 +1,43 @@
+"""The scene and camera shared by the tests that render whole images"""
+import math
+
+import cameras
+import colors
+import lights
+import materials
+import points
+import scenes
+import shapes
+import transforms
+import vectors
+
+def default_scene():
+    """Two concentric spheres lit from the upper left, as in the book"""
+
+    # Inner sphere size 0.5, centered on the origin
+    s1 = shapes.Sphere()
+    s1.set_transform(transforms.Scale(0.5,0.5,0.5))
+
+    # Outer sphere centered on the origin, size 1.0
+    s2 = shapes.Sphere()
+    s2.material = materials.Material(
+        color=colors.Color(0.8, 1.0, 0.6), diffuse=0.7, specular=0.2)
+
+    l1 = lights.Light(
+        position=points.Point(-10, 10, -10),
+        intensity=colors.Color(1, 1, 1)
+        )
+
+    return scenes.Scene(objects = [s1, s2], lights = [l1])
+
+
+def default_camera(hsize=11, vsize=11):
+    """A camera looking at the origin from 5 units down the -ve z axis"""
+
+    cam = cameras.Camera(hsize, vsize, math.pi/2)
+
+    from_point = points.Point(0, 0, -5)
+    to_point = points.Point(0, 0, 0)
+    up = vectors.Vector(0, 1, 0)
+    cam.transform = transforms.ViewTransform(from_point, to_point, up)
+    return cam
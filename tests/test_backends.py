@@ -0,0 +1,142 @@
+import math
+import unittest
+
+import backends
+import colors
+import exceptions
+import matrices
+import points
+import transforms
+import vectors
+
+def _points():
+    """A spread of points, including negative and fractional coordinates"""
+    return [points.Point(x / 3, -y, 2 * x - y)
+            for x in range(-3, 4) for y in range(3)]
+
+
+def _transform():
+    """A transform that rotates, scales and translates"""
+    return (transforms.Translate(1, -2, 3) * transforms.RotateY(math.pi/5) *
+            transforms.Scale(2, 0.5, 1))
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def tearDown(self):
+        backends.set_backend(backends.PYTHON)
+
+    def test_default_backend(self):
+        """Test the pure Python backend is used unless another is chosen"""
+
+        self.assertEqual(backends.get_backend(), backends.PYTHON)
+        batch = backends.TupleArray.from_tuples(_points())
+        self.assertEqual(batch.backend, backends.PYTHON)
+
+    def test_unknown_backend(self):
+        """Test choosing a backend that doesn't exist raises"""
+
+        with self.assertRaises(ValueError):
+            backends.set_backend("fortran")
+
+    @unittest.skipIf(backends.HAS_NUMPY, "numpy is installed")
+    def test_numpy_unavailable(self):
+        """Test the numpy backend can't be chosen without numpy"""
+
+        with self.assertRaises(exceptions.BackendUnavailableError):
+            backends.set_backend(backends.NUMPY)
+        self.assertEqual(backends.get_backend(), backends.PYTHON)
+
+
+class TestTupleArray(unittest.TestCase):
+
+    backend = backends.PYTHON
+
+    def test_round_trip(self):
+        """Test tuples come back out of a batch unchanged, and as the same
+        kind of tuple
+        """
+
+        batch = backends.TupleArray.from_tuples(_points(), backend=self.backend)
+        self.assertEqual(len(batch), len(_points()))
+        self.assertEqual(batch.to_tuples(), _points())
+        self.assertIsInstance(batch[-1], points.Point)
+
+        shades = [colors.Color(0.1, 0.2, 0.3), colors.Color(1, 0.5, 0)]
+        batch = backends.TupleArray.from_tuples(shades, backend=self.backend)
+        self.assertEqual(list(batch), shades)
+        self.assertIsInstance(batch[0], colors.Color)
+
+        with self.assertRaises(IndexError):
+            batch[2]                                  # pylint: disable=W0104
+
+    def test_apply_many_matches_scalar(self):
+        """Test transforming a batch gives the same answers as transforming
+        each tuple on its own
+        """
+
+        M = _transform()
+
+        batch = backends.TupleArray.from_tuples(_points(), backend=self.backend)
+        for p, q in zip(M.apply_many(batch), _points()):
+            self.assertEqual(p, M * q)
+            self.assertIsInstance(p, points.Point)
+
+        directions = [vectors.Vector(1, 2, 3), vectors.Vector(-0.5, 0, 4)]
+        batch = backends.TupleArray.from_tuples(directions,
+                                                backend=self.backend)
+        for v, u in zip(M.apply_many(batch), directions):
+            self.assertEqual(v, M.apply_vector(u))
+            self.assertIsInstance(v, vectors.Vector)
+
+    def test_apply_many_generic_matrix(self):
+        """Test a generic 4x4 matrix transforms batches too, and that other
+        sizes can't
+        """
+
+        M = matrices.Matrix(4, 4)
+        for i, value in enumerate(_transform().flat):
+            M.set(i // 4, i % 4, value)
+
+        batch = backends.TupleArray.from_tuples(_points(), backend=self.backend)
+        self.assertEqual(M.apply_many(batch).to_tuples(),
+                         _transform().apply_many(batch).to_tuples())
+
+        with self.assertRaises(exceptions.IncompatibleLengthError):
+            transforms.Identity(3).apply_many(batch)
+
+        shades = backends.TupleArray.from_tuples([colors.Color(1, 1, 1)],
+                                                 backend=self.backend)
+        with self.assertRaises(exceptions.IncompatibleLengthError):
+            M.apply_many(shades)
+
+    def test_empty(self):
+        """Test an empty batch can be built from its template"""
+
+        batch = backends.TupleArray.from_tuples(
+            [], template=points.Point(0, 0, 0), backend=self.backend)
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(len(_transform().apply_many(batch)), 0)
+
+
+@unittest.skipUnless(backends.HAS_NUMPY, "numpy is not installed")
+class TestNumpyTupleArray(TestTupleArray):
+
+    backend = backends.NUMPY
+
+    def test_matches_python_backend(self):
+        """Test both backends transform a batch to the same values"""
+
+        M = _transform()
+        python = M.apply_many(backends.TupleArray.from_tuples(
+            _points(), backend=backends.PYTHON))
+        numpy = M.apply_many(backends.TupleArray.from_tuples(
+            _points(), backend=backends.NUMPY))
+
+        for p, q in zip(python, numpy):
+            for a, b in zip(p.values(), q.values()):
+                self.assertAlmostEqual(a, b, places=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import math
+import unittest
+
+import bounds
+import points
+import rays
+import shapes
+import stats
+import transforms
+import vectors
+
+class TestBoundingBox(unittest.TestCase):
+
+    def test_empty(self):
+        """Test a new box is empty, and grows to fit what is added to it"""
+
+        box = bounds.BoundingBox()
+        self.assertTrue(box.is_empty())
+        self.assertEqual(box.surface_area(), 0)
+
+        box.add_point(points.Point(-5, 2, 0))
+        box.add_point(points.Point(7, 0, -3))
+        self.assertFalse(box.is_empty())
+        self.assertEqual(box.minimum, points.Point(-5, 0, -3))
+        self.assertEqual(box.maximum, points.Point(7, 2, 0))
+
+        box.add_box(bounds.BoundingBox(points.Point(-1, -1, -1),
+                                       points.Point(1, 1, 1)))
+        self.assertEqual(box.minimum, points.Point(-5, -1, -3))
+        self.assertEqual(box.maximum, points.Point(7, 2, 1))
+
+    def test_measurements(self):
+        """Test a box's centroid and surface area"""
+
+        box = bounds.BoundingBox(points.Point(-1, 0, 2), points.Point(1, 3, 6))
+        self.assertEqual(box.centroid(), (0, 1.5, 4))
+        self.assertEqual(box.surface_area(), 2 * (2*3 + 3*4 + 4*2))
+        self.assertTrue(box.is_bounded())
+        self.assertFalse(bounds.BoundingBox.infinite().is_bounded())
+
+    def test_transform(self):
+        """Test transforming a box gives the box around its moved corners"""
+
+        box = bounds.BoundingBox(points.Point(-1, -1, -1),
+                                 points.Point(1, 1, 1))
+
+        moved = box.transform(transforms.Translate(1, 2, 3) *
+                              transforms.Scale(2, 1, 1))
+        self.assertEqual(moved, bounds.BoundingBox(points.Point(-1, 1, 2),
+                                                   points.Point(3, 3, 4)))
+
+        turned = box.transform(transforms.RotateY(math.pi/4))
+        self.assertAlmostEqual(turned.max_x, math.sqrt(2))
+        self.assertAlmostEqual(turned.min_z, -math.sqrt(2))
+        self.assertAlmostEqual(turned.max_y, 1)
+
+        self.assertEqual(bounds.BoundingBox.infinite().transform(
+            transforms.Translate(1, 0, 0)), bounds.BoundingBox.infinite())
+
+    def test_intersects(self):
+        """Test the slab test, including rays parallel to faces"""
+
+        box = bounds.BoundingBox(points.Point(-1, -1, -1),
+                                 points.Point(1, 1, 1))
+
+        cases = [
+            (points.Point(5, 0.5, 0), vectors.Vector(-1, 0, 0), True),
+            (points.Point(-5, 0.5, 0), vectors.Vector(1, 0, 0), True),
+            (points.Point(0.5, 5, 0), vectors.Vector(0, -1, 0), True),
+            (points.Point(0, 0, 0), vectors.Vector(0, 0, 1), True),
+            (points.Point(-2, 0, 0), vectors.Vector(2, 4, 6), False),
+            (points.Point(2, 0, 2), vectors.Vector(0, 0, -1), False),
+            (points.Point(2, 2, 0), vectors.Vector(-1, 0, 0), False),
+            (points.Point(0, 0, 5), vectors.Vector(0, 0, 1), False)]
+
+        for origin, direction, expected in cases:
+            self.assertEqual(
+                box.intersects(rays.Ray(origin, direction), t_min=0),
+                expected, (origin, direction))
+
+        # The whole line of the ray passes through the box, but not the part
+        # asked about
+        r = rays.Ray(points.Point(5, 0, 0), vectors.Vector(1, 0, 0))
+        self.assertTrue(box.intersects(r))
+        self.assertFalse(box.intersects(r, t_min=0))
+        r = rays.Ray(points.Point(-5, 0, 0), vectors.Vector(1, 0, 0))
+        self.assertFalse(box.intersects(r, t_max=3))
+
+        self.assertEqual(box.hit_range((-5, 0, 0), (1, math.inf, math.inf),
+                                       0, math.inf), (4, 6))
+
+
+class TestShapeBounds(unittest.TestCase):
+
+    def test_sphere(self):
+        """Test a sphere's bounds follow its transform"""
+
+        s = shapes.Sphere()
+        self.assertEqual(s.bounds(), bounds.BoundingBox(
+            points.Point(-1, -1, -1), points.Point(1, 1, 1)))
+
+        s.set_transform(transforms.Translate(0, 5, 0) *
+                        transforms.Scale(2, 2, 2))
+        self.assertEqual(s.world_bounds(), bounds.BoundingBox(
+            points.Point(-2, 3, -2), points.Point(2, 7, 2)))
+
+    def test_plane(self):
+        """Test a plane is unbounded, however it is transformed"""
+
+        p = shapes.Plane()
+        self.assertFalse(p.bounds().is_bounded())
+        self.assertEqual(p.bounds().min_y, 0)
+        self.assertEqual(p.bounds().max_y, 0)
+
+        p.set_transform(transforms.Translate(0, -1, 0))
+        self.assertFalse(p.world_bounds().is_bounded())
+
+    def test_pretest(self):
+        """Test rays that miss a shape's bounds are rejected without
+        changing the answer, and still counted as tests
+        """
+
+        s = shapes.Sphere()
+        s.set_transform(transforms.Translate(0, 5, 0) *
+                        transforms.Scale(2, 2, 2))
+        collector = stats.RenderStats()
+
+        # Misses the box altogether, and only passes through it behind t_max
+        r = rays.Ray(points.Point(0, 0, -10), vectors.Vector(0, 0, 1))
+        self.assertTrue(s._misses_bounds(r, 0, math.inf))
+        self.assertEqual(len(s.intersect(r, stats=collector)), 0)
+        self.assertFalse(s.occludes(r, stats=collector))
+        r = rays.Ray(points.Point(0, 5, -10), vectors.Vector(0, 0, 1))
+        self.assertTrue(s._misses_bounds(r, 0, 7))
+        self.assertFalse(s.occludes(r, t_max=7, stats=collector))
+
+        summary = collector.summary()
+        self.assertEqual(summary["intersection_tests"], 3)
+        self.assertEqual(summary["hits"], 0)
+
+        # Grazing the side of the sphere, which touches its bounds
+        r = rays.Ray(points.Point(2, 5, -10), vectors.Vector(0, 0, 1))
+        self.assertFalse(s._misses_bounds(r, 0, math.inf))
+        self.assertEqual([x.t for x in s.intersect(r).intersections],
+                         [10, 10])
+
+        # Planes are never rejected
+        p = shapes.Plane()
+        r = rays.Ray(points.Point(0, 1, 0), vectors.Vector(0, -1, 0))
+        self.assertFalse(p._misses_bounds(r, 0, math.inf))
+        self.assertEqual(len(p.intersect(r)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,277 @@
+import math
+import pickle
+import random
+import unittest
+
+import bvh
+import colors
+import lights
+import points
+import rays
+import scenes
+import shapes
+import stats
+import transforms
+import vectors
+
+def _random_scene(count, seed=1):
+    """Spheres of various sizes scattered through a cube, above a floor"""
+
+    rng = random.Random(seed)
+    objects = []
+    for _ in range(count):
+        sphere = shapes.Sphere()
+        radius = rng.uniform(0.1, 1.5)
+        sphere.set_transform(
+            transforms.Translate(rng.uniform(-20, 20), rng.uniform(-20, 20),
+                                 rng.uniform(-20, 20)) *
+            transforms.Scale(radius, radius * rng.uniform(0.5, 1.5), radius))
+        objects.append(sphere)
+
+    floor = shapes.Plane()
+    floor.set_transform(transforms.Translate(0, -25, 0))
+    objects.append(floor)
+
+    return scenes.Scene(objects=objects, lights=[
+        lights.PointLight(points.Point(0, 50, 0), colors.Color(1, 1, 1))])
+
+
+def _random_rays(count, seed=2):
+    """Rays from all around the scene, pointing roughly into it"""
+
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        origin = points.Point(rng.uniform(-30, 30), rng.uniform(-30, 30),
+                              rng.uniform(-30, 30))
+        target = points.Point(rng.uniform(-10, 10), rng.uniform(-10, 10),
+                              rng.uniform(-10, 10))
+        result.append(rays.Ray(origin, (target - origin).normalize()))
+    return result
+
+
+def _brute_force_closest(objects, ray, t_min=0.0, t_max=math.inf):
+    """The closest intersection found by testing every object"""
+
+    closest = None
+    for shape in objects:
+        for isection in shape.intersect(ray).intersections:
+            if t_min < isection.t < t_max and \
+               (closest is None or isection.t < closest.t):
+                closest = isection
+    return closest
+
+
+class TestBVH(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = _random_scene(300)
+        self.hierarchy = bvh.BVH(self.scene.objects)
+
+    def test_structure(self):
+        """Test every bounded shape is in exactly one leaf, inside the box of
+        every node above it, and the plane is kept apart
+        """
+
+        self.assertEqual(self.hierarchy.size, 300)
+        self.assertEqual(len(self.hierarchy.unbounded), 1)
+        self.assertIsInstance(self.hierarchy.unbounded[0], shapes.Plane)
+
+        found = []
+        stack = [self.hierarchy.root]
+        while stack:
+            node = stack.pop()
+            if node.shapes is not None:
+                for shape in node.shapes:
+                    box = shape.world_bounds()
+                    self.assertLessEqual(node.box.min_x, box.min_x)
+                    self.assertGreaterEqual(node.box.max_z, box.max_z)
+                    found.append(shape)
+            else:
+                stack.extend((node.left, node.right))
+
+        self.assertEqual(sorted(id(shape) for shape in found),
+                         sorted(id(shape) for shape in self.scene.objects[:-1]))
+
+    def test_matches_brute_force(self):
+        """Test the BVH queries give the same answers as testing every
+        object
+        """
+
+        for ray in _random_rays(200):
+            expected = _brute_force_closest(self.scene.objects, ray)
+            actual = self.hierarchy.intersect_closest(ray, 0.0, math.inf)
+            if expected is None:
+                self.assertIsNone(actual)
+            else:
+                self.assertEqual(actual.t, expected.t)
+                self.assertIs(actual.shape, expected.shape)
+
+            self.assertEqual(
+                self.hierarchy.find_occluder(ray, 0.0, 20) is not None,
+                _brute_force_closest(self.scene.objects, ray, 0.0, 20)
+                is not None)
+
+            every = [x.t for shape in self.scene.objects
+                     for x in shape.intersect(ray).intersections]
+            self.assertEqual(
+                [x.t for x in self.hierarchy.intersect_all(ray).intersections],
+                sorted(every))
+
+    def test_prunes_tests(self):
+        """Test a ray through a crowded scene is tested against far fewer
+        shapes than there are
+        """
+
+        collector = stats.RenderStats()
+        for ray in _random_rays(50):
+            self.hierarchy.intersect_closest(ray, 0.0, math.inf, collector)
+
+        self.assertLess(collector.summary()["intersection_tests"],
+                        50 * 301 / 5)
+
+    def test_subset(self):
+        """Test a pruned BVH finds the same hits as a brute force search of
+        the shapes kept, and shares the untouched parts of the tree
+        """
+
+        # Every third sphere, and the plane, which is last
+        kept = self.scene.objects[::3]
+        subset = bvh.BVH.subset(self.hierarchy, kept)
+        self.assertEqual(subset.size, len(kept) - 1)
+        self.assertEqual(subset.unbounded, self.hierarchy.unbounded)
+
+        for ray in _random_rays(200):
+            expected = _brute_force_closest(kept, ray)
+            actual = subset.intersect_closest(ray, 0.0, math.inf)
+            if expected is None:
+                self.assertIsNone(actual)
+            else:
+                self.assertEqual(actual.t, expected.t)
+                self.assertIs(actual.shape, expected.shape)
+
+        everything = bvh.BVH.subset(self.hierarchy, self.scene.objects)
+        self.assertIs(everything.root, self.hierarchy.root)
+        self.assertEqual(everything.unbounded, self.hierarchy.unbounded)
+        self.assertIsNone(bvh.BVH.subset(self.hierarchy, []).root)
+
+    def test_degenerate_scenes(self):
+        """Test scenes with no bounded shapes, or shapes all in one place"""
+
+        ray = rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1))
+
+        self.assertIsNone(bvh.BVH([]).intersect_closest(ray, 0, math.inf))
+
+        concentric = []
+        for radius in (1, 2, 3, 4, 5):
+            sphere = shapes.Sphere()
+            sphere.set_transform(transforms.Scale(radius, radius, radius))
+            concentric.append(sphere)
+        hierarchy = bvh.BVH(concentric)
+        # The biggest sphere touches the ray origin, at t=0, which is excluded
+        self.assertEqual(hierarchy.intersect_closest(ray, 0, math.inf).t, 1)
+        self.assertEqual(len(hierarchy.intersect_all(ray)), 10)
+
+
+class TestSceneBVH(unittest.TestCase):
+
+    def test_rebuilt_when_scene_changes(self):
+        """Test moving, adding and replacing objects is noticed"""
+
+        scene = _random_scene(20)
+        ray = rays.Ray(points.Point(0, 0, -50), vectors.Vector(0, 0, 1))
+        hierarchy = scene._accelerator()
+        self.assertIs(scene._accelerator(), hierarchy)
+
+        # Move a sphere into the path of the ray
+        scene.objects[0].set_transform(transforms.Translate(0, 0, -40))
+        self.assertEqual(scene.intersect_closest(ray).t, 9)
+        self.assertIsNot(scene._accelerator(), hierarchy)
+
+        # Add one even closer
+        closer = shapes.Sphere()
+        closer.set_transform(transforms.Translate(0, 0, -45))
+        scene.add_object(closer)
+        self.assertIs(scene.intersect_closest(ray).shape, closer)
+
+        # Replace it, without calling prepare()
+        replacement = shapes.Sphere()
+        replacement.set_transform(transforms.Translate(0, 0, -46))
+        scene.prepare()
+        scene.objects[-1] = replacement
+        self.assertIs(scene.intersect_closest(ray).shape, replacement)
+
+        # Remove it, and assign a new list
+        del scene.objects[-1]
+        self.assertIs(scene.intersect_closest(ray).shape, scene.objects[0])
+        scene.objects = [closer]
+        self.assertIs(scene.intersect_closest(ray).shape, closer)
+
+    def test_callers_list_is_kept(self):
+        """Test the scene keeps the list it was given, so that appending to
+        it adds to the scene
+        """
+
+        objects = [shapes.Sphere()]
+        scene = scenes.Scene(objects=objects)
+        self.assertIs(scene.objects, objects)
+        scene.prepare()
+
+        closer = shapes.Sphere()
+        closer.set_transform(transforms.Translate(0, 0, -3))
+        objects.append(closer)
+        ray = rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1))
+        self.assertIs(scene.intersect_closest(ray).shape, closer)
+
+    def test_other_shapes_moving(self):
+        """Test making or moving shapes outside the scene doesn't rebuild its
+        BVH
+        """
+
+        scene = _random_scene(20)
+        hierarchy = scene._accelerator()
+
+        elsewhere = shapes.Sphere()
+        elsewhere.set_transform(transforms.Translate(1, 2, 3))
+        other_scene = _random_scene(5, seed=4)
+        other_scene.objects[0].set_transform(transforms.Translate(0, 9, 0))
+        other_scene.prepare()
+
+        self.assertIs(scene._accelerator(), hierarchy)
+        self.assertIs(scene.prepare(), hierarchy)
+
+    def test_removed_shape_casts_no_shadow(self):
+        """Test a shape removed from, or replaced in, the objects stops
+        shadowing points, though it was the last light's occluder
+        """
+
+        light = lights.PointLight(points.Point(0, 10, 0),
+                                  colors.Color(1, 1, 1))
+        blocker = shapes.Sphere()
+        blocker.set_transform(transforms.Translate(0, 5, 0))
+        scene = scenes.Scene(objects=[blocker], lights=[light])
+
+        self.assertTrue(scene.is_shadowed(points.Point(0, 0, 0), light))
+        scene.objects[0] = shapes.Plane()
+        self.assertFalse(scene.is_shadowed(points.Point(0, 1, 0), light))
+        scene.objects.remove(scene.objects[0])
+        self.assertFalse(scene.is_shadowed(points.Point(0, -1, 0), light))
+
+    def test_not_pickled(self):
+        """Test the BVH is left behind when a scene is pickled, and rebuilt
+        on the other side
+        """
+
+        scene = _random_scene(20)
+        scene.prepare()
+        copied = pickle.loads(pickle.dumps(scene))
+
+        self.assertIsNone(copied._bvh)
+        ray = rays.Ray(points.Point(0, 0, -50), vectors.Vector(0, 0, 1))
+        self.assertEqual(
+            [x.t for x in copied.intersect(ray).intersections],
+            [x.t for x in scene.intersect(ray).intersections])
+
+
+if __name__ == "__main__":
+    unittest.main()
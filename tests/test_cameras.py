@@ -1,16 +1,60 @@
+from concurrent import futures
+import asyncio
+import contextlib
+import io
+import logging
+import pickle
+import random
+import threading
+import time
 import unittest
 import math
 
+import bounds
 import cameras
 import colors
+import fixtures
 import lights
 import materials
 import points
+import progress
 import scenes
 import shapes
+import stats
 import transforms
 import vectors
 
+class SlowCamera(cameras.Camera):
+    """Camera that counts the tiles it renders and takes a while over each"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.tiles_rendered = 0
+        self.lock = threading.Lock()
+
+    def render_tile(self, scene, tile):
+        time.sleep(0.02)
+        with self.lock:
+            self.tiles_rendered += 1
+        return super().render_tile(scene, tile)
+
+
+class RecordingProgress(progress.Progress):
+    """Progress observer that remembers everything it is told"""
+
+    def __init__(self):
+        self.events = []
+
+    def start(self, total_pixels):
+        self.events.append(("start", total_pixels))
+
+    def tile_done(self, tile, pixels_done, total_pixels, elapsed):
+        self.events.append(("tile", tile, pixels_done, total_pixels))
+
+    def finish(self, total_pixels, elapsed):
+        self.events.append(("finish", total_pixels))
+
+
 class TestCamera(unittest.TestCase):
 
 
@@ -58,6 +102,72 @@ class TestCamera(unittest.TestCase):
         #self.assertEqual(ray.direction,
         #                 vectors.Vector(math.sqrt(2)/2, 0, -math.sqrt(2)/2))
 
+    def test_transform_caches_inverse(self):
+        """Test that setting the transform caches its inverse and the camera
+        position
+        """
+
+        cam = cameras.Camera(201, 101, math.pi/2)
+        cam.transform = transforms.Translate(0, -2, 5)
+
+        self.assertEqual(cam.inverse_transform, transforms.Translate(0, 2, -5))
+        self.assertEqual(cam.origin, points.Point(0, 2, -5))
+
+    def test_rays_for_tile(self):
+        """Test batched rays match the book's ray for each pixel, worked out
+        here independently of the camera's code
+        """
+
+        cam = cameras.Camera(21, 11, math.pi/2)
+        cam.transform = (transforms.RotateX(math.pi/5) *
+                         transforms.Translate(1, -2, 5))
+
+        # The inverse of the transform, written out by hand
+        inverse = (transforms.Translate(-1, 2, -5) *
+                   transforms.RotateX(-math.pi/5))
+        half_view = math.tan(math.pi/4)
+        half_width, half_height = half_view, half_view * 11 / 21
+        pixel_size = half_width * 2 / 21
+
+        def expected_ray(x, y):
+            world_x = half_width - (x + 0.5) * pixel_size
+            world_y = half_height - (y + 0.5) * pixel_size
+            pixel = inverse * points.Point(world_x, world_y, -1)
+            origin = inverse * points.Point(0, 0, 0)
+            return origin, (pixel - origin).normalize()
+
+        def assertRayIs(ray, x, y):
+            origin, direction = expected_ray(x, y)
+            for actual, expected in ((ray.origin, origin),
+                                     (ray.direction, direction)):
+                for got, wanted in zip(actual.values(), expected.values()):
+                    self.assertAlmostEqual(got, wanted, places=9)
+
+        tile_rays = cam.rays_for_tile((3, 2, 7, 5))
+        self.assertEqual(len(tile_rays), 12)
+
+        for index, (x, y) in enumerate((x, y) for y in range(2, 5)
+                                       for x in range(3, 7)):
+            assertRayIs(tile_rays[index], x, y)
+            assertRayIs(cam.ray_for_pixel(x, y), x, y)
+
+        self.assertEqual(len(cam.rays_for_row(4)), 21)
+        self.assertEqual(len(cam.rays_for_image()), 231)
+        assertRayIs(cam.rays_for_row(4)[5], 5, 4)
+        assertRayIs(cam.rays_for_image()[21 * 10 + 20], 20, 10)
+
+    def test_rays_for_tile_offset(self):
+        """Test we can fire rays through any point within the pixels"""
+
+        cam = cameras.Camera(201, 101, math.pi/2)
+
+        # The top left corner of the middle pixel is half a pixel up and left
+        # of its center
+        ray = cam.rays_for_tile((100, 50, 101, 51), offset=(0, 0))[0]
+        expected = vectors.Vector(cam.pixel_size / 2, cam.pixel_size / 2,
+                                  -1).normalize()
+        self.assertEqual(ray.direction, expected)
+
     def test_render_scene(self):
         """Test we can render a pixel in a simple scene"""
 
@@ -91,3 +201,338 @@ class TestCamera(unittest.TestCase):
         image = cam.render(scene)
         self.assertEqual(image.get(5, 5),
                          colors.Color(0.3807, 0.4758, 0.2855))
+
+    def test_in_view(self):
+        """Test boxes are only culled when they are wholly outside the view"""
+
+        cam = fixtures.default_camera()
+
+        def box(x_min, y_min, z_min, x_max, y_max, z_max):
+            return bounds.BoundingBox(points.Point(x_min, y_min, z_min),
+                                      points.Point(x_max, y_max, z_max))
+
+        # The camera is at z=-5 with a 90 degree field of view, so at z=0 the
+        # view is 10 wide
+        self.assertTrue(cam.in_view(box(-1, -1, -1, 1, 1, 1)))
+        self.assertTrue(cam.in_view(box(4.9, 0, -0.1, 6, 1, 0.1)))
+        self.assertTrue(cam.in_view(box(-100, -100, -100, 100, 100, 100)))
+        self.assertFalse(cam.in_view(box(5.2, 0, -0.1, 6, 1, 0.1)))
+        self.assertFalse(cam.in_view(box(0, -6, -0.1, 1, -5.2, 0.1)))
+        self.assertFalse(cam.in_view(box(-1, -1, -8, 1, 1, -6)))
+
+        # Outside the corner of the view, but not wholly outside either face
+        # on its own, so it can't be culled
+        self.assertTrue(cam.in_view(box(4, 4, -0.1, 8, 8, 0.1)))
+
+        self.assertTrue(cam.in_view(bounds.BoundingBox.infinite()))
+        self.assertFalse(cam.in_view(bounds.BoundingBox()))
+
+    def test_frustum_culling(self):
+        """Test objects out of view aren't tested by primary rays, but still
+        cast shadows, and the image is unchanged
+        """
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera()
+        expected = cam.render(scene)
+
+        # A sphere behind the camera, between it and the light, which shadows
+        # some of the view, and one off to the side in the dark
+        blocker = shapes.Sphere()
+        blocker.set_transform(transforms.Translate(-7, 7, -7))
+        hidden = shapes.Sphere()
+        hidden.set_transform(transforms.Translate(20, 0, 0))
+        scene.add_object(blocker)
+        scene.add_object(hidden)
+
+        candidates = cam.primary_candidates(scene)
+        self.assertEqual(candidates.size, 2)
+        self.assertIs(cam.primary_candidates(scene), candidates)
+
+        collector = stats.RenderStats()
+        image = cam.render(scene, stats=collector)
+        self.assertNotIn(str(hidden.id), collector.tests_by_object)
+        self.assertIn(str(blocker.id), collector.tests_by_object)
+        self.assertNotEqual(image.get(5, 5), expected.get(5, 5))
+
+        unculled = scenes.Scene(objects=list(scene.objects),
+                                lights=scene.lights)
+        for x in range(cam.hsize):
+            for y in range(cam.vsize):
+                color, _ = unculled.color_at(cam.ray_for_pixel(x, y))
+                self.assertEqual(image.get(x, y), color)
+
+        # Moving a shape or the camera finds the shapes in view again
+        hidden.set_transform(transforms.Translate(0, 0, 0))
+        self.assertEqual(cam.primary_candidates(scene).size, 3)
+        cam.transform = transforms.ViewTransform(
+            points.Point(0, 0, 5), points.Point(0, 0, 10),
+            vectors.Vector(0, 1, 0))
+        self.assertEqual(cam.primary_candidates(scene).size, 0)
+
+        self.assertIsNone(pickle.loads(pickle.dumps(cam))._candidates)
+
+    def test_screen_extent(self):
+        """Test every pixel whose ray hits a sphere is inside the sphere's
+        extent on the screen
+        """
+
+        cam = fixtures.default_camera(40, 30)
+        rng = random.Random(3)
+        for _ in range(20):
+            sphere = shapes.Sphere()
+            radius = rng.uniform(0.1, 1)
+            sphere.set_transform(
+                transforms.Translate(rng.uniform(-5, 5), rng.uniform(-4, 4),
+                                     rng.uniform(-4, 4)) *
+                transforms.Scale(radius, radius, radius))
+            extent = cam.screen_extent(sphere.world_bounds())
+
+            for y in range(cam.vsize):
+                for x in range(cam.hsize):
+                    if len(sphere.intersect(cam.ray_for_pixel(x, y),
+                                            t_min=0)) > 0:
+                        self.assertTrue(extent[0] <= x < extent[2] and
+                                        extent[1] <= y < extent[3])
+
+        # Unbounded, behind the camera and reaching behind it
+        self.assertEqual(cam.screen_extent(shapes.Plane().world_bounds()),
+                         (0, 0, 40, 30))
+        behind = bounds.BoundingBox(points.Point(-1, -1, -8),
+                                    points.Point(1, 1, -6))
+        self.assertIsNone(cam.screen_extent(behind))
+        behind.add_point(points.Point(0, 0, -4))
+        self.assertEqual(cam.screen_extent(behind), (0, 0, 40, 30))
+
+    def test_screen_bins(self):
+        """Test primary rays through a tile are only tested against the
+        objects that overlap it, and the image is unchanged
+        """
+
+        scene = fixtures.default_scene()
+        scene.objects[1].set_transform(transforms.Translate(2.5, 2.5, 0))
+        floor = shapes.Plane()
+        floor.set_transform(transforms.Translate(0, -3, 0))
+        scene.add_object(floor)
+        cam = fixtures.default_camera(64, 64)
+
+        bins = cam.screen_bins(scene)
+        self.assertIs(cam.screen_bins(scene), bins)
+        self.assertEqual(bins.cell_size, 16)
+
+        # The small sphere is in the middle, the big one up and to the right,
+        # and the floor is everywhere
+        self.assertEqual(cam.primary_candidates(scene, (0, 0, 16, 16)).size, 0)
+        self.assertEqual(cam.primary_candidates(scene, (48, 0, 64, 16)).size,
+                         1)
+        self.assertEqual(cam.primary_candidates(scene, (16, 32, 32, 48)).size,
+                         1)
+        self.assertEqual(cam.primary_candidates(scene, (32, 16, 48, 32)).size,
+                         2)
+        self.assertEqual(cam.primary_candidates(scene).size, 2)
+
+        # Tiles that don't line up with the cells get the objects of every
+        # cell they overlap
+        self.assertEqual(cam.primary_candidates(scene, (8, 40, 40, 56)).size,
+                         1)
+        self.assertEqual(cam.primary_candidates(scene, (8, 8, 40, 40)).size,
+                         2)
+        self.assertIs(cam.primary_candidates(scene, (0, 0, 1, 1)),
+                      cam.primary_candidates(scene, (15, 15, 16, 16)))
+        for tile in cam.tiles(16):
+            self.assertEqual(len(cam.primary_candidates(scene,
+                                                        tile).unbounded), 1)
+
+        # Binning can be turned off, which still culls, and is off by default
+        # when there are many objects for each pixel of a cell, which doesn't
+        cam.tile_binning = False
+        self.assertFalse(cam.screen_bins(scene).binned)
+        self.assertIs(cam.primary_candidates(scene, (0, 0, 16, 16)),
+                      cam.primary_candidates(scene))
+        self.assertEqual(cam.primary_candidates(scene).size, 2)
+        cam.tile_binning = None
+        self.assertTrue(cam.screen_bins(scene).binned)
+        crowded = list(scene.objects) + [shapes.Sphere(), shapes.Sphere()]
+        self.assertEqual(cameras.BINNING_OBJECTS_PER_PIXEL, 1)
+        self.assertTrue(cameras.ScreenBins(cam, crowded[:1],
+                                           cell_size=1).binned)
+        unbinned = cameras.ScreenBins(cam, crowded, cell_size=1)
+        self.assertFalse(unbinned.binned)
+        self.assertEqual(unbinned.visible.size, 4)
+        self.assertTrue(cameras.ScreenBins(cam, crowded, cell_size=1,
+                                           binning=True).binned)
+
+        cam = fixtures.default_camera(24, 24)
+        unculled = scenes.Scene(objects=list(scene.objects),
+                                lights=scene.lights)
+        for image in (cam.render(scene, tile_size=4),
+                      cam.render_progressive(scene)):
+            for x in range(cam.hsize):
+                for y in range(cam.vsize):
+                    color, _ = unculled.color_at(cam.ray_for_pixel(x, y))
+                    self.assertEqual(image.get(x, y), color)
+
+    def test_tiles(self):
+        """Test the image is covered exactly once by tiles, with smaller tiles
+        on the right and bottom edges
+        """
+
+        cam = cameras.Camera(10, 7, math.pi/2)
+        tiles = list(cam.tiles(4))
+
+        self.assertEqual(tiles[0], (0, 0, 4, 4))
+        self.assertEqual(tiles[2], (8, 0, 10, 4))
+        self.assertEqual(tiles[-1], (8, 4, 10, 7))
+
+        covered = [(x, y) for x_min, y_min, x_max, y_max in tiles
+                   for y in range(y_min, y_max) for x in range(x_min, x_max)]
+        self.assertEqual(len(covered), 70)
+        self.assertEqual(len(set(covered)), 70)
+
+    def test_render_parallel(self):
+        """Test that rendering tiles in worker processes gives exactly the same
+        image as rendering serially
+        """
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera(13, 9)
+
+        parallel = cam.render(scene, processes=2, tile_size=4)
+        # The workers bin the objects, so this process doesn't
+        self.assertIsNone(cam._candidates)
+        serial = cam.render(scene)
+        self.assertIsNotNone(cam._candidates)
+
+        for x in range(cam.hsize):
+            for y in range(cam.vsize):
+                self.assertEqual(parallel.get(x, y).values(),
+                                 serial.get(x, y).values())
+    def test_render_progress(self):
+        """Test the progress observer hears about every tile, and that
+        rendering writes nothing to stdout or the logging configuration
+        """
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera(10, 6)
+        observer = RecordingProgress()
+        handlers = list(logging.getLogger().handlers)
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            cam.render(scene, tile_size=4, progress=observer)
+
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertEqual(logging.getLogger().handlers, handlers)
+
+        self.assertEqual(observer.events[0], ("start", 60))
+        self.assertEqual(observer.events[1], ("tile", (0, 0, 4, 4), 16, 60))
+        self.assertEqual(observer.events[-2], ("tile", (8, 4, 10, 6), 60, 60))
+        self.assertEqual(observer.events[-1], ("finish", 60))
+        self.assertEqual(len(observer.events), 8)
+
+    def test_render_progressive(self):
+        """Test each progressive pass reports a filled canvas and the last
+        matches a normal render
+        """
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera(11, 11)
+
+        passes = []
+
+        def callback(image, step):
+            passes.append(step)
+            if step == 4:
+                # The whole of each 4x4 block shares its top left pixel
+                self.assertEqual(image.get(7, 6).values(),
+                                 image.get(4, 4).values())
+
+        image = cam.render_progressive(scene, callback)
+        serial = cam.render(scene)
+
+        self.assertEqual(passes, [4, 2, 1])
+        for x in range(cam.hsize):
+            for y in range(cam.vsize):
+                self.assertEqual(image.get(x, y).values(),
+                                 serial.get(x, y).values())
+
+    def test_render_progressive_traces_each_pixel_once(self):
+        """Test that later passes reuse pixels traced in earlier ones"""
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera(10, 6)
+
+        traced = []
+        original = cam.ray_for_pixel
+
+        def counting_ray_for_pixel(x, y):
+            traced.append((x, y))
+            return original(x, y)
+
+        cam.ray_for_pixel = counting_ray_for_pixel
+        cam.render_progressive(scene)
+
+        self.assertEqual(len(traced), 60)
+        self.assertEqual(len(set(traced)), 60)
+
+
+class TestCameraAsync(unittest.TestCase):
+    """Tests on rendering from an asyncio event loop"""
+
+    def test_render_async(self):
+        """Test the async render gives the same image as the blocking one"""
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera(9, 7)
+
+        with futures.ThreadPoolExecutor(2) as executor:
+            image = asyncio.run(cam.render_async(scene, executor, tile_size=3))
+
+        serial = cam.render(scene)
+        for x in range(cam.hsize):
+            for y in range(cam.vsize):
+                self.assertEqual(image.get(x, y).values(),
+                                 serial.get(x, y).values())
+
+    def test_render_async_process_pool(self):
+        """Test rendering on a pool whose workers already hold the scene"""
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera(9, 7)
+
+        with cam.process_pool(scene, 2) as executor:
+            image = asyncio.run(cam.render_async(scene, executor, tile_size=3))
+        self.assertIsNone(cam._candidates)
+
+        serial = cam.render(scene)
+        self.assertEqual(image.get(4, 3).values(), serial.get(4, 3).values())
+
+    def test_render_tiles_async(self):
+        """Test every tile is yielded exactly once"""
+
+        scene = fixtures.default_scene()
+        cam = fixtures.default_camera(9, 7)
+
+        async def collect():
+            return [tile async for tile, _ in
+                    cam.render_tiles_async(scene, tile_size=4)]
+
+        tiles = asyncio.run(collect())
+        self.assertEqual(sorted(tiles), sorted(cam.tiles(4)))
+
+    def test_render_async_timeout(self):
+        """Test that a render that times out stops queueing tiles"""
+
+        scene = fixtures.default_scene()
+        cam = SlowCamera(20, 20, math.pi/2)
+
+        with futures.ThreadPoolExecutor(2) as executor:
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(cam.render_async(scene, executor, tile_size=2,
+                                             timeout=0.1))
+
+        self.assertLess(cam.tiles_rendered, len(list(cam.tiles(2))))
+
+
+if __name__ == "__main__":
+    unittest.main()
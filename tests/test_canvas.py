@@ -85,6 +85,39 @@ class TestCanvas(unittest.TestCase):
         self.assertEqual(ppm_content[-1:], "\n")
 
 
+    def test_set_tile(self):
+        """Test we can fill a rectangle of the canvas from a flat list of
+        pixels
+        """
+
+        c = canvas.Canvas(4, 3)
+        red = colors.Color(1, 0, 0)
+        green = colors.Color(0, 1, 0)
+        blue = colors.Color(0, 0, 1)
+        white = colors.Color(1, 1, 1)
+
+        c.set_tile((1, 1, 3, 3), [red, green, blue, white])
+
+        self.assertEqual(c.get(1, 1), red)
+        self.assertEqual(c.get(2, 1), green)
+        self.assertEqual(c.get(1, 2), blue)
+        self.assertEqual(c.get(2, 2), white)
+        self.assertEqual(c.get(0, 0), colors.Color(0, 0, 0))
+        self.assertEqual(c.get(3, 2), colors.Color(0, 0, 0))
+
+    def test_pack_tile_round_trip(self):
+        """Test that packed tiles unpack to exactly the packed colors"""
+
+        pixels = [colors.Color(0.1, 0.2, 0.3), colors.Color(1/3, 2.5, -1)]
+        block = canvas.pack_tile((4, 5, 6, 6), pixels)
+        tile, unpacked = canvas.unpack_tile(block)
+
+        self.assertEqual(len(block), canvas.TILE_HEADER.size +
+                         2 * canvas.PACKED_PIXEL_SIZE)
+        self.assertEqual(tile, (4, 5, 6, 6))
+        self.assertEqual([p.values() for p in unpacked],
+                         [p.values() for p in pixels])
+
 
 if __name__ == "__main__":
     unittest.main()
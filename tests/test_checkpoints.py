@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+
+import checkpoints
+import colors
+import exceptions
+import fixtures
+import transforms
+
+_scene = fixtures.default_scene
+
+
+def _camera():
+    """The shared camera, at the size these tests use"""
+    return fixtures.default_camera(9, 7)
+
+
+class TestCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "render.ckpt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fingerprint(self):
+        """Test that identically built scenes share a fingerprint, which
+        changes if anything that is rendered changes
+        """
+
+        self.assertEqual(checkpoints.fingerprint(_camera(), _scene()),
+                         checkpoints.fingerprint(_camera(), _scene()))
+
+        moved = _scene()
+        moved.objects[0].set_transform(transforms.Scale(0.6, 0.5, 0.5))
+        self.assertNotEqual(checkpoints.fingerprint(_camera(), _scene()),
+                            checkpoints.fingerprint(_camera(), moved))
+
+        recolored = _scene()
+        recolored.lights[0].intensity = colors.Color(1, 1, 0.9)
+        self.assertNotEqual(checkpoints.fingerprint(_camera(), _scene()),
+                            checkpoints.fingerprint(_camera(), recolored))
+
+    def test_render_writes_checkpoint(self):
+        """Test that a checkpointed render stores every tile"""
+
+        cam = _camera()
+        image = cam.render(_scene(), tile_size=4, checkpoint=self.path)
+
+        with checkpoints.Checkpoint(self.path, cam, _scene(), 4) as checkpoint:
+            done = checkpoint.load()
+
+        self.assertEqual(sorted(done), sorted(cam.tiles(4)))
+        self.assertEqual(done[(4, 4, 8, 7)][0].values(),
+                         image.get(4, 4).values())
+
+    def test_resume_skips_finished_tiles(self):
+        """Test that tiles already in the checkpoint are reused rather than
+        rendered again, and the remaining tiles are rendered
+        """
+
+        cam = _camera()
+        marker = colors.Color(0.25, 0.5, 0.75)
+
+        # Pretend the render was killed after finishing the first tile
+        with checkpoints.Checkpoint(self.path, cam, _scene(), 4) as checkpoint:
+            checkpoint.load()
+            checkpoint.record((0, 0, 4, 4), [marker] * 16)
+
+        image = cam.render(_scene(), tile_size=4, checkpoint=self.path)
+        expected = cam.render(_scene(), tile_size=4)
+
+        self.assertEqual(image.get(3, 3).values(), marker.values())
+        self.assertEqual(image.get(4, 4).values(),
+                         expected.get(4, 4).values())
+
+    def test_resume_ignores_truncated_tile(self):
+        """Test that a tile only partly written when the render died is
+        discarded
+        """
+
+        cam = _camera()
+        cam.render(_scene(), tile_size=4, checkpoint=self.path)
+
+        size = os.path.getsize(self.path)
+        with open(self.path, "r+b") as file_handle:
+            file_handle.truncate(size - 10)
+
+        with checkpoints.Checkpoint(self.path, cam, _scene(), 4) as checkpoint:
+            done = checkpoint.load()
+        self.assertEqual(len(done), len(list(cam.tiles(4))) - 1)
+
+        image = cam.render(_scene(), tile_size=4, checkpoint=self.path)
+        expected = cam.render(_scene(), tile_size=4)
+        self.assertEqual(image.get(8, 6).values(),
+                         expected.get(8, 6).values())
+
+    def test_resume_refuses_other_scene(self):
+        """Test that a checkpoint can't be resumed with a different scene"""
+
+        cam = _camera()
+        cam.render(_scene(), tile_size=4, checkpoint=self.path)
+
+        scene = _scene()
+        scene.objects[1].material.color = colors.Color(1, 0, 0)
+
+        with self.assertRaises(exceptions.CheckpointMismatchError):
+            cam.render(scene, tile_size=4, checkpoint=self.path)
+
+    def test_resume_refuses_other_tile_size(self):
+        """Test that a checkpoint can't be resumed with a different tile
+        size, whose tiles would never match the saved ones, and isn't added
+        to
+        """
+
+        cam = _camera()
+        cam.render(_scene(), tile_size=4, checkpoint=self.path)
+        size = os.path.getsize(self.path)
+
+        with self.assertRaises(exceptions.CheckpointMismatchError):
+            cam.render(_scene(), tile_size=3, checkpoint=self.path)
+        self.assertEqual(os.path.getsize(self.path), size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+import os
+import pickle
+import socket
+import threading
+import unittest
+
+import canvas
+import colors
+import distributed
+import exceptions
+import fixtures
+
+KEY = b"a key shared by the tests"
+
+def _start_worker():
+    """Start a worker listening on loopback in a background thread"""
+    worker = distributed.Worker("127.0.0.1", 0, key=KEY)
+    threading.Thread(target=worker.serve_forever, daemon=True).start()
+    return worker
+
+
+def _start_dying_worker():
+    """Start a fake worker that accepts a scene and one tile, then drops the
+    connection as if the process had been killed
+    """
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        conn, _ = server.accept()
+        distributed.recv_message(conn)
+        distributed.recv_message(conn)
+        conn.close()
+        server.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[:2]
+
+
+def _start_garbling_worker(reply):
+    """Start a fake worker that accepts a scene and answers every tile with
+    `reply(tile)`, until the coordinator hangs up
+    """
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            distributed.recv_message(conn)
+            try:
+                while True:
+                    kind, payload = distributed.recv_message(conn)
+                    if kind != distributed.MSG_TILE:
+                        break
+                    distributed.send_message(
+                        conn, distributed.MSG_PIXELS,
+                        reply(distributed.TILE.unpack(payload)))
+            except (ConnectionError, OSError):
+                pass
+        server.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[:2]
+
+
+class TestDistributed(unittest.TestCase):
+
+    def setUp(self):
+
+        self.scene = fixtures.default_scene()
+        self.camera = fixtures.default_camera(11, 9)
+
+        self.workers = []
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.close()
+
+    def assertSameImage(self, image_1, image_2):
+        """Check two canvases are pixel-for-pixel identical"""
+        for x in range(image_1.width):
+            for y in range(image_1.height):
+                self.assertEqual(image_1.get(x, y).values(),
+                                 image_2.get(x, y).values())
+
+    def test_render_on_local_workers(self):
+        """Test that a render spread over several workers matches a serial
+        render
+        """
+
+        self.workers = [_start_worker() for _ in range(3)]
+        coordinator = distributed.Coordinator(
+            [w.address for w in self.workers], tile_size=4, key=KEY)
+
+        image = coordinator.render(self.scene, self.camera)
+        self.assertSameImage(image, self.camera.render(self.scene))
+
+    def test_dead_worker_tiles_are_reassigned(self):
+        """Test that the tile held by a worker that dies is rendered by
+        another worker
+        """
+
+        self.workers = [_start_worker()]
+        addresses = [_start_dying_worker(), self.workers[0].address]
+        coordinator = distributed.Coordinator(addresses, tile_size=4,
+                                              key=KEY)
+
+        image = coordinator.render(self.scene, self.camera)
+        self.assertSameImage(image, self.camera.render(self.scene))
+
+    def test_all_workers_dead(self):
+        """Test that the render fails cleanly if no worker survives"""
+
+        coordinator = distributed.Coordinator([_start_dying_worker()],
+                                              tile_size=4, key=KEY)
+
+        with self.assertRaises(exceptions.RenderError):
+            coordinator.render(self.scene, self.camera)
+
+    def test_key_is_required(self):
+        """Test workers and coordinators won't start without a key, and
+        take one from the environment
+        """
+
+        saved = os.environ.pop(distributed.KEY_VARIABLE, None)
+        try:
+            with self.assertRaises(ValueError):
+                distributed.Worker("127.0.0.1", 0)
+            with self.assertRaises(ValueError):
+                distributed.Coordinator([])
+
+            os.environ[distributed.KEY_VARIABLE] = "from the environment"
+            self.assertEqual(distributed.Coordinator([]).key,
+                             b"from the environment")
+        finally:
+            os.environ.pop(distributed.KEY_VARIABLE, None)
+            if saved is not None:
+                os.environ[distributed.KEY_VARIABLE] = saved
+
+    def test_wrong_key(self):
+        """Test a scene signed with another key is refused before it is
+        unpickled, and the render fails
+        """
+
+        self.workers = [_start_worker()]
+        coordinator = distributed.Coordinator(
+            [self.workers[0].address], tile_size=4, key=b"another key")
+
+        with self.assertRaises(exceptions.RenderError):
+            coordinator.render(self.scene, self.camera)
+
+        with socket.create_connection(self.workers[0].address) as sock:
+            distributed.send_message(sock, distributed.MSG_SCENE,
+                                     b"not signed at all")
+            kind, _ = distributed.recv_message(sock)
+            self.assertEqual(kind, distributed.MSG_ERROR)
+
+    def test_bad_frames(self):
+        """Test unexpected or malformed messages are answered with an error,
+        and the worker carries on serving other connections
+        """
+
+        self.workers = [_start_worker()]
+        blob = distributed.sign(KEY, pickle.dumps((self.camera, self.scene)))
+
+        for messages in ([(distributed.MSG_TILE, b"")],
+                         [(distributed.MSG_SCENE,
+                           distributed.sign(KEY, b"not a pickle"))],
+                         [(distributed.MSG_SCENE, blob),
+                          (b"X", b"")],
+                         [(distributed.MSG_SCENE, blob),
+                          (distributed.MSG_TILE, b"short")]):
+            with socket.create_connection(self.workers[0].address) as sock:
+                for kind, payload in messages:
+                    distributed.send_message(sock, kind, payload)
+                kind, _ = distributed.recv_message(sock)
+                self.assertEqual(kind, distributed.MSG_ERROR)
+
+        coordinator = distributed.Coordinator(
+            [self.workers[0].address], tile_size=4, key=KEY)
+        image = coordinator.render(self.scene, self.camera)
+        self.assertSameImage(image, self.camera.render(self.scene))
+
+    def test_bad_results(self):
+        """Test a worker whose result is garbled, or for another tile, is
+        dropped and its tile rendered by another worker
+        """
+
+        black = colors.Color(0, 0, 0)
+
+        def other_tile(tile):
+            x_min, y_min, x_max, y_max = tile
+            moved = (x_min + 1, y_min, x_max + 1, y_max)
+            pixels = [black] * (x_max - x_min) * (y_max - y_min)
+            return canvas.pack_tile(moved, pixels)
+
+        for reply in (lambda tile: b"short",
+                      lambda tile: canvas.TILE_HEADER.pack(*tile) + b"odd",
+                      lambda tile: canvas.pack_tile(tile, [black]),
+                      other_tile):
+            worker = _start_worker()
+            self.workers.append(worker)
+            coordinator = distributed.Coordinator(
+                [_start_garbling_worker(reply), worker.address],
+                tile_size=4, key=KEY)
+
+            image = coordinator.render(self.scene, self.camera)
+            self.assertSameImage(image, self.camera.render(self.scene))
+
+
+if __name__ == "__main__":
+    unittest.main()
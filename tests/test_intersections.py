@@ -83,6 +83,33 @@ class TestIntersections(unittest.TestCase):
 
         self.assertEqual(isections.hit(), i4)
 
+    def test_accumulate(self):
+        """Test intersections added one at a time or in groups come out
+        sorted, and that adding two sets of intersections leaves both alone
+        """
+
+        shape = shapes.Sphere()
+        i1 = intersections.Intersection(shape, 4)
+        i2 = intersections.Intersection(shape, -2)
+        i3 = intersections.Intersection(shape, 1)
+        i4 = intersections.Intersection(shape, 3)
+
+        isections = intersections.Intersections()
+        isections.add(i1)
+        isections.extend(intersections.Intersections(i2, i3))
+        isections += intersections.Intersections(i4)
+
+        self.assertEqual(len(isections), 4)
+        self.assertEqual(isections.hit(), i3)
+        self.assertEqual(isections.intersections, [i2, i3, i4, i1])
+
+        first = intersections.Intersections(i1, i2)
+        second = intersections.Intersections(i3)
+        combined = first + second
+        self.assertEqual(combined.intersections, [i2, i3, i1])
+        self.assertEqual(first.intersections, [i2, i1])
+        self.assertEqual(second.intersections, [i3])
+
     def test_precompute__outside(self):
         """Test that we can precompute vectors for an intersection and ray when
         outside of a shape"""
@@ -1,6 +1,6 @@
 import unittest
 
-import exceptions, matrices, tuples
+import exceptions, matrices, points, tuples, vectors
 
 class TestMatrices(unittest.TestCase):
 
@@ -298,6 +298,45 @@ class TestMatrices(unittest.TestCase):
         self.assertEqual(M.inverse(), expected)
 
 
+    def test_inverse_matches_cofactor_expansion(self):
+        """Test the closed-form 4x4 inverse agrees with inverting by cofactor
+        expansion
+        """
+
+        M = matrices.Matrix(4, 4)
+        M.set_row(0, [0.5, -2.25, 3, 1.75])
+        M.set_row(1, [4, 1.5, -0.5, 2])
+        M.set_row(2, [-1, 0.25, 2.5, -3])
+        M.set_row(3, [0, 0, 0, 1])
+
+        determinant = sum(M.get(0, i) * M.cofactor(0, i) for i in range(4))
+        self.assertAlmostEqual(M.det(), determinant)
+
+        B = M.inverse()
+        for row in range(4):
+            for col in range(4):
+                self.assertAlmostEqual(B.get(col, row),
+                                       M.cofactor(row, col) / determinant)
+
+    def test_inverse_3_by_3(self):
+        """Test matrices other than 4x4 are still inverted by cofactors"""
+
+        M = matrices.Matrix(3, 3)
+        M.set_row(0, [2, 0, 0])
+        M.set_row(1, [0, 4, 0])
+        M.set_row(2, [0, 0, 8])
+
+        expected = matrices.Matrix(3, 3)
+        expected.set_row(0, [0.5, 0, 0])
+        expected.set_row(1, [0, 0.25, 0])
+        expected.set_row(2, [0, 0, 0.125])
+
+        self.assertEqual(M.inverse(), expected)
+
+        M.set(2, 2, 0)
+        with self.assertRaises(exceptions.CannotInvertMatrixError):
+            M.inverse()
+
     def test_inverse_self_multiply(self):
         """Test that multipling a matrix by its inverse does what is expected"""
 
@@ -320,5 +359,141 @@ class TestMatrices(unittest.TestCase):
 
 
 
+class TestMatrix4(unittest.TestCase):
+    """Tests on the flat, unrolled 4x4 matrix"""
+
+    def setUp(self):
+
+        self.rows_a = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 8, 7, 6], [5, 4, 3, 2]]
+        self.rows_b = [[-2, 1, 2, 3], [3, 2, 1, -1], [4, 3, 6, 5], [1, 2, 7, 8]]
+
+        self.A = matrices.Matrix(4, 4)
+        self.B = matrices.Matrix(4, 4)
+        for i in range(4):
+            self.A.set_row(i, self.rows_a[i])
+            self.B.set_row(i, self.rows_b[i])
+
+        self.A4 = matrices.Matrix4.from_matrix(self.A)
+        self.B4 = matrices.Matrix4.from_matrix(self.B)
+
+    def test_get_set(self):
+        """Test the flat matrix has the same accessors as the generic one"""
+
+        M = matrices.Matrix4()
+        M.set(0, 1, 2)
+        M.set_row(1, [5.5, 6.5, 7.5, 8.5])
+        M.set_col(3, [4, 8.5, 12, 16.5])
+
+        self.assertEqual(M.get(0, 1), 2)
+        self.assertEqual(M.get(1, 2), 7.5)
+        self.assertEqual(M.get_row(1), [5.5, 6.5, 7.5, 8.5])
+        self.assertEqual(M.get_col(3), [4, 8.5, 12, 16.5])
+        self.assertEqual(M.values[1], [5.5, 6.5, 7.5, 8.5])
+        self.assertEqual(self.A4.values, self.rows_a)
+
+        with self.assertRaises(exceptions.IncompatibleLengthError):
+            matrices.Matrix4([1, 2, 3])
+
+    def test_equality_with_generic(self):
+        """Test flat and generic matrices with the same values are equal"""
+
+        self.assertEqual(self.A4, self.A)
+        self.assertEqual(self.A, self.A4)
+        self.assertNotEqual(self.A4, self.B4)
+
+    def test_multiplication(self):
+        """Test the unrolled product matches the generic one exactly"""
+
+        product = self.A4 * self.B4
+
+        self.assertIsInstance(product, matrices.Matrix4)
+        self.assertEqual(product.values, (self.A * self.B).values)
+
+    def test_tuple_multiplication(self):
+        """Test the unrolled matrix-tuple product keeps the tuple's type"""
+
+        M = matrices.Matrix4([1, 2, 3, 4, 2, 4, 4, 2, 8, 6, 4, 1, 0, 0, 0, 1])
+
+        p = M * points.Point(1, 2, 3)
+        self.assertIsInstance(p, points.Point)
+        self.assertEqual(p, points.Point(18, 24, 33))
+
+        v = M * vectors.Vector(1, 2, 3)
+        self.assertIsInstance(v, vectors.Vector)
+        self.assertEqual(v, vectors.Vector(14, 22, 32))
+
+        # Generic tuples still work
+        t = M * tuples.Tuple(["x", "y", "z", "w"], 1, 2, 3, 1)
+        self.assertEqual(t, tuples.Tuple(["x", "y", "z", "w"], 18, 24, 33, 1))
+
+    def test_affine_application(self):
+        """Test applying an affine matrix matches the full product, and that
+        vectors ignore the translation column
+        """
+
+        M = matrices.Matrix4([1, 2, 3, 4, 2, 4, 4, 2, 8, 6, 4, 1, 0, 0, 0, 1])
+
+        p = M.apply_point(points.Point(1, 2, 3))
+        self.assertIsInstance(p, points.Point)
+        self.assertEqual(p, M * points.Point(1, 2, 3))
+
+        v = M.apply_vector(vectors.Vector(1, 2, 3))
+        self.assertIsInstance(v, vectors.Vector)
+        self.assertEqual(v, M * vectors.Vector(1, 2, 3))
+
+        # The generic matrix gives the same answers
+        self.assertEqual(self.A4.apply_vector(vectors.Vector(1, 2, 3)),
+                         self.A.apply_vector(vectors.Vector(1, 2, 3)))
+
+    def test_inverse(self):
+        """Test the flat matrix inverts to a flat matrix, and that singular
+        matrices raise
+        """
+
+        M = matrices.Matrix4([-5, 2, 6, -8, 1, -5, 1, 8,
+                              7, 7, -6, -7, 1, -3, 7, 4])
+
+        self.assertEqual(M.det(), 532)
+        self.assertIsInstance(M.inverse(), matrices.Matrix4)
+        self.assertEqual(M.inverse().get(3, 2), -160/532)
+        self.assertEqual(M * M.inverse(), matrices.Matrix4(
+            [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]))
+
+        singular = matrices.Matrix4([-4, 2, -2, -3, 9, 6, 2, 6,
+                                     0, -5, 1, -5, 0, 0, 0, 0])
+        self.assertEqual(singular.det(), 0)
+        with self.assertRaises(exceptions.CannotInvertMatrixError):
+            singular.inverse()
+
+        # Two equal rows
+        singular = matrices.Matrix4([1, 2, 3, 4, 5, 6, 7, 8,
+                                     1, 2, 3, 4, 0, 0, 0, 1])
+        with self.assertRaises(exceptions.CannotInvertMatrixError):
+            singular.inverse()
+
+    def test_set_inverse(self):
+        """Test a known inverse is returned as given, until the matrix is
+        edited
+        """
+
+        M = matrices.Matrix4([2, 0, 0, 0, 0, 4, 0, 0,
+                              0, 0, 8, 0, 0, 0, 0, 1])
+        known = matrices.Matrix4([0.5, 0, 0, 0, 0, 0.25, 0, 0,
+                                  0, 0, 0.125, 0, 0, 0, 0, 1])
+        M.set_inverse(known)
+        self.assertIs(M.inverse(), known)
+
+        M.set(0, 0, 4)
+        self.assertIsNot(M.inverse(), known)
+        self.assertEqual(M.inverse().get(0, 0), 0.25)
+
+    def test_transpose(self):
+        """Test transposing the flat matrix"""
+
+        self.assertIsInstance(self.A4.transpose(), matrices.Matrix4)
+        self.assertEqual(self.A4.transpose().values,
+                         self.A.transpose().values)
+
+
 if __name__ == "__main__":
     unittest.main()
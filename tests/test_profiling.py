@@ -0,0 +1,58 @@
+import contextlib
+import io
+import math
+import os
+import pstats
+import tempfile
+import unittest
+
+import cameras
+import colors
+import lights
+import points
+import profiling
+import scenes
+import shapes
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "render.pstats")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_profiled(self):
+        """Test the profile is saved and the hottest functions printed"""
+
+        output = io.StringIO()
+        with profiling.profiled(self.path, top=5, stream=output):
+            sum(math.sqrt(i) for i in range(1000))
+
+        self.assertIn("function calls", output.getvalue())
+        self.assertIn("sqrt", output.getvalue())
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_render_profile(self):
+        """Test a render can be profiled, and the hot functions in the tracer
+        show up in the saved profile
+        """
+
+        light = lights.PointLight(points.Point(-10, 10, -10),
+                                  colors.Color(1, 1, 1))
+        scene = scenes.Scene([shapes.Sphere()], [light])
+        cam = cameras.Camera(4, 3, math.pi/2)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            cam.render(scene, profile=self.path)
+
+        self.assertIn("local_intersect", output.getvalue())
+
+        functions = [function for _, _, function in
+                     pstats.Stats(self.path).stats]
+        self.assertIn("local_intersect", functions)
+
+
+if __name__ == "__main__":
+    unittest.main()
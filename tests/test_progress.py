@@ -0,0 +1,44 @@
+import logging
+import unittest
+
+import progress
+
+class TestProgress(unittest.TestCase):
+
+    def test_pixels_per_second(self):
+        """Test the rate is calculated, and is zero before any time passes"""
+
+        self.assertEqual(progress.Progress.pixels_per_second(100, 4.0), 25.0)
+        self.assertEqual(progress.Progress.pixels_per_second(100, 0.0), 0.0)
+
+    def test_callback_progress(self):
+        """Test the callback gets each tile along with the render rate"""
+
+        calls = []
+        observer = progress.CallbackProgress(
+            lambda *args: calls.append(args))
+
+        observer.start(100)
+        observer.tile_done((0, 0, 5, 5), 25, 100, 0.5)
+        observer.finish(100, 2.0)
+
+        self.assertEqual(calls, [((0, 0, 5, 5), 25, 100, 0.5, 50.0)])
+
+    def test_logging_progress(self):
+        """Test that progress is logged through the given logger"""
+
+        logger = logging.getLogger("test_progress")
+        observer = progress.LoggingProgress(logger, interval=0)
+
+        with self.assertLogs(logger, level="INFO") as logs:
+            observer.start(100)
+            observer.tile_done((0, 0, 5, 5), 25, 100, 0.5)
+            observer.finish(100, 2.0)
+
+        self.assertEqual(len(logs.output), 3)
+        self.assertIn("25 of 100 pixels", logs.output[1])
+        self.assertIn("50.00 pps", logs.output[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import math
+import unittest
+
+import points
+import quaternions
+import transforms
+import vectors
+
+class TestQuaternion(unittest.TestCase):
+
+    def test_matches_rotation_matrices(self):
+        """Test the axis rotations turn into the same matrices as the
+        rotation transforms
+        """
+
+        for r in (0.3, math.pi/2, -2.0):
+            self.assertEqual(quaternions.Quaternion.rotate_x(r).to_transform(),
+                             transforms.RotateX(r))
+            self.assertEqual(quaternions.Quaternion.rotate_y(r).to_transform(),
+                             transforms.RotateY(r))
+            self.assertEqual(quaternions.Quaternion.rotate_z(r).to_transform(),
+                             transforms.RotateZ(r))
+
+    def test_degrees(self):
+        """Test angles can be given in degrees"""
+
+        self.assertEqual(quaternions.Quaternion.rotate_z(90, degrees=True),
+                         quaternions.Quaternion.rotate_z(math.pi/2))
+
+    def test_composition(self):
+        """Test composing quaternions matches multiplying their matrices"""
+
+        qx = quaternions.Quaternion.rotate_x(0.4)
+        qy = quaternions.Quaternion.rotate_y(-1.2)
+        qz = quaternions.Quaternion.rotate_z(2.5)
+
+        self.assertEqual((qx * qy * qz).to_transform(),
+                         transforms.RotateX(0.4) * transforms.RotateY(-1.2) *
+                         transforms.RotateZ(2.5))
+
+    def test_rotate(self):
+        """Test points and vectors can be rotated without a matrix"""
+
+        q = quaternions.Quaternion.from_axis_angle(vectors.Vector(1, 1, 0), 1.0)
+        M = q.to_transform()
+
+        p = points.Point(1, 2, 3)
+        self.assertEqual(q.rotate(p), M * p)
+        self.assertIsInstance(q.rotate(p), points.Point)
+
+        v = vectors.Vector(-1, 0.5, 2)
+        self.assertEqual(q.rotate(v), M * v)
+        self.assertIsInstance(q.rotate(v), vectors.Vector)
+
+    def test_conjugate_is_inverse(self):
+        """Test the conjugate undoes the rotation, and that the transform
+        carries its inverse with it
+        """
+
+        q = quaternions.Quaternion.from_axis_angle(vectors.Vector(1, 2, 3), 0.7)
+        self.assertEqual(q * q.conjugate(), quaternions.Quaternion())
+
+        M = q.to_transform()
+        self.assertIsNotNone(M._inverse)
+        self.assertEqual(M.inverse(), q.conjugate().to_transform())
+        self.assertEqual(M * M.inverse(), transforms.Identity(4))
+
+        # Editing the transform means its inverse is found numerically again
+        M.set(0, 3, 5)
+        self.assertEqual(M.inverse() * M, transforms.Identity(4))
+
+    def test_slerp(self):
+        """Test interpolating between two rotations about the same axis turns
+        at a constant rate
+        """
+
+        start = quaternions.Quaternion.rotate_y(0)
+        end = quaternions.Quaternion.rotate_y(math.pi/2)
+
+        self.assertEqual(start.slerp(end, 0), start)
+        self.assertEqual(start.slerp(end, 1), end)
+        self.assertEqual(start.slerp(end, 0.5),
+                         quaternions.Quaternion.rotate_y(math.pi/4))
+        self.assertEqual(start.slerp(start, 0.3), start)
+
+    def test_slerp_short_way_round(self):
+        """Test slerp goes the short way round, even if the quaternions are
+        on opposite sides of the sphere
+        """
+
+        start = quaternions.Quaternion.rotate_z(0.1)
+        end = -quaternions.Quaternion.rotate_z(0.3)
+
+        halfway = start.slerp(end, 0.5)
+        self.assertEqual(halfway.rotate(vectors.Vector(1, 0, 0)),
+                         transforms.RotateZ(0.2) * vectors.Vector(1, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 
+import backends
+import exceptions
 import rays
 import points
 import vectors
@@ -35,5 +37,55 @@ class TestRays(unittest.TestCase):
         self.assertEqual(r3.direction, vectors.Vector(0, 3, 0))
 
 
+class TestRayBatch(unittest.TestCase):
+    """Tests on batches of rays"""
+
+    backend = backends.PYTHON
+
+    def setUp(self):
+        self.rays = [
+            rays.Ray(points.Point(2, 3, 4), vectors.Vector(1, 0, 0)),
+            rays.Ray(points.Point(1, 2, 3), vectors.Vector(0, 1, 0)),
+            rays.Ray(points.Point(-1, 0.5, 0), vectors.Vector(0.3, -2, 1))]
+        self.batch = rays.RayBatch.from_rays(self.rays, backend=self.backend)
+
+    def test_from_rays(self):
+        """Test a batch holds the rays it was built from"""
+
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch.backend, self.backend)
+        for r, s in zip(self.batch, self.rays):
+            self.assertEqual(r.origin, s.origin)
+            self.assertEqual(r.direction, s.direction)
+            self.assertIsInstance(r.origin, points.Point)
+            self.assertIsInstance(r.direction, vectors.Vector)
+
+    def test_position(self):
+        """Test each ray is moved along by its own time"""
+
+        times = [2.5, -1, 0.5]
+        positions = self.batch.position(times)
+
+        for p, r, t in zip(positions, self.rays, times):
+            self.assertEqual(p, r.position(t))
+
+        with self.assertRaises(exceptions.IncompatibleLengthError):
+            self.batch.position([1])
+
+    def test_transform(self):
+        """Test transforming a batch matches transforming each ray"""
+
+        M = transforms.Translate(3, 4, 5) * transforms.Scale(2, 3, 4)
+        for r, s in zip(self.batch.transform(M), self.rays):
+            self.assertEqual(r.origin, s.transform(M).origin)
+            self.assertEqual(r.direction, s.transform(M).direction)
+
+
+@unittest.skipUnless(backends.HAS_NUMPY, "numpy is not installed")
+class TestNumpyRayBatch(TestRayBatch):
+
+    backend = backends.NUMPY
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import copy
 import math
+import pickle
 import unittest
 
 import colors
@@ -11,6 +12,7 @@ import points
 import rays
 import scenes
 import shapes
+import stats as render_stats
 import transforms
 import vectors
 
@@ -60,6 +62,113 @@ class TestScenes(unittest.TestCase):
         ts = [x.t for x in result.intersections]
         self.assertEqual(ts, [4, 4.5, 5.5, 6])
 
+    def test_intersect_closest(self):
+        """Test the closest-hit query finds the first intersection in the
+        range asked for
+        """
+
+        r = rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1))
+
+        hit = self.default_scene.intersect_closest(r)
+        self.assertEqual(hit, intersections.Intersection(self.s2, 4))
+
+        # Limiting the range skips intersections outside it
+        hit = self.default_scene.intersect_closest(r, t_min=4.2)
+        self.assertEqual(hit, intersections.Intersection(self.s1, 4.5))
+        self.assertIsNone(self.default_scene.intersect_closest(r, t_max=3))
+
+        # From inside both spheres, only the ones ahead count
+        r = rays.Ray(points.Point(0, 0, 0), vectors.Vector(0, 0, 1))
+        hit = self.default_scene.intersect_closest(r)
+        self.assertEqual(hit, intersections.Intersection(self.s1, 0.5))
+
+    def test_is_occluded(self):
+        """Test the any-hit query agrees with the closest-hit one, and stops
+        at the first object in the way
+        """
+
+        scene = self.default_scene
+        cases = [
+            (rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1)), 3.9),
+            (rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1)), 4.1),
+            (rays.Ray(points.Point(0, 0, 0), vectors.Vector(0, 0, 1)), 0.4),
+            (rays.Ray(points.Point(0, 0, 0), vectors.Vector(0, 0, 1)), 0.6),
+            (rays.Ray(points.Point(0, 0, 5), vectors.Vector(0, 0, 1)), 100),
+            (rays.Ray(points.Point(0, 2, -5), vectors.Vector(0, 0, 1)), 100)]
+
+        for r, distance in cases:
+            self.assertEqual(
+                scene.is_occluded(r, t_max=distance),
+                scene.intersect_closest(r, t_max=distance) is not None)
+
+            for shape in scene.objects:
+                self.assertEqual(shape.occludes(r, t_max=distance),
+                                 len(shape.intersect(r, t_min=0,
+                                                     t_max=distance)) > 0)
+
+        floor = shapes.Plane()
+        r = rays.Ray(points.Point(0, 1, 0), vectors.Vector(0, -1, 0))
+        self.assertFalse(floor.occludes(r, t_max=1))
+        self.assertTrue(floor.occludes(r, t_max=1.5))
+        self.assertFalse(floor.occludes(
+            rays.Ray(points.Point(0, 1, 0), vectors.Vector(1, 0, 0))))
+
+        # The ray is blocked by the outer sphere, so the inner one is never
+        # tested
+        counted = render_stats.RenderStats()
+        r = rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1))
+        scene = scenes.Scene(objects=[self.s2, self.s1])
+        self.assertTrue(scene.is_occluded(r, stats=counted))
+        self.assertEqual(counted.summary()["intersection_tests"], 1)
+
+    def test_shadow_cache_is_not_pickled(self):
+        """Test a scene with a warm shadow cache can be copied and pickled,
+        and that the copy starts with an empty cache
+        """
+
+        self.assertTrue(self.default_scene.is_shadowed(
+            points.Point(10, -10, 10), self.l1))
+        self.assertEqual(len(self.default_scene._last_occluders()), 1)
+
+        copied = pickle.loads(pickle.dumps(self.default_scene))
+        self.assertEqual(copied._last_occluders(), {})
+        self.assertTrue(copied.is_shadowed(points.Point(10, -10, 10),
+                                           copied.lights[0]))
+
+        copied = copy.deepcopy(self.default_scene)
+        self.assertEqual(copied._last_occluders(), {})
+
+    def test_shape_intersect_range(self):
+        """Test a shape only returns intersections inside the range"""
+
+        r = rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1))
+
+        ts = [x.t for x in self.s2.intersect(r, t_min=4.5).intersections]
+        self.assertEqual(ts, [6])
+        ts = [x.t for x in self.s2.intersect(r, t_max=5).intersections]
+        self.assertEqual(ts, [4])
+        self.assertEqual(len(self.s2.intersect(r, t_min=6)), 0)
+        self.assertEqual(len(self.s2.intersect(r, t_max=4)), 0)
+
+        floor = shapes.Plane()
+        r = rays.Ray(points.Point(0, 1, 0), vectors.Vector(0, -1, 0))
+        self.assertEqual(len(floor.intersect(r, t_max=1)), 0)
+        self.assertEqual(len(floor.intersect(r, t_min=0.5, t_max=1.5)), 1)
+
+    def test_shape_intersect_range_by_position(self):
+        """Test the range can be passed by position, after the ray, to both
+        intersect and occludes
+        """
+
+        r = rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1))
+        ts = [x.t for x in shapes.Sphere().intersect(r, 0, 10).intersections]
+        self.assertEqual(ts, [4, 6])
+        ts = [x.t for x in shapes.Sphere().intersect(r, 4.5, 10).intersections]
+        self.assertEqual(ts, [6])
+
+        self.assertTrue(shapes.Sphere().occludes(r, 0, 10))
+        self.assertFalse(shapes.Sphere().occludes(r, 0, 3))
+
     def test_shade_hit__outside(self):
         """Test that we shade an individual hit the correct color when outside
         an object"""
@@ -1,6 +1,7 @@
 import math
 import unittest
 
+import backends
 import materials
 import points
 import rays
@@ -88,6 +89,9 @@ class TestSphere(unittest.TestCase):
         s = shapes.Sphere()
         s.set_transform(transforms.Translate(6, 7, 8))
         self.assertEqual(s.transform, transforms.Translate(6, 7, 8))
+        self.assertEqual(s.inverse_transform, transforms.Translate(-6, -7, -8))
+        self.assertEqual(s.inverse_transpose,
+                         transforms.Translate(-6, -7, -8).transpose())
 
     def test_intersections_with_transformed_ray__scaling(self):
         """Test we get the correct intersections after adding a scaling
@@ -202,5 +206,66 @@ class TestPlane(unittest.TestCase):
         xs = p.local_intersect(r)
         self.assertEqual(xs.intersections[0].t, 1)
 
+
+class TestIntersectBatch(unittest.TestCase):
+    """Tests that intersecting a batch of rays matches intersecting them one
+    at a time
+    """
+
+    backend = backends.PYTHON
+
+    def setUp(self):
+        # Hits, glancing blows, misses, rays starting inside and behind, and
+        # rays parallel to the plane
+        self.rays = [
+            rays.Ray(points.Point(0, 0, -5), vectors.Vector(0, 0, 1)),
+            rays.Ray(points.Point(0, 1, -5), vectors.Vector(0, 0, 1)),
+            rays.Ray(points.Point(0, 2, -5), vectors.Vector(0, 0, 1)),
+            rays.Ray(points.Point(0, 0, 0), vectors.Vector(0, 0, 1)),
+            rays.Ray(points.Point(0, 0, 5), vectors.Vector(0, 0, 1)),
+            rays.Ray(points.Point(1, 3, -2), vectors.Vector(-0.2, -1, 0.4)),
+            rays.Ray(points.Point(0, 10, 0), vectors.Vector(0, 0.001, 1))]
+        self.batch = rays.RayBatch.from_rays(self.rays, backend=self.backend)
+
+    def check(self, shape):
+        """Compare the batched and single ray t values for the shape"""
+
+        columns = shape.intersect_batch(self.batch)
+        for i, r in enumerate(self.rays):
+            expected = [x.t for x in shape.intersect(r).intersections]
+            actual = [float(column[i]) for column in columns]
+            if expected:
+                for e, a in zip(expected, actual):
+                    self.assertAlmostEqual(e, a)
+            else:
+                self.assertEqual(actual, [math.inf] * len(columns))
+
+    def test_sphere(self):
+        """Test a transformed sphere's batch t values"""
+
+        self.check(shapes.Sphere())
+
+        s = shapes.Sphere()
+        s.set_transform(transforms.Translate(0.5, 1, 0) *
+                        transforms.Scale(2, 1, 1))
+        self.check(s)
+
+    def test_plane(self):
+        """Test a transformed plane's batch t values"""
+
+        self.check(shapes.Plane())
+
+        p = shapes.Plane()
+        p.set_transform(transforms.Translate(0, -1, 0) *
+                        transforms.RotateX(0.3))
+        self.check(p)
+
+
+@unittest.skipUnless(backends.HAS_NUMPY, "numpy is not installed")
+class TestNumpyIntersectBatch(TestIntersectBatch):
+
+    backend = backends.NUMPY
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,158 @@
+import math
+import unittest
+
+import cameras
+import colors
+import lights
+import materials
+import points
+import rays
+import scenes
+import shapes
+import stats
+import transforms
+import vectors
+
+class TestRenderStats(unittest.TestCase):
+
+    def setUp(self):
+        """A reflective floor under a sphere, lit from above"""
+
+        self.floor = shapes.Plane(
+            material=materials.Material(reflective=0.5))
+        self.floor.set_transform(transforms.Translate(0, -1, 0))
+
+        self.ball = shapes.Sphere()
+
+        self.scene = scenes.Scene(
+            objects=[self.floor, self.ball],
+            lights=[lights.PointLight(points.Point(-10, 10, -10),
+                                      colors.Color(1, 1, 1))])
+
+        self.camera = cameras.Camera(8, 6, math.pi/2)
+        self.camera.transform = transforms.ViewTransform(
+            points.Point(0, 1, -5),
+            points.Point(0, 0, 0),
+            vectors.Vector(0, 1, 0))
+
+    def test_count_test(self):
+        """Test ray-shape tests are counted per type and per object"""
+
+        collector = stats.RenderStats()
+        collector.count_test(self.ball, True)
+        collector.count_test(self.ball, False)
+        collector.count_test(self.floor, True)
+
+        summary = collector.summary()
+        self.assertEqual(summary["intersection_tests"], 3)
+        self.assertEqual(summary["hits"], 2)
+        self.assertEqual(summary["tests_by_type"], {"Sphere": 2, "Plane": 1})
+        self.assertEqual(summary["hits_by_type"], {"Sphere": 1, "Plane": 1})
+        self.assertEqual(summary["tests_by_object"][str(self.ball.id)], 2)
+
+    def test_depth(self):
+        """Test the deepest level of recursion is remembered"""
+
+        collector = stats.RenderStats()
+        collector.descend()
+        collector.descend()
+        collector.ascend()
+        collector.descend()
+        collector.ascend()
+        collector.ascend()
+
+        self.assertEqual(collector.max_depth, 2)
+        self.assertEqual(collector.depth, 0)
+
+    def test_merge(self):
+        """Test counts from two collectors can be combined"""
+
+        first = stats.RenderStats()
+        first.count_ray(stats.PRIMARY, 4)
+        first.count_test(self.ball, True)
+
+        second = stats.RenderStats()
+        second.count_ray(stats.PRIMARY, 2)
+        second.count_ray(stats.SHADOW)
+        second.descend()
+
+        first.merge(second)
+        summary = first.summary()
+
+        self.assertEqual(summary["rays"][stats.PRIMARY], 6)
+        self.assertEqual(summary["rays"][stats.SHADOW], 1)
+        self.assertEqual(summary["max_depth"], 1)
+        self.assertEqual(summary["intersection_tests"], 1)
+
+    def test_color_at(self):
+        """Test a ray that bounces off the floor is counted"""
+
+        collector = stats.RenderStats()
+        ray = rays.Ray(points.Point(3, 0, -5), vectors.Vector(0, -0.5, 1))
+
+        self.scene.color_at(ray, stats=collector)
+        summary = collector.summary()
+
+        self.assertEqual(summary["rays"][stats.REFLECTION], 1)
+        self.assertEqual(summary["rays"][stats.SHADOW], 1)
+        self.assertEqual(summary["max_depth"], 1)
+        # The first ray, its shadow ray, and the reflected ray (which heads
+        # off into the sky) are each tested against the floor.  None of them
+        # pass through the ball's bounding box, so it is never tested
+        self.assertEqual(summary["intersection_tests"], 3)
+        self.assertEqual(summary["tests_by_type"], {"Plane": 3})
+        # Only the first ray hits anything in the range it asks about.  The
+        # shadow and reflected rays only meet the floor behind themselves
+        self.assertEqual(summary["hits_by_type"], {"Plane": 1})
+
+    def test_shadow_cache(self):
+        """Test the shape that last shadowed a light is tried first, and that
+        the lookups are counted
+        """
+
+        collector = stats.RenderStats()
+        light = self.scene.lights[0]
+
+        # Two points on the floor in the ball's shadow, then one in the light
+        self.assertTrue(self.scene.is_shadowed(
+            points.Point(0.5, -1, 0.5), light, stats=collector))
+        self.assertEqual(collector.summary()["intersection_tests"], 2)
+
+        self.assertTrue(self.scene.is_shadowed(
+            points.Point(0.6, -1, 0.6), light, stats=collector))
+        self.assertEqual(collector.summary()["intersection_tests"], 3)
+
+        self.assertFalse(self.scene.is_shadowed(
+            points.Point(5, -1, 0), light, stats=collector))
+
+        summary = collector.summary()
+        self.assertEqual(summary["shadow_cache_hits"], 1)
+        self.assertEqual(summary["shadow_cache_misses"], 1)
+        self.assertEqual(summary["shadow_cache_hit_rate"], 0.5)
+        # The cached ball, then the floor
+        self.assertEqual(summary["intersection_tests"], 5)
+
+    def test_render(self):
+        """Test a render counts one primary ray per pixel, and that workers'
+        counts are merged into the same totals.  Each worker has its own
+        shadow cache, so only the numbers of rays are the same however the
+        image is split up
+        """
+
+        serial = stats.RenderStats()
+        self.camera.render(self.scene, stats=serial)
+
+        parallel = stats.RenderStats()
+        self.camera.render(self.scene, processes=2, tile_size=3,
+                           stats=parallel)
+
+        self.assertEqual(serial.summary()["rays"][stats.PRIMARY], 48)
+        self.assertGreater(serial.summary()["rays"][stats.REFLECTION], 0)
+        self.assertEqual(serial.summary()["rays"], parallel.summary()["rays"])
+        self.assertEqual(serial.summary()["max_depth"],
+                         parallel.summary()["max_depth"])
+        self.assertGreater(serial.summary()["shadow_cache_hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
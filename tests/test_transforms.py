@@ -28,6 +28,23 @@ class TestIdentity(unittest.TestCase):
         t2 = ident * t
         self.assertEqual(t2, t)
 
+    def test_identity_4_is_flat(self):
+        """Test the 4x4 identity, like all transforms, is a Matrix4"""
+
+        self.assertIsInstance(transforms.Identity(4), matrices.Matrix4)
+        self.assertIsInstance(transforms.Identity(3), matrices.Matrix)
+        self.assertNotIsInstance(transforms.Identity(3), matrices.Matrix4)
+
+        for transform in (transforms.Translate(1, 2, 3),
+                          transforms.Scale(1, 2, 3),
+                          transforms.RotateX(1), transforms.RotateY(1),
+                          transforms.RotateZ(1),
+                          transforms.Shear(1, 0, 0, 0, 0, 0),
+                          transforms.ViewTransform(points.Point(1, 3, 2),
+                                                   points.Point(4, -2, 8),
+                                                   vectors.Vector(1, 1, 0))):
+            self.assertIsInstance(transform, matrices.Matrix4)
+
     def test_identity_matrix_transpose(self):
         """Test that the transpose of the identity matrix is identity"""
 
@@ -141,6 +158,9 @@ class TestRotate(unittest.TestCase):
         self.assertEqual(p3,
             points.Point(1, 0, 0))
 
+        # A vector has w=0, so this also catches sin(r) in the wrong column
+        self.assertEqual(full_quarter * vectors.Vector(0, 0, 1),
+                         vectors.Vector(1, 0, 0))
 
     def test_rotate_z(self):
         """Test we can rotate about the y-axis"""
@@ -204,6 +224,88 @@ class TestChainedTransformations(unittest.TestCase):
         self.assertEqual(p2, points.Point(15, 0, 7))
 
 
+class TestAnalyticInverse(unittest.TestCase):
+    """Tests on the inverses that transforms know without inverting"""
+
+    def test_transforms_know_inverse(self):
+        """Test each simple transform's inverse matches the numerical one"""
+
+        for T in (transforms.Identity(4),
+                  transforms.Translate(5, -3, 2),
+                  transforms.Scale(2, 3, -4),
+                  transforms.RotateX(0.3),
+                  transforms.RotateY(1.1),
+                  transforms.RotateZ(-2.0)):
+            self.assertIsNotNone(T._inverse)
+            self.assertEqual(T.inverse(),
+                             matrices.Matrix4(matrices.inverse4(T.flat)))
+            self.assertEqual(T * T.inverse(), transforms.Identity(4))
+
+    def test_translate_inverse_is_exact(self):
+        """Test the inverse of a translation has no rounding error"""
+
+        T = transforms.Translate(0.1, 0.2, 0.3)
+        self.assertEqual(T.inverse().get_col(3), [-0.1, -0.2, -0.3, 1])
+
+    def test_zero_scale_is_singular(self):
+        """Test a scale by zero still can't be inverted"""
+
+        with self.assertRaises(exceptions.CannotInvertMatrixError):
+            transforms.Scale(1, 0, 1).inverse()
+
+    def test_product_inverse(self):
+        """Test a product of transforms gets its inverse from its factors"""
+
+        A = transforms.Translate(1, 2, 3)
+        B = transforms.RotateY(0.5)
+        C = transforms.Scale(2, 2, 0.5)
+
+        M = A * B * C
+        self.assertIsNotNone(M._inverse)
+        self.assertEqual(M.inverse(),
+                         C.inverse() * B.inverse() * A.inverse())
+        self.assertEqual(M.inverse(),
+                         matrices.Matrix4(matrices.inverse4(M.flat)))
+
+    def test_edit_forgets_inverse(self):
+        """Test that editing a transform throws away its cached inverse"""
+
+        T = transforms.Translate(1, 2, 3)
+        T.inverse()
+        T.set(0, 3, 5)
+        self.assertEqual(T.inverse(), transforms.Translate(-5, -2, -3))
+
+        M = transforms.Translate(1, 0, 0) * transforms.Scale(2, 2, 2)
+        M.set(0, 0, 4)
+        self.assertIsNone(M._inverse)
+        self.assertEqual(M.inverse(),
+                         matrices.Matrix4(matrices.inverse4(M.flat)))
+
+    def test_edit_factor_after_product(self):
+        """Test that editing a factor after multiplying leaves the product's
+        inverse alone
+        """
+
+        A = transforms.Translate(1, 2, 3)
+        B = transforms.Scale(2, 2, 2)
+        M = A * B
+        A.set(0, 3, 7)
+        B.set_row(1, [0, 4, 0, 0])
+        self.assertEqual(M.inverse(),
+                         matrices.Matrix4(matrices.inverse4(M.flat)))
+
+    def test_long_product(self):
+        """Test that a product built in thousands of steps can be inverted
+        without recursing through its factors
+        """
+
+        M = transforms.Identity(4)
+        for i in range(5000):
+            M = M * transforms.RotateZ(0.001 * (-1) ** i)
+        self.assertEqual(M.inverse(),
+                         matrices.Matrix4(matrices.inverse4(M.flat)))
+
+
 class TestViewTransformation(unittest.TestCase):
     """Tests on the view transformation"""
 
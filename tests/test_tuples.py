@@ -1,7 +1,7 @@
 import math
 import unittest
 
-import tuples, vectors, points
+import colors, exceptions, tuples, vectors, points
 
 class TestTuples(unittest.TestCase):
     """Tests on the Tuple class"""
@@ -149,6 +149,74 @@ class TestTuples(unittest.TestCase):
         n =  vectors.Vector(math.sqrt(2)/2, math.sqrt(2)/2, 0)
         r = v.reflect(n)
         self.assertEqual(r, vectors.Vector(1, 0, 0))
+    def test_arithmetic_keeps_type(self):
+        """Test that arithmetic on points and vectors gives points and vectors
+        """
+
+        p = points.Point(3, 2, 1)
+        v = vectors.Vector(5, 6, 7)
+
+        self.assertIsInstance(p + v, points.Point)
+        self.assertIsInstance(p - v, points.Point)
+        self.assertIsInstance(p - points.Point(1, 1, 1), vectors.Vector)
+        self.assertIsInstance(v + v, vectors.Vector)
+        self.assertIsInstance(-v, vectors.Vector)
+        self.assertIsInstance(v * 2, vectors.Vector)
+        self.assertIsInstance(v / 2, vectors.Vector)
+        self.assertIsInstance(v.normalize(), vectors.Vector)
+        self.assertIsInstance(v.cross(vectors.Vector(0, 1, 0)), vectors.Vector)
+
+        # Anything that isn't a point or a vector is a plain four-tuple
+        self.assertIsInstance(p * 2, tuples.Tuple4)
+        self.assertEqual((p * 2).w, 2)
+
+        c = colors.Color(0.1, 0.2, 0.3)
+        self.assertIsInstance(c + c, colors.Color)
+        self.assertIsInstance(c * c, colors.Color)
+        self.assertIsInstance(c * 0.5, colors.Color)
+
+    def test_fixed_layout_matches_generic(self):
+        """Test the slotted types agree with the generic tuple"""
+
+        p = points.Point(3, -2, 5)
+        v = vectors.Vector(-2, 3, 1)
+        generic_p = tuples.Tuple(["x", "y", "z", "w"], 3, -2, 5, 1)
+        generic_v = tuples.Tuple(["x", "y", "z", "w"], -2, 3, 1, 0)
+
+        self.assertEqual(p, generic_p)
+        self.assertEqual(p + v, generic_p + generic_v)
+        self.assertEqual(p - v, generic_p - generic_v)
+        self.assertEqual(v.dot(v), generic_v.dot(generic_v))
+        self.assertEqual(v.normalize(), generic_v.normalize())
+        self.assertEqual(p.values(), generic_p.values())
+        self.assertEqual(list(p.fillables), generic_p.fillables)
+
+        # Tuples with different components never compare equal
+        self.assertNotEqual(p, tuples.Tuple(["a", "b", "c", "d"], 3, -2, 5, 1))
+        self.assertNotEqual(colors.Color(1, 1, 1), points.Point(1, 1, 1))
+
+    def test_fixed_layout(self):
+        """Test points, vectors and colors have no instance dictionary, so
+        stray attributes are refused, while generic tuples still have one
+        """
+
+        for value in (points.Point(1, 2, 3), vectors.Vector(1, 2, 3),
+                      tuples.make_xyzw(1, 2, 3, 4), colors.Color(1, 2, 3)):
+            self.assertFalse(hasattr(value, "__dict__"), type(value))
+            with self.assertRaises(AttributeError):
+                value.stray = 1
+
+        generic = tuples.Tuple(["a", "b"], 1, 2)
+        self.assertIsInstance(generic, tuples.Tuple)
+        self.assertEqual(generic.__dict__, {"fillables": ["a", "b"],
+                                            "a": 1, "b": 2})
+        self.assertEqual((generic + generic).values(), [2, 4])
+
+    def test_mismatched_lengths(self):
+        """Test adding tuples of different lengths still raises"""
+
+        with self.assertRaises(exceptions.IncompatibleLengthError):
+            _ = points.Point(1, 2, 3) + colors.Color(1, 2, 3)
 
 if __name__ == "__main__":
     unittest.main()